@@ -0,0 +1,86 @@
+"""Import-time benchmark for plotex
+
+Runs each import statement in fresh interpreters, reports the median wall time and checks
+that the heavy dependencies are only loaded when they are actually needed. Exits with a
+non-zero status if a check fails or a budget is exceeded, so it can guard regressions in CI.
+
+Usage:
+    python benchmarks/bench_import.py [--repeat 7] [--budget-ms 150]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+# (name, statement, modules that must NOT be imported after running the statement)
+CASES = [
+    ('import plotex', 'import plotex', ['matplotlib', 'seaborn', 'requests']),
+    ('from plotex import save', 'from plotex import save', ['matplotlib', 'seaborn', 'requests']),
+    ('from plotex import Plotex', 'from plotex import Plotex', ['matplotlib.pyplot', 'seaborn', 'requests']),
+    ('Plotex().init() (cached config)', 'from plotex import Plotex; Plotex()', ['seaborn', 'requests']),
+]
+
+# statements whose time is bounded by the budget (the ones that should not touch matplotlib)
+BUDGETED = {'import plotex', 'from plotex import save'}
+
+SCRIPT = """
+import sys, time, json
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'elapsed': elapsed, 'modules': sorted(sys.modules)}}))
+"""
+
+
+def run_case(statement, repeat):
+    """runs the statement in `repeat` fresh interpreters
+
+    Returns:
+        (median time in ms, loaded modules of the last run)
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [SRC_DIR, os.environ.get('PYTHONPATH')])),
+               MPLBACKEND='Agg')
+    timings, modules = [], []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', SCRIPT.format(statement=statement)], env=env,
+                                check=True, capture_output=True, text=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        timings.append(result['elapsed'] * 1000)
+        modules = result['modules']
+        
+    return statistics.median(timings), set(modules)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=7, help='number of fresh interpreters per case')
+    parser.add_argument('--budget-ms', type=float, default=150, help='time budget for the matplotlib-free imports')
+    args = parser.parse_args()
+
+    # warm up the compiled config snapshot, so the init case measures the cached path
+    run_case('from plotex import Plotex; Plotex()', repeat=1)
+
+    failures = []
+    for name, statement, forbidden in CASES:
+        median_ms, modules = run_case(statement, args.repeat)
+        loaded = [m for m in forbidden if m in modules]
+        print(f"{name:<35} {median_ms:8.1f} ms")
+        
+        if loaded:
+            failures.append(f"{name}: unexpectedly imported {', '.join(loaded)}")
+        if name in BUDGETED and median_ms > args.budget_ms:
+            failures.append(f"{name}: {median_ms:.1f} ms exceeds the budget of {args.budget_ms} ms")
+
+    for failure in failures:
+        print(f"[FAIL] {failure}")
+    
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
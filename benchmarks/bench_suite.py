@@ -0,0 +1,218 @@
+"""Benchmark suite for plotex
+
+Times the configuration, sizing, plotting helpers and export on synthetic dataframes (rows from 10^3
+to 10^7, categories from 5 to 5000), and reports the median wall time, the peak memory (traced
+allocations of a separate run), the output file sizes and the import times. Runs offline with the Agg
+backend, with a temporary cache directory (so only the bundled configs are used) and without LaTeX
+unless --usetex is given. Results can be saved as json and compared against a baseline, exiting with
+a non-zero status when a case is slower than the tolerance.
+
+Usage:
+    python benchmarks/bench_suite.py [--rows 1e3 1e5 1e7] [--categories 5 500 5000] [--repeat 3]
+                                     [--cases group_reduce save] [--output results.json]
+                                     [--compare baseline.json] [--tolerance 0.25]
+"""
+import argparse
+import gc
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault('PLOTEX_CACHE_DIR', tempfile.mkdtemp(prefix='plotex_bench_'))
+os.environ['MPLBACKEND'] = 'Agg'
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+import numpy as np
+import pandas as pd
+import matplotlib
+import matplotlib.pyplot as plt
+from plotex import Plotex
+from plotex.plotting import bar, scatter, pie
+from bench_import import run_case
+
+
+ROWS = [10**3, 10**4, 10**5, 10**6, 10**7]
+CATEGORIES = [5, 50, 500, 5000]
+FORMATS = ['pdf', 'png', 'svg']
+STACK_CATEGORIES = 10
+
+
+def make_frame(rows, categories, seed=0):
+    """synthetic dataframe: categorical `group` (`categories` values) and `stack` (STACK_CATEGORIES values)
+    columns, and float `x`, `y` and `value` columns"""
+    rng = np.random.default_rng(seed)
+    def categorical(n, prefix):
+        return pd.Categorical.from_codes(rng.integers(n, size=rows), categories=[f"{prefix}{i}" for i in range(n)])
+
+    return pd.DataFrame({'group': categorical(categories, 'c'), 'stack': categorical(STACK_CATEGORIES, 's'),
+                         'x': rng.normal(size=rows), 'y': rng.normal(size=rows), 'value': rng.random(rows)})
+
+
+class Context():
+    """the state shared by the cases: the initialized Plotex object and the figure size"""
+
+    def __init__(self, usetex):
+        self.usetex = usetex
+        self.plotex = Plotex()
+        self.init()
+
+
+    def init(self):
+        self.plotex.config.initialize()
+        self.figsize = self.plotex.skeleton(publisher='acl', reinitialize=False)
+        matplotlib.rcParams['text.usetex'] = self.usetex
+        if not self.usetex: # the configured LaTeX fonts are usually not installed as system fonts
+            logging.getLogger('matplotlib.font_manager').setLevel(logging.ERROR)
+
+
+    def axes(self):
+        return plt.subplots(figsize=self.figsize)
+
+
+# the cases are functions (context, df) returning the function to measure and its teardown
+def case_init(context, df):
+    return context.plotex.config.initialize, context.init
+
+
+def case_get_size(context, df):
+    return lambda: context.plotex.sizer.get_size(publisher='acl', fraction=0.5, subplots=(1, 2),
+                                                reinitialize=False), context.init
+
+
+def case_update_textsize(context, df):
+    return lambda: context.plotex.update_textsize(reinitialize=False, title=2, xticks=-1, legend=-1), context.init
+
+
+def plot_case(helper, **kwargs):
+    def case(context, df):
+        fig, ax = context.axes()
+        return lambda: helper(ax, df, **kwargs), lambda: plt.close(fig)
+    return case
+
+
+def case_save(context, df):
+    """saves a scatter plot of the data in all the FORMATS (sizes recorded in the result)"""
+    fig, ax = context.axes()
+    scatter.marker(ax, df, 'x', 'y', 'group')
+    folder = tempfile.mkdtemp(prefix='plotex_bench_save_')
+    save_path = os.path.join(folder, 'figure.pdf')
+
+    def run():
+        return context.plotex.save(save_path, fig=fig, formats=FORMATS)
+
+    return run, lambda: plt.close(fig)
+
+
+# name -> (whether the case is run on the dataframes, case)
+CASES = {
+    'init': (False, case_init),
+    'get_size': (False, case_get_size),
+    'update_textsize': (False, case_update_textsize),
+    'group_reduce': (True, plot_case(bar.group_reduce, group_col='group', value_col='value')),
+    'stack_count': (True, plot_case(bar.stack_count, basecol='stack', stackcol='group')),
+    'marker': (True, plot_case(scatter.marker, x='x', y='y', marker_col='group')),
+    'column_frequency': (True, plot_case(pie.column_frequency, column='group')),
+    'save': (True, case_save),
+}
+
+
+def measure(context, case, df, repeat):
+    """runs the case `repeat` times for the wall time, and once more under tracemalloc for the peak memory
+
+    Returns:
+        (median time in ms, peak memory in MB, the result of the last run)
+    """
+    timings, result = [], None
+    for _ in range(repeat):
+        run, teardown = case(context, df)
+        gc.collect()
+        start = time.perf_counter()
+        result = run()
+        timings.append((time.perf_counter() - start) * 1000)
+        teardown()
+
+    run, teardown = case(context, df)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        teardown()
+
+    return statistics.median(timings), peak / 2**20, result
+
+
+def compare(results, baseline_path, tolerance):
+    """the cases slower than (1 + tolerance) times their time in the baseline"""
+    with open(baseline_path, 'r') as f:
+        baseline = {(r['case'], r['rows'], r['categories']): r for r in json.load(f)['results']}
+
+    regressions = []
+    for result in results:
+        reference = baseline.get((result['case'], result['rows'], result['categories']))
+        if reference and result['time_ms'] > (1 + tolerance) * reference['time_ms']:
+            regressions.append(f"{result['case']} (rows={result['rows']}, categories={result['categories']}): "
+                               f"{result['time_ms']:.1f} ms vs {reference['time_ms']:.1f} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=float, nargs='+', default=ROWS, help='the dataframe sizes')
+    parser.add_argument('--categories', type=int, nargs='+', default=CATEGORIES, help='the numbers of categories')
+    parser.add_argument('--cases', nargs='+', choices=list(CASES), default=list(CASES), help='the cases to run')
+    parser.add_argument('--repeat', type=int, default=3, help='number of timed runs per case')
+    parser.add_argument('--usetex', action='store_true', help='render the text with LaTeX, as configured')
+    parser.add_argument('--output', help='path to save the results as json')
+    parser.add_argument('--compare', help='path of the baseline results to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed slowdown relative to the baseline')
+    args = parser.parse_args()
+
+    results = []
+    for name, statement in [('import plotex', 'import plotex'), ('from plotex import Plotex', 'from plotex import Plotex')]:
+        median_ms, _ = run_case(statement, repeat=args.repeat)
+        results.append({'case': name, 'rows': None, 'categories': None, 'time_ms': median_ms})
+        print(f"{name:<40} {median_ms:10.1f} ms")
+
+    context = Context(usetex=args.usetex)
+    for name in args.cases:
+        uses_data, case = CASES[name]
+        grid = [(int(rows), categories) for rows in args.rows for categories in args.categories] if uses_data \
+            else [(None, None)]
+        for rows, categories in grid:
+            df = make_frame(rows, categories) if uses_data else None
+            time_ms, peak_mb, output = measure(context, case, df, args.repeat)
+
+            result = {'case': name, 'rows': rows, 'categories': categories, 'time_ms': time_ms, 'peak_mb': peak_mb}
+            label = name if rows is None else f"{name} (rows={rows:.0e}, categories={categories})"
+            line = f"{label:<40} {time_ms:10.1f} ms {peak_mb:10.1f} MB"
+            if name == 'save':
+                result['formats'] = {fmt: {'time_ms': report['time'] * 1000, 'bytes': report['bytes']}
+                                     for fmt, report in output.items()}
+                line += '  ' + ', '.join(f"{fmt}: {report['bytes'] / 1024:.0f} KB" for fmt, report in output.items())
+            results.append(result)
+            print(line)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'matplotlib': matplotlib.__version__, 'numpy': np.__version__, 'pandas': pd.__version__,
+                       'results': results}, f, indent=2)
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        for regression in regressions:
+            print(f"[FAIL] {regression}")
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,4 +1,30 @@
-from .plotsize import Sizing
-from .configuration import BackendConfiguration
-from .utils import save, set_text
-from .main import Plotex, plotex
\ No newline at end of file
+import importlib
+
+# The submodules pull in matplotlib (and seaborn/requests when needed), so they are only
+# imported when one of their attributes is first accessed
+_LAZY_ATTRIBUTES = {
+    'Sizing': 'plotex.plotsize',
+    'BackendConfiguration': 'plotex.configuration',
+    'save': 'plotex.utils.general',
+    'set_text': 'plotex.utils.plotting',
+    'Plotex': 'plotex.main',
+    'plotex': 'plotex.main',
+    'style': 'plotex.main',
+    'figure': 'plotex.profiles',
+    'StyleProfile': 'plotex.profiles',
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+    globals()[name] = value # cache, so __getattr__ is not called again
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,4 @@
+import sys
+from plotex.cli import main
+
+sys.exit(main())
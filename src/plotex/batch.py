@@ -0,0 +1,314 @@
+import os
+import time
+import shutil
+import tempfile
+import importlib
+import traceback
+import concurrent.futures
+import numpy as np
+import matplotlib
+import matplotlib.pyplot as plt
+from plotex.utils.plotting import set_text
+from plotex.utils.general import save
+from plotex.utils.hashing import figure_key
+from plotex.configuration.modes import rasterize_dense
+
+
+# the modules in which the helpers given by name are looked up (see `resolve_helper`)
+HELPER_MODULES = ('plotex.plotting',)
+
+# the `Plotex` object of the current worker process, created once by `_init_worker`
+_PLOTEX = None
+# the shared dataframes loaded by the current process, keyed by their token
+_FRAMES = {}
+
+
+class SharedFrame():
+    """handle to a dataframe stored once as memory-mapped column files, sent to the workers instead of the data"""
+
+    def __init__(self, token, folder, columns, index):
+        self.token = token
+        self.folder = folder
+        self.columns = columns
+        self.index = index
+
+
+    @classmethod
+    def create(cls, df, folder):
+        """stores the dataframe in the folder, numeric columns as `.npy` files (memory-mapped on load) \
+        and other columns (including the categorical, nullable and string ones) as pickles
+
+        Args:
+            df: the dataframe
+            folder: the folder to store the columns in
+
+        Returns:
+            the SharedFrame
+        """
+        import pandas as pd
+
+        os.makedirs(folder, exist_ok=True)
+        columns = []
+        for i, (name, series) in enumerate(df.items()):
+            if isinstance(series.dtype, np.dtype) and series.dtype.kind in 'biufcmM': # not the extension dtypes
+                fpath = os.path.join(folder, f"{i}.npy")
+                np.save(fpath, series.to_numpy(), allow_pickle=False)
+            else:
+                fpath = os.path.join(folder, f"{i}.pkl")
+                series.reset_index(drop=True).to_pickle(fpath)
+            columns.append((name, fpath))
+
+        index_path = os.path.join(folder, "index.pkl")
+        pd.to_pickle(df.index, index_path)
+
+        return cls(token=os.path.abspath(folder), folder=folder, columns=columns, index=index_path)
+
+
+    def load(self):
+        """loads the dataframe, memory-mapping the numeric columns (cached per process). The other columns keep
+        their dtype (e.g. categorical, nullable or string)
+
+        Returns:
+            the dataframe
+        """
+        if self.token in _FRAMES:
+            return _FRAMES[self.token]
+
+        import pandas as pd
+
+        data = {}
+        for name, fpath in self.columns:
+            if fpath.endswith('.npy'):
+                data[name] = np.load(fpath, mmap_mode='r')
+            else:
+                data[name] = pd.read_pickle(fpath).array # the extension array, keeping the dtype
+        index = pd.read_pickle(self.index)
+
+        df = pd.DataFrame(data, index=index, copy=False)
+        _FRAMES[self.token] = df
+        return df
+
+
+def resolve_helper(plot, modules=None):
+    """resolves the plotting helper of a spec. Helpers given by name are only looked up in the allowed
+    modules (and their submodules), so a spec can't call arbitrary importable functions
+
+    Args:
+        plot: a callable `(ax, df, **kwargs)`, or the name of a helper in `plotex.plotting` \
+            (e.g. 'bar.group_reduce') or a fully qualified name in an allowed module
+            (e.g. 'package.module.function')
+        modules: the allowed modules, defaults to None (HELPER_MODULES)
+
+    Raises:
+        ValueError: if the name is not a public function of an allowed module
+
+    Returns:
+        the helper function
+    """
+    if callable(plot):
+        return plot
+
+    modules = HELPER_MODULES if modules is None else tuple(modules)
+    def allowed(name):
+        return any(name == module or name.startswith(f"{module}.") for module in modules)
+
+    module_name, _, func_name = str(plot).rpartition('.')
+    candidates = [f"plotex.plotting.{module_name}" if module_name else "plotex.plotting", module_name]
+    for candidate in candidates:
+        if not candidate or not allowed(candidate):
+            continue
+        try:
+            module = importlib.import_module(candidate)
+        except ImportError:
+            continue
+        helper = getattr(module, func_name, None)
+        # only the public functions defined in the allowed modules (not the ones they import)
+        if (callable(helper) and not func_name.startswith('_') and
+                allowed(getattr(helper, '__module__', None) or '')):
+            return helper
+
+    raise ValueError(f"Unknown plotting helper: {plot} (helpers given by name are looked up in {', '.join(modules)})")
+
+
+def read_data(data):
+    """reads the data of a spec
+
+    Args:
+        data: a dataframe, a SharedFrame or a file path (csv, parquet, feather, json, pickle)
+
+    Returns:
+        the dataframe
+    """
+    if isinstance(data, SharedFrame):
+        return data.load()
+    if not isinstance(data, (str, os.PathLike)):
+        return data
+
+    import pandas as pd
+
+    readers = {'.csv': pd.read_csv, '.parquet': pd.read_parquet, '.feather': pd.read_feather,
+               '.json': pd.read_json, '.pkl': pd.read_pickle, '.pickle': pd.read_pickle}
+    extension = os.path.splitext(str(data))[1].lower()
+    if extension not in readers:
+        raise ValueError(f"Unsupported data file: {data}")
+
+    return readers[extension](data)
+
+
+def render_spec(plotex, spec, helper_modules=None):
+    """renders a single figure spec
+
+    Args:
+        plotex: the (initialized) Plotex object
+        spec: the figure spec, a dict with the keys
+            `plot`: the plotting helper (see `resolve_helper`),
+            `save_path`: the output path,
+            `data`: the dataframe or file path, defaults to None,
+            `kwargs`: keyword arguments for the helper, defaults to {},
+            `size`: keyword arguments for `Plotex.skeleton` (e.g. publisher, fraction, subplots), defaults to {},
+            `text`: keyword arguments for `set_text`, defaults to None,
+            `format`: the output format, defaults to 'pdf',
+            `formats`: list of output formats drawn together (see `save`), defaults to None
+        helper_modules: the modules of the helpers given by name (see `resolve_helper`), defaults
+            to None (HELPER_MODULES)
+
+    With the figure cache of the Plotex object enabled, a spec whose inputs (data, helper, arguments, style
+    and versions) are unchanged is copied from the cache without building the figure
+
+    Returns:
+        dict with the `save_path`, the `time` taken in seconds (total and per `stages`), whether it was
+        `cached` and the `error` if any
+    """
+    timings = {}
+    result = {'save_path': spec.get('save_path'), 'time': None, 'stages': timings, 'cached': False, 'error': None}
+    cache = getattr(plotex, 'figure_cache', None)
+    start = stage_start = time.perf_counter()
+    fig = None
+
+    def end_stage(name):
+        nonlocal stage_start
+        now = time.perf_counter()
+        timings[name] = now - stage_start
+        stage_start = now
+
+    try:
+        helper = resolve_helper(spec['plot'], modules=helper_modules)
+        df = read_data(spec.get('data'))
+        size = dict(spec.get('size', {}))
+        subplots = size.get('subplots', (1, 1))
+        end_stage('load')
+
+        with plotex.style(**size) as figsize:
+            save_kwargs = {'format': spec.get('format', 'pdf'), 'formats': spec.get('formats')}
+            cache_key = None
+            if cache is not None: # the key depends on the style, so it is computed in the scope
+                try:
+                    cache_key = figure_key(df, spec['plot'], spec.get('kwargs', {}), size=size, text=spec.get('text'))
+                except TypeError: # e.g. a callable argument without a stable hash, not cached
+                    pass
+            if cache_key is not None:
+                save_kwargs.update(cache=cache, cache_key=cache_key)
+                result['cached'] = save(spec['save_path'], **save_kwargs) is not None
+
+            if result['cached']:
+                end_stage('save')
+            else:
+                fig, ax = plt.subplots(*subplots, figsize=figsize)
+                end_stage('setup')
+
+                helper(ax, df, **spec.get('kwargs', {}))
+                if spec.get('text'):
+                    set_text(ax=ax, **spec['text'])
+                end_stage('draw')
+
+                if getattr(plotex, 'mode', 'final') == 'draft':
+                    rasterize_dense(fig)
+                save(spec['save_path'], fig=fig, **save_kwargs)
+                end_stage('save')
+    except Exception:
+        result['error'] = traceback.format_exc()
+    finally:
+        if fig is not None:
+            plt.close(fig)
+
+    result['time'] = time.perf_counter() - start
+    return result
+
+
+def _init_worker(config_kwargs):
+    """sets up the worker once: Agg backend and the plotex configuration"""
+    global _PLOTEX
+    matplotlib.use('Agg')
+
+    from plotex.main import Plotex
+    _PLOTEX = Plotex(**config_kwargs)
+
+
+def _render_in_worker(spec, helper_modules=None):
+    return render_spec(_PLOTEX, spec, helper_modules=helper_modules)
+
+
+def _share_frames(specs, folder):
+    """replaces the dataframes in the specs by SharedFrame handles, storing each distinct dataframe once"""
+    shared, shared_specs = {}, []
+    for spec in specs:
+        data = spec.get('data')
+        if data is not None and hasattr(data, 'items') and hasattr(data, 'index'): # a dataframe
+            if id(data) not in shared:
+                shared[id(data)] = SharedFrame.create(data, os.path.join(folder, f"frame_{len(shared)}"))
+            spec = dict(spec, data=shared[id(data)])
+        shared_specs.append(spec)
+
+    return shared_specs
+
+
+def render_batch(specs, workers=None, plotex=None, helper_modules=None, **config_kwargs):
+    """renders independent figure specs in a process pool. Each worker initializes the configuration once
+    and uses the Agg backend, and the dataframes are shared with the workers through memory-mapped files
+    (instead of being pickled per task)
+
+    Args:
+        specs: list of figure specs (see `render_spec`)
+        workers: the number of worker processes, defaults to None (the number of cpus). If 1 (or 0), the specs
+            are rendered serially in the current process
+        plotex: the Plotex object to render with in the serial case, defaults to None. With several
+            workers, each worker creates its own Plotex object from the configuration parameters of
+            this one (updated with `config_kwargs`)
+        helper_modules: the modules of the helpers given by name (see `resolve_helper`), defaults
+            to None (HELPER_MODULES)
+        **config_kwargs: the configuration parameters for the workers (see `Plotex.init`)
+
+    Returns:
+        list of results (see `render_spec`) in the order of the specs
+    """
+    specs = list(specs)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(specs))
+
+    if workers <= 1:
+        if plotex is None:
+            from plotex.main import Plotex
+            plotex = Plotex(**config_kwargs)
+        return [render_spec(plotex, spec, helper_modules=helper_modules) for spec in specs]
+
+    if plotex is not None:
+        config_kwargs = {**getattr(plotex, 'kwargs', {}), **config_kwargs}
+
+    folder = tempfile.mkdtemp(prefix='plotex_batch_')
+    try:
+        shared_specs = _share_frames(specs, folder)
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                                    initargs=(config_kwargs,)) as executor:
+            futures = [executor.submit(_render_in_worker, spec, helper_modules) for spec in shared_specs]
+            results = []
+            for spec, future in zip(specs, futures):
+                try:
+                    results.append(future.result())
+                except Exception: # e.g. the spec could not be pickled or the worker died
+                    results.append({'save_path': spec.get('save_path'), 'time': None, 'stages': {},
+                                    'error': traceback.format_exc()})
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    return results
@@ -0,0 +1,402 @@
+"""Command line interface of plotex
+
+    plotex serve [--socket PATH] [--watch spec.json ...]   starts a warm render daemon
+    plotex render spec.json [--socket PATH] [--watch]      renders the specs (in the daemon if one is running)
+    plotex stop [--socket PATH]                            stops the daemon
+
+The daemon keeps an interpreter with matplotlib, seaborn and the plotex configs loaded, and renders the
+figure specs it receives over a local Unix socket, so each figure only costs its draw and encoding. A spec
+file is a json list of figure specs (see `batch.render_spec`, with `plot` given by name), or an object with
+the `specs` and the `config` (the arguments of `Plotex`). Relative `data` and `save_path` are resolved
+against the folder of the spec file. The helpers given by name are only looked up in `plotex.plotting`, unless
+other modules are allowed with `--allow-module`.
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import threading
+import contextlib
+import socketserver
+from plotex.utils.cache import cache_dir
+
+
+def default_socket():
+    """the default socket path of the daemon (in the user cache directory)"""
+    return os.path.join(cache_dir(), 'render.sock')
+
+
+def load_specs(fpath, mode=None):
+    """reads a spec file, resolving the relative data and output paths against its folder (the output
+    folders are created)
+
+    Args:
+        fpath: the path of the spec file
+        mode: the render mode overriding the configuration, defaults to None
+
+    Returns:
+        (list of specs, dict of the Plotex configuration)
+    """
+    with open(fpath, 'r') as f:
+        content = json.load(f)
+
+    specs, config = (content, {}) if isinstance(content, list) else (content['specs'], content.get('config', {}))
+    folder = os.path.dirname(os.path.abspath(fpath))
+    for spec in specs:
+        for key in ('data', 'save_path'):
+            if isinstance(spec.get(key), str):
+                spec[key] = os.path.join(folder, os.path.expanduser(spec[key]))
+        if isinstance(spec.get('save_path'), str):
+            os.makedirs(os.path.dirname(spec['save_path']), exist_ok=True)
+    if mode is not None:
+        config = {**config, 'mode': mode}
+
+    return specs, config
+
+
+def _config_key(config):
+    return json.dumps(config, sort_keys=True, default=str)
+
+
+class RenderServer():
+    """warm render daemon: renders the figure specs received over a Unix socket (newline delimited json
+    requests and responses) with one initialized Plotex object per configuration, and optionally re-renders
+    spec files when they or their data files change"""
+
+    def __init__(self, socket_path=None, config=None, interval=1.0, helper_modules=None):
+        """initialize the daemon
+
+        Args:
+            socket_path: the path of the socket, defaults to None (`default_socket`)
+            config: the default Plotex configuration, defaults to None
+            interval: the polling interval of the watched files in seconds, defaults to 1.0
+            helper_modules: the modules whose helpers the specs can use, defaults to None
+                (`batch.HELPER_MODULES`, the plotex helpers only)
+        """
+        if not hasattr(socket, 'AF_UNIX'):
+            raise Exception("The render daemon needs Unix sockets, which are not available on this platform!")
+
+        self.socket_path = socket_path or default_socket()
+        self.config = config or {}
+        self.interval = interval
+        self.helper_modules = helper_modules
+        self.plotexes = {} # config key -> Plotex
+        self.active = None # the config key of the last render
+        self.frames = {} # data path -> (stamp, dataframe)
+        self.watched = {} # spec file -> (stamps of the spec and data files, render mode)
+        self.lock = threading.Lock() # pyplot is not thread-safe, so the renders are serialized
+        self.stopped = threading.Event()
+        self.server = None
+
+
+    def warm(self):
+        """loads matplotlib, the plotting helpers and the default configuration, and draws an empty figure
+        (font cache, Agg renderer)"""
+        import matplotlib
+        matplotlib.use('Agg')
+        import io
+        import importlib
+        import matplotlib.pyplot as plt
+
+        for module in ('bar', 'line', 'pie', 'scatter'):
+            importlib.import_module(f"plotex.plotting.{module}")
+        self.__plotex(self.config)
+
+        fig, ax = plt.subplots()
+        ax.set_title('plotex')
+        with contextlib.suppress(Exception): # e.g. LaTeX is not installed, reported by the specs instead
+            fig.savefig(io.BytesIO(), format='png')
+        plt.close(fig)
+
+
+    def __plotex(self, config):
+        from plotex.main import Plotex
+
+        key = _config_key(config)
+        if key not in self.plotexes:
+            self.plotexes[key] = Plotex(**config)
+        elif key != self.active: # another configuration was applied since
+            self.plotexes[key].config.initialize()
+        self.active = key
+        return self.plotexes[key]
+
+
+    def __frame(self, fpath):
+        """the dataframe of a data file, read again only if the file changed"""
+        from plotex.batch import read_data
+
+        stamp = _stamp(fpath)
+        cached = self.frames.get(fpath)
+        if cached is None or cached[0] != stamp:
+            self.frames[fpath] = cached = (stamp, read_data(fpath))
+        return cached[1]
+
+
+    def render(self, specs, config=None):
+        """renders the specs (see `batch.render_spec`)
+
+        Args:
+            specs: list of figure specs
+            config: the Plotex configuration, defaults to None (the default of the daemon)
+
+        Returns:
+            list of results (see `batch.render_spec`)
+        """
+        from plotex.batch import render_spec
+
+        with self.lock:
+            plotex = self.__plotex(self.config if config is None else config)
+            results = []
+            for spec in specs:
+                spec = dict(spec)
+                try:
+                    if isinstance(spec.get('data'), str):
+                        spec['data'] = self.__frame(spec['data'])
+                except Exception as e: # reported like the other errors of the spec
+                    results.append({'save_path': spec.get('save_path'), 'time': None, 'stages': {},
+                                    'error': f"{type(e).__name__}: {e}"})
+                    continue
+                results.append(render_spec(plotex, spec, helper_modules=self.helper_modules))
+            return results
+
+
+    def watch(self, fpath, mode=None):
+        """renders a spec file now, and again whenever it or its data files change
+
+        Args:
+            fpath: the path of the spec file
+            mode: the render mode overriding the spec file, defaults to None
+
+        Returns:
+            list of results of the first render
+        """
+        fpath = os.path.abspath(fpath)
+        specs, config = load_specs(fpath, mode=mode)
+        self.watched[fpath] = (_spec_stamps(fpath, specs), mode)
+        return self.render(specs, config=config)
+
+
+    def __poll(self):
+        while not self.stopped.wait(self.interval):
+            for fpath, (stamps, mode) in list(self.watched.items()):
+                try:
+                    specs, config = load_specs(fpath, mode=mode)
+                    current = _spec_stamps(fpath, specs)
+                    if current == stamps:
+                        continue
+                    self.watched[fpath] = (current, mode)
+                    report(self.render(specs, config=config), prefix=f"{os.path.basename(fpath)}: ")
+                except Exception as e: # e.g. a spec file being written, retried on the next poll
+                    print(f"[INFO] Could not re-render {fpath} ({type(e).__name__}: {e})")
+
+
+    def handle(self, request):
+        """the response to a request: `{"command": "render", "specs": [...], "config": {...}}`,
+        `{"command": "watch", "spec_file": path, "mode": mode}`, `{"command": "ping"}` or `{"command": "stop"}`"""
+        command = request.get('command', 'render')
+        if command == 'render':
+            return {'ok': True, 'results': self.render(request['specs'], config=request.get('config'))}
+        if command == 'watch':
+            return {'ok': True, 'results': self.watch(request['spec_file'], mode=request.get('mode'))}
+        if command == 'ping':
+            return {'ok': True, 'pid': os.getpid(), 'watched': list(self.watched)}
+        if command == 'stop':
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return {'ok': True}
+        return {'ok': False, 'error': f"Unknown command: {command}"}
+
+
+    def serve_forever(self, watch=()):
+        """binds the socket and serves the requests until `shutdown` (or a `stop` request)
+
+        Args:
+            watch: the spec files to watch, defaults to ()
+        """
+        if os.path.exists(self.socket_path):
+            if is_running(self.socket_path):
+                raise Exception(f"A render daemon is already running at {self.socket_path}!")
+            os.remove(self.socket_path) # left by a daemon that did not exit cleanly
+        os.makedirs(os.path.dirname(os.path.abspath(self.socket_path)), exist_ok=True)
+
+        self.warm()
+        for fpath in watch:
+            report(self.watch(fpath), prefix=f"{os.path.basename(fpath)}: ")
+
+        server = self
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    try:
+                        response = server.handle(json.loads(line))
+                    except Exception as e:
+                        response = {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+                    self.wfile.write(json.dumps(response, default=str).encode('utf-8') + b'\n')
+                    self.wfile.flush()
+
+        self.server = socketserver.UnixStreamServer(self.socket_path, Handler)
+        poller = threading.Thread(target=self.__poll, name='plotex-watch', daemon=True)
+        poller.start()
+        print(f"[INFO] Serving on {self.socket_path} (pid {os.getpid()})")
+        try:
+            self.server.serve_forever()
+        finally:
+            self.stopped.set()
+            self.server.server_close()
+            with contextlib.suppress(OSError):
+                os.remove(self.socket_path)
+
+
+    def shutdown(self):
+        """stops serving (from another thread than `serve_forever`)"""
+        self.stopped.set()
+        if self.server is not None:
+            self.server.shutdown()
+
+
+def _stamp(fpath):
+    try:
+        stat = os.stat(fpath)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _spec_stamps(fpath, specs):
+    """the modification stamps of a spec file and its data files"""
+    paths = [fpath] + [spec['data'] for spec in specs if isinstance(spec.get('data'), str)]
+    return {path: _stamp(path) for path in paths}
+
+
+def request(message, socket_path=None, timeout=None):
+    """sends a request to the daemon
+
+    Args:
+        message: the request (see `RenderServer.handle`)
+        socket_path: the path of the socket, defaults to None (`default_socket`)
+        timeout: the timeout in seconds, defaults to None (no timeout)
+
+    Returns:
+        the response
+
+    Raises:
+        OSError: if no daemon is listening on the socket
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(socket_path or default_socket())
+        client.sendall(json.dumps(message, default=str).encode('utf-8') + b'\n')
+        with client.makefile('rb') as f:
+            line = f.readline()
+    if not line:
+        raise ConnectionError("The render daemon closed the connection!")
+    return json.loads(line)
+
+
+def is_running(socket_path=None):
+    """whether a daemon is listening on the socket"""
+    if not hasattr(socket, 'AF_UNIX'):
+        return False
+    try:
+        return request({'command': 'ping'}, socket_path=socket_path, timeout=5).get('ok', False)
+    except OSError:
+        return False
+
+
+def report(results, prefix=''):
+    """prints the results of a render
+
+    Returns:
+        the number of failed specs
+    """
+    failed = 0
+    for result in results:
+        if result.get('error'):
+            failed += 1
+            print(f"[ERROR] {prefix}{result.get('save_path')}:\n{result['error']}")
+        else:
+            cached = ', cached' if result.get('cached') else ''
+            print(f"[INFO] {prefix}Saved {result.get('save_path')} ({result['time']:.3f}s{cached})")
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='plotex', description='Render plotex figure specs')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    serve = subparsers.add_parser('serve', help='start a warm render daemon')
+    serve.add_argument('--socket', help='the socket path, defaults to render.sock in the cache directory')
+    serve.add_argument('--watch', nargs='+', default=[], help='spec files to re-render when they or their data change')
+    serve.add_argument('--interval', type=float, default=1.0, help='the polling interval of the watched files')
+    serve.add_argument('--config', default='{}', help='the Plotex configuration as json (e.g. \'{"palette": "deep"}\')')
+    serve.add_argument('--mode', choices=['final', 'draft'], help='the default render mode')
+    serve.add_argument('--allow-module', action='append', default=[], dest='allow_modules',
+                       help='a module (with its submodules) whose functions the specs can use as helpers, besides plotex.plotting')
+
+    render = subparsers.add_parser('render', help='render a spec file, in the daemon if one is running')
+    render.add_argument('spec', help='the spec file (json)')
+    render.add_argument('--socket', help='the socket path of the daemon')
+    render.add_argument('--watch', action='store_true', help='ask the daemon to re-render the specs when they change')
+    render.add_argument('--workers', type=int, default=None, help='worker processes when rendering without the daemon')
+    render.add_argument('--mode', choices=['final', 'draft'], help='the render mode (overrides the spec file)')
+    render.add_argument('--allow-module', action='append', default=[], dest='allow_modules',
+                        help='a module whose functions the specs can use as helpers when rendering without the daemon')
+
+    stop = subparsers.add_parser('stop', help='stop the render daemon')
+    stop.add_argument('--socket', help='the socket path of the daemon')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        config = json.loads(args.config)
+        if args.mode:
+            config['mode'] = args.mode
+        from plotex.batch import HELPER_MODULES
+
+        server = RenderServer(socket_path=args.socket, config=config, interval=args.interval,
+                              helper_modules=HELPER_MODULES + tuple(args.allow_modules))
+        try:
+            server.serve_forever(watch=args.watch)
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    if args.command == 'stop':
+        if not is_running(args.socket):
+            print(f"[INFO] No render daemon is running at {args.socket or default_socket()}")
+            return 1
+        request({'command': 'stop'}, socket_path=args.socket)
+        return 0
+
+    start = time.perf_counter()
+    if is_running(args.socket):
+        if args.watch:
+            response = request({'command': 'watch', 'spec_file': os.path.abspath(args.spec), 'mode': args.mode},
+                               socket_path=args.socket)
+        else:
+            specs, config = load_specs(args.spec, mode=args.mode)
+            response = request({'command': 'render', 'specs': specs, 'config': config}, socket_path=args.socket)
+        if not response.get('ok'):
+            print(f"[ERROR] {response.get('error')}")
+            return 1
+        results = response['results']
+    else:
+        if args.watch:
+            print("[ERROR] Watching needs a running daemon (start it with `plotex serve`)")
+            return 1
+        import matplotlib
+        matplotlib.use('Agg')
+        from plotex.batch import render_batch, HELPER_MODULES
+
+        specs, config = load_specs(args.spec, mode=args.mode)
+        results = render_batch(specs, workers=args.workers, helper_modules=HELPER_MODULES + tuple(args.allow_modules),
+                               **config)
+
+    failed = report(results)
+    print(f"[INFO] Rendered {len(results) - failed}/{len(results)} figure(s) in {time.perf_counter() - start:.2f}s")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
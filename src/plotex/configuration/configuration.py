@@ -1,19 +1,24 @@
-import requests
 import os
-import matplotlib.pyplot as plt
-import seaborn as sns
-from plotex.utils.general import check_if_exists, save_file, combine_hash, find_value_from_keys
+import matplotlib
+from plotex.utils.general import check_if_exists, combine_hash, find_value_from_keys
 from plotex.utils.hashing import hash_url
+from plotex.utils.cache import cache_dir
+from plotex.utils.profiling import span
+from plotex.utils.fetching import fetch_if_modified, DEFAULT_TIMEOUT
+from plotex.configuration.snapshot import load_snapshot, apply_snapshot
+from plotex.configuration.modes import MODES, apply_draft, restore_final
 
 
 class BackendConfiguration():
     
-    CONFIG_FILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config_files/config.txt")
+    CONFIG_FILE_PATH = os.path.join(cache_dir(), "config.txt")
+    DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config_files/default_config.txt")
     CONFIG_URL = "https://gist.githubusercontent.com/rg089/26d06984604c92cf452e77ee345434ea/raw/98730d2afa1be6381b4c9c0f6f18da440200fc9a/latex_plots.txt"
     
     
-    def __init__(self, url=None, override=False, **kwargs):
-        """initializing the configuration class
+    def __init__(self, url=None, override=False, refresh=False, timeout=DEFAULT_TIMEOUT, mode='final', **kwargs):
+        """initializing the configuration class. The default config is bundled with the package,
+        so the network is only used for a custom url or when a refresh is asked for
 
         Args:
             url: the url of the config to create a new config, defaults
@@ -21,52 +26,66 @@ class BackendConfiguration():
             override: if the config from the specified link already
                 exists, whether to create it again (used if in-place
                 changes have been made to the url)
+            refresh: whether to revalidate the cached config against the
+                url (using ETag/Last-Modified), defaults to False
+            timeout: the timeout in seconds for fetching the config,
+                defaults to DEFAULT_TIMEOUT
+            mode: 'final' for the configured style, or 'draft' for cheap
+                previews with the same layout (see `modes.draft_params`),
+                defaults to 'final'
             kwargs: other keyword arguments can include arguments for theme, style, palette etc.
         """
+        self.url = url
         if url is None:
             self.url = BackendConfiguration.CONFIG_URL
         self.override = override
+        self.refresh = refresh
+        self.timeout = timeout
+        assert mode in MODES, f"mode should be one of {MODES}"
+        self.mode = mode
         
         self.style = None
         self.palette = None
+        self.content_path = None
         self.__init_theme(**kwargs)
 
 
-    def __fetch_content(self, url):
-        """fetches the config params from the url if not locally present
-
-        Raises:
-            Exception: if issue in fetching and decoding
-
-        Returns:
-            returns the content from the url
-        """
-        print(f"[INFO] Fetching configuration parameters from {url}!")
-        try:
-            r = requests.get(url)
-            content = r.content.decode()
-        except:
-            raise Exception('An error occured while fetching and decoding the url content')
-        
-        return content
-
-
+    def __is_cached(self, fpath):
+        """whether a valid cached config exists (empty/corrupt files are removed)"""
+        if not check_if_exists(fpath):
+            return False
+        if os.path.getsize(fpath) == 0:
+            print(f"[INFO] Removing the corrupt cache file {fpath}!")
+            os.remove(fpath)
+            return False
+        return True
+    
+    
     def __generate_content_path(self):
-        """creates the config by using a cached file, or fetching from the internet if cached file not present
+        """creates the config by using a cached file, the bundled default or fetching from the internet
+        (only if refreshing/overriding, or if a custom url is not cached yet)
 
         Returns:
             the file path of the config file
         """
         url_hash = hash_url(self.url)
         fpath = combine_hash(BackendConfiguration.CONFIG_FILE_PATH, url_hash)
+        is_default = self.url == BackendConfiguration.CONFIG_URL
         
-        exists = check_if_exists(fpath)
-        if exists and not self.override: # If file exists and we don't need to override
+        if self.refresh or self.override:
+            try:
+                fetch_if_modified(url=self.url, fpath=fpath, timeout=self.timeout, force=self.override)
+            except Exception as e:
+                if not (self.__is_cached(fpath) or is_default): raise
+                print(f"[INFO] Could not refresh the configuration, using the local copy! ({e})")
+        
+        if self.__is_cached(fpath):
             return fpath
         
-        content = self.__fetch_content(url=self.url)
-        save_file(content=content, fpath=fpath)
+        if is_default:
+            return BackendConfiguration.DEFAULT_CONFIG_PATH
         
+        fetch_if_modified(url=self.url, fpath=fpath, timeout=self.timeout, force=True)
         return fpath
     
     
@@ -84,18 +103,24 @@ class BackendConfiguration():
     
     def reset(self):
         """reset the parameters to the original matplotlib ones"""
-        plt.rcdefaults()
+        matplotlib.rcdefaults()
         
         
     def initialize(self):
-        """initializes the configuration file by setting the style from the config file"""
-                
-        if self.style is not None:
-            sns.set_style(self.style)
-        
-        # Nothe that the settings in the config file will override the conflicting ones in the specified seaborn style
-        final_path = self.__generate_content_path()
-        plt.style.use(final_path)
+        """initializes the configuration file by setting the style from the config file. The resolved
+        rcParams are compiled once (and cached on disk), after which only the differing keys are updated.
+        In the draft mode, the draft overrides are applied on top (see `modes.draft_params`)"""
         
-        if self.palette is not None:
-            sns.set_palette(self.palette)
\ No newline at end of file
+        with span('config.initialize'):
+            if self.content_path is None: # Fetch/refresh only once per configuration
+                with span('config.resolve'):
+                    self.content_path = self.__generate_content_path()
+            
+            with span('config.load_snapshot'):
+                snapshot = load_snapshot(self.content_path, style=self.style, palette=self.palette)
+            with span('config.apply_snapshot'):
+                if self.mode != 'draft':
+                    restore_final()
+                apply_snapshot(snapshot)
+                if self.mode == 'draft':
+                    apply_draft()
@@ -0,0 +1,91 @@
+import matplotlib
+import matplotlib.lines
+import matplotlib.collections
+from plotex.utils.params import set_params
+
+
+# the render modes: 'final' is the configured (publication) style, 'draft' a cheap preview of the same layout
+MODES = ('final', 'draft')
+
+# the resolution of the drafts
+DRAFT_DPI = 72
+
+# the number of points above which the artists of a draft are rasterized in vector formats
+DRAFT_RASTERIZE_ABOVE = 5000
+
+# the final values of the rcParams changed by the draft mode (the rcParams are global, so shared by the configurations)
+_FINAL_PARAMS = {}
+
+
+def draft_params(params=None, dpi=DRAFT_DPI):
+    """the rcParams overrides of the draft mode: the text is rendered with mathtext instead of LaTeX (with the
+    Computer Modern fonts bundled with matplotlib, so the text metrics stay close), the raster formats are
+    saved at a lower dpi and without the tight bounding box. The figure size and the font sizes are not
+    changed, so the layout of the axes matches the final render
+
+    Args:
+        params: the rcParams of the final mode, defaults to None (the current rcParams)
+        dpi: the resolution, defaults to DRAFT_DPI
+
+    Returns:
+        dict of rcParams
+    """
+    params = matplotlib.rcParams if params is None else params
+    overrides = {'text.usetex': False, 'savefig.dpi': dpi, 'savefig.bbox': None}
+    if params['text.usetex']:
+        overrides['mathtext.fontset'] = 'cm'
+        overrides['axes.formatter.use_mathtext'] = True # cmr10 has no minus sign
+        overrides['font.serif'] = ['cmr10'] + [font for font in params['font.serif'] if font != 'cmr10']
+    return overrides
+
+
+def apply_draft():
+    """applies the draft overrides (after the configuration), recording the final values of the keys they change
+
+    Returns:
+        the number of updated keys
+    """
+    overrides = draft_params()
+    for key in overrides:
+        _FINAL_PARAMS.setdefault(key, matplotlib.rcParams[key])
+    return set_params(overrides)
+
+
+def restore_final():
+    """restores the final values of the keys changed by the draft mode (before the configuration is applied)
+
+    Returns:
+        the number of updated keys
+    """
+    updated = set_params(_FINAL_PARAMS)
+    _FINAL_PARAMS.clear()
+    return updated
+
+
+def point_count(artist):
+    """the number of points (or paths) drawn by an artist"""
+    if isinstance(artist, matplotlib.lines.Line2D):
+        return len(artist.get_xdata())
+    if isinstance(artist, matplotlib.collections.Collection):
+        return max(len(artist.get_offsets()), len(artist.get_paths()))
+    return 0
+
+
+def rasterize_dense(fig, threshold=DRAFT_RASTERIZE_ABOVE):
+    """rasterizes the artists drawing more than `threshold` points (lines and collections), keeping
+    the text and axes as vectors
+
+    Args:
+        fig: the figure
+        threshold: the number of points, defaults to DRAFT_RASTERIZE_ABOVE
+
+    Returns:
+        the number of rasterized artists
+    """
+    rasterized = 0
+    for ax in fig.axes:
+        for artist in [*ax.lines, *ax.collections]:
+            if not artist.get_rasterized() and point_count(artist) > threshold:
+                artist.set_rasterized(True)
+                rasterized += 1
+    return rasterized
@@ -0,0 +1,130 @@
+import os
+import pickle
+import hashlib
+import functools
+from importlib import metadata
+import matplotlib
+from plotex.utils.params import set_params
+from plotex.utils.cache import cache_dir, atomic_write
+
+
+SNAPSHOT_DIR = os.path.join(cache_dir(), "snapshots")
+
+# resolved snapshots for the current process, keyed by `snapshot_key`
+_SNAPSHOTS = {}
+
+
+@functools.lru_cache(maxsize=None)
+def _versions():
+    return (matplotlib.__version__, metadata.version('seaborn'))
+
+
+def snapshot_key(path, style=None, palette=None):
+    """creates the key of a compiled snapshot. The key changes whenever the config file, the
+    style/palette or the matplotlib/seaborn versions change
+
+    Args:
+        path: the path of the style config file
+        style: the seaborn style, defaults to None
+        palette: the seaborn palette, defaults to None
+
+    Returns:
+        the key string
+    """
+    stat = os.stat(path)
+    key = repr((os.path.abspath(path), stat.st_mtime_ns, stat.st_size, style, palette, _versions()))
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def compile_snapshot(path, style=None, palette=None):
+    """resolves the rcParams set by the seaborn style, the style config file and the palette
+    (in that order), without changing the current rcParams
+
+    Args:
+        path: the path of the style config file
+        style: the seaborn style, defaults to None
+        palette: the seaborn palette, defaults to None
+
+    Returns:
+        dict of the resolved (validated) rcParams
+    """
+    import matplotlib.style
+    import seaborn as sns # seaborn is only needed when (re)compiling
+
+    keys = set(matplotlib.rc_params_from_file(path, use_default_template=False).keys())
+    keys.discard('backend')
+
+    with matplotlib.rc_context():
+        if style is not None:
+            keys.update(sns.axes_style(style).keys())
+            sns.set_style(style)
+
+        # Note that the settings in the config file will override the conflicting ones in the specified seaborn style
+        matplotlib.style.use(path)
+
+        if palette is not None:
+            keys.add('axes.prop_cycle')
+            sns.set_palette(palette)
+
+        snapshot = {k: matplotlib.rcParams[k] for k in sorted(keys)}
+
+    return snapshot
+
+
+def _snapshot_path(key):
+    return os.path.join(SNAPSHOT_DIR, f"snapshot_{key}.pkl")
+
+
+def _read_snapshot(fpath):
+    try:
+        with open(fpath, 'rb') as f:
+            snapshot = pickle.load(f)
+    except Exception: # missing, truncated or from an incompatible version
+        return None
+
+    return snapshot if isinstance(snapshot, dict) else None
+
+
+def _write_snapshot(snapshot, fpath):
+    try:
+        with atomic_write(fpath, mode='wb') as f:
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError as e:
+        print(f"[INFO] Could not save the compiled configuration! ({e})")
+
+
+def load_snapshot(path, style=None, palette=None):
+    """loads the compiled snapshot from memory, or from disk, compiling (and saving) it if not present
+
+    Args:
+        path: the path of the style config file
+        style: the seaborn style, defaults to None
+        palette: the seaborn palette, defaults to None
+
+    Returns:
+        dict of the resolved rcParams
+    """
+    key = snapshot_key(path, style=style, palette=palette)
+    if key in _SNAPSHOTS:
+        return _SNAPSHOTS[key]
+
+    fpath = _snapshot_path(key)
+    snapshot = _read_snapshot(fpath)
+    if snapshot is None:
+        snapshot = compile_snapshot(path, style=style, palette=palette)
+        _write_snapshot(snapshot, fpath)
+
+    _SNAPSHOTS[key] = snapshot
+    return snapshot
+
+
+def apply_snapshot(snapshot):
+    """applies the snapshot to the global rcParams, updating only the keys that differ
+
+    Args:
+        snapshot: dict of rcParams
+
+    Returns:
+        the number of updated keys
+    """
+    return set_params(snapshot)
@@ -0,0 +1,172 @@
+import pickle
+import threading
+import concurrent.futures
+import matplotlib
+from plotex.utils.general import save
+
+
+# `savefig` keyword arguments and the rcParams they default to
+SAVEFIG_PARAMS = {'bbox_inches': 'savefig.bbox', 'pad_inches': 'savefig.pad_inches',
+                  'transparent': 'savefig.transparent', 'facecolor': 'savefig.facecolor',
+                  'edgecolor': 'savefig.edgecolor'}
+
+
+def resolve_save_kwargs(dpi=None, **savekwargs):
+    """fills the `savefig` options left to the rcParams with their current values, so a figure
+    saved later (after a `style` scope is exited) is saved as it would be now
+
+    Args:
+        dpi: the resolution, defaults to None (`savefig.dpi`)
+        **savekwargs: keyword arguments for `savefig`
+
+    Returns:
+        dict of the keyword arguments
+    """
+    savekwargs['dpi'] = matplotlib.rcParams['savefig.dpi'] if dpi is None else dpi
+    for key, param in SAVEFIG_PARAMS.items():
+        savekwargs.setdefault(key, matplotlib.rcParams[param])
+
+    return savekwargs
+
+
+def close_figure(fig):
+    """closes the figure if it is managed by pyplot (only imported if already loaded)"""
+    import sys
+    if 'matplotlib.pyplot' in sys.modules:
+        sys.modules['matplotlib.pyplot'].close(fig)
+
+
+def _init_writer():
+    matplotlib.use('Agg')
+
+
+def _save_pickled(payload, rc, save_path, kwargs):
+    """saves a pickled figure in a writer process, with the rcParams of the submitting process"""
+    fig = pickle.loads(payload)
+    with matplotlib.rc_context(rc):
+        return save(save_path, fig=fig, **kwargs)
+
+
+class ExportQueue():
+    """bounded background writer for figures: `submit` returns a future immediately, so the next figure
+    can be built while the previous ones are encoded and written. When `max_pending` figures are waiting,
+    `submit` blocks until one is written (backpressure), which bounds the memory held by unsaved figures"""
+
+    def __init__(self, workers=1, max_pending=4, processes=False, release=None):
+        """initialize the writer
+
+        Args:
+            workers: the number of writer threads/processes, defaults to 1
+            max_pending: the maximum number of figures submitted but not
+                yet written, defaults to 4
+            processes: whether to write in processes (the figures are pickled
+                on submit) instead of threads, defaults to False
+            release: function called with each written figure instead of
+                closing it (e.g. to return it to a `FigurePool`), defaults to None
+        """
+        assert max_pending >= 1, "max_pending should be at least 1"
+
+        self.processes = processes
+        self.release = release or close_figure
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.lock = threading.Lock()
+        self.idle = threading.Condition(self.lock) # notified when a figure is written
+        self.pending = {} # future -> (save_path, figure to close once written)
+        self.finished = [] # written figures, closed from the submitting thread
+        self.errors = []
+
+        if processes:
+            self.executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_writer)
+        else:
+            self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers,
+                                                                  thread_name_prefix='plotex-export')
+
+
+    def submit(self, save_path, fig=None, plt=None, **kwargs):
+        """hands the figure to the writer, blocking while the queue is full. The figure is closed (or
+        released) once written and should not be modified after being submitted
+
+        Args:
+            save_path: the save path for the figure
+            fig: the figure object, defaults to None
+            plt: the plt object (its current figure is saved if `fig`
+                is None), defaults to None
+            **kwargs: keyword arguments for `save` (format, formats, dpi, ...)
+
+        Returns:
+            future of the `save` report
+        """
+        assert fig is not None or plt is not None
+
+        if fig is None:
+            fig = plt.gcf()
+        kwargs = resolve_save_kwargs(**kwargs)
+
+        self.__close_finished()
+        self.slots.acquire()
+        try:
+            if self.processes:
+                rc = {k: v for k, v in matplotlib.rcParams.items() if k not in ('backend', 'backend_fallback')}
+                future = self.executor.submit(_save_pickled, pickle.dumps(fig), rc, save_path, kwargs)
+                self.release(fig)
+            else:
+                future = self.executor.submit(save, save_path, fig=fig, **kwargs)
+        except BaseException:
+            self.slots.release()
+            raise
+
+        with self.lock:
+            self.pending[future] = (save_path, None if self.processes else fig)
+        future.add_done_callback(self.__done)
+        return future
+
+
+    def __done(self, future):
+        with self.lock:
+            save_path, fig = self.pending.pop(future)
+            if fig is not None:
+                self.finished.append(fig)
+            if not future.cancelled() and future.exception() is not None:
+                self.errors.append((save_path, future.exception()))
+            self.idle.notify_all()
+        self.slots.release()
+
+
+    def __close_finished(self):
+        with self.lock:
+            finished, self.finished = self.finished, []
+        for fig in finished:
+            self.release(fig)
+
+
+    def flush(self):
+        """waits until all the submitted figures are written
+
+        Raises:
+            Exception: if any figure could not be written (since the last flush)
+        """
+        with self.lock:
+            self.idle.wait_for(lambda: not self.pending)
+        self.__close_finished()
+
+        with self.lock:
+            errors, self.errors = self.errors, []
+        if errors:
+            failed = ', '.join(f"{save_path} ({type(e).__name__}: {e})" for save_path, e in errors)
+            raise Exception(f"{len(errors)} figure(s) could not be saved: {failed}") from errors[0][1]
+
+
+    def close(self):
+        """flushes the queue and stops the writer"""
+        try:
+            self.flush()
+        finally:
+            self.executor.shutdown(wait=True)
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,8 +1,16 @@
-import matplotlib.pyplot as plt
-import seaborn as sns
+import threading
+import contextlib
 from .plotsize import Sizing
 from .configuration import BackendConfiguration
-from .utils import set_text, save, copy_docstring
+from .configuration.modes import MODES, rasterize_dense
+from .utils.plotting import set_text
+from .utils.general import save, copy_docstring
+from .utils.params import record_params
+from .utils.profiling import enable_profiling, get_profiler, span
+
+
+# serializes the resolution of the style profiles, which goes through the global rcParams
+_RESOLVE_LOCK = threading.RLock()
 
 
 class Plotex:
@@ -14,8 +22,14 @@ class Plotex:
             **kwargs: parameters for the config file, the params include
                 `url` \
         (the url for the config file), `cmap/palette` for the cmap, `style/theme` \
-        for the seaborn style
+        for the seaborn style, `refresh` to revalidate the cached configs against their urls, \
+        `timeout` for fetching them, `profile` to record the timing spans and counters of the \
+        pipeline (see `profiler`, also enabled by the `PLOTEX_PROFILE` environment variable), \
+        `figure_cache` (True or a `FigureCache`) to reuse the saved figures whose inputs are unchanged \
+        and `mode` ('final', or 'draft' for fast previews, see `set_mode`)
         """
+        if kwargs.get('profile'):
+            enable_profiling()
         init = kwargs.get('initialize', True)
         if init:
             self.init(**kwargs)
@@ -28,12 +42,71 @@ class Plotex:
             **kwargs: parameters for the config file, the params include
                 `url` \
         (the url for the config file), `cmap/palette` for the cmap, `style/theme` \
-        for the seaborn style
+        for the seaborn style, `refresh` to revalidate the cached configs against their urls, \
+        `timeout` for fetching them, `profile` to record the timing spans and counters, \
+        `figure_cache` (True or a `FigureCache`) to reuse the saved figures whose inputs are unchanged \
+        and `mode` ('final' or 'draft')
+        """
+        if kwargs.get('profile'):
+            enable_profiling()
+        
+        with span('plotex.init'):
+            self.kwargs = kwargs
+            self.config = BackendConfiguration(**kwargs)
+            self.sizer = Sizing(config=self.config)
+            self.config.initialize()
+        
+        figure_cache = kwargs.get('figure_cache')
+        if figure_cache is True:
+            from .utils.cache import FigureCache
+            figure_cache = FigureCache()
+        self.figure_cache = figure_cache or None
+    
+    
+    @property
+    def profiler(self):
+        """the active Profiler (with the recorded spans and counters, exportable with `to_json` and \
+        `to_chrome_trace`), or None if profiling is disabled"""
+        return get_profiler()
+    
+    
+    @property
+    def mode(self):
+        """the render mode, 'final' or 'draft' (see `set_mode`)"""
+        return self.config.mode if hasattr(self, 'config') else 'final'
+    
+    
+    def set_mode(self, mode):
+        """switch the render mode. 'draft' renders fast previews: the text uses mathtext instead of LaTeX, \
+        the raster formats are saved at a lower dpi and without the tight bounding box, and the dense \
+        artists are rasterized when saved. The figure sizes (from `skeleton`) and font sizes are the same \
+        as in the 'final' mode, so the drafts have the layout of the final figures
+
+        Args:
+            mode: 'final' or 'draft'
         """
-        self.config = BackendConfiguration(**kwargs)
-        self.sizer = Sizing(config=self.config)
-        self.params = None
+        assert mode in MODES, f"mode should be one of {MODES}"
+        
+        if not hasattr(self, 'sizer'):
+            self.init(mode=mode)
+            return
+        self.kwargs['mode'] = self.config.mode = mode
         self.config.initialize()
+    
+    
+    @contextlib.contextmanager
+    def render_mode(self, mode):
+        """context manager switching the render mode (see `set_mode`), and restoring the previous one on exit
+
+        Args:
+            mode: 'final' or 'draft'
+        """
+        previous = self.mode
+        self.set_mode(mode)
+        try:
+            yield
+        finally:
+            self.set_mode(previous)
         
 
     def skeleton(self, width=None, publisher=None, width_in_pts=True, reinitialize=True, fraction=1, 
@@ -58,9 +131,31 @@ class Plotex:
         
         output = self.sizer.get_size(width=width, publisher=publisher, width_in_pts=width_in_pts, reinitialize=reinitialize,
                               fraction=fraction, subplots=subplots, **kwargs)
-        self.params = plt.rcParams.copy()
         return output
     
+    
+    @contextlib.contextmanager
+    def style(self, width=None, publisher=None, **kwargs):
+        """context manager for a scoped style: sizes the plot using `skeleton` (if a width or
+        publisher is given) and on exit restores only the rcParams changed inside the scope, including
+        those changed by `update_textsize`, `update_textweight` and `remove_ticks`
+
+        Args:
+            width: the width, defaults to None
+            publisher: the name of the publisher, defaults to None
+            **kwargs: other arguments for `skeleton`
+
+        Yields:
+            figsize (width, height), or None if neither width nor publisher is given
+        """
+        with span('plotex.style'), record_params():
+            if not hasattr(self, 'sizer'): # the default `plotex` object is not initialized on import
+                self.init() # inside the scope, so the configuration is also restored on exit
+            figsize = None
+            if width is not None or publisher is not None:
+                figsize = self.skeleton(width=width, publisher=publisher, **kwargs)
+            yield figsize
+    
     def update_textsize(self, reinitialize=True, **kwargs):
         """This function changes the font size of various text elements in the plot such as xlabel, \
         ylabel, title, ticks, etc., by a specified offset. Uses deterministic and probabilistic \
@@ -118,6 +213,72 @@ class Plotex:
             ax.set_ylim(ylims[0], ylims[1])
     
     
+    def render_batch(self, specs, workers=None):
+        """render independent figure specs in a process pool, where each worker sets up this configuration \
+        once and renders with the Agg backend. DataFrames are shared with the workers through memory-mapped \
+        files instead of being pickled per task
+
+        Args:
+            specs: list of figure specs, dicts with the keys `plot` (the helper, e.g. 'bar.group_reduce', \
+        or a callable `(ax, df, **kwargs)`), `save_path`, and optionally `data` (dataframe or file path), \
+        `kwargs` (for the helper), `size` (for `skeleton`), `text` (for `set_text`) and `format`
+            workers: the number of worker processes, defaults to None
+                (the number of cpus); 1 renders serially in this process
+
+        Returns:
+            list of dicts with the `save_path`, the `time` in seconds (also per `stages`) and the `error` \
+        (traceback string or None) of each spec, in order
+        """
+        from .batch import render_batch # imports pyplot, so only loaded when needed
+        
+        if not hasattr(self, 'sizer'):
+            self.init()
+        return render_batch(specs, workers=workers, plotex=self, **self.kwargs)
+    
+    
+    def profile(self, width=None, publisher=None, **kwargs):
+        """resolve the style (the configuration, and the sizing with `skeleton` if a width or publisher is \
+        given) into a StyleProfile, without changing the rcParams. The figures built from the profile with \
+        `figure` do not use the global rcParams or pyplot, so they can be rendered from several threads. \
+        Resolving uses the global rcParams, so the profiles are best resolved once (e.g. at startup)
+
+        Args:
+            width: the width, defaults to None
+            publisher: the name of the publisher, defaults to None
+            **kwargs: other arguments for `skeleton`
+
+        Returns:
+            the StyleProfile
+        """
+        from .profiles import StyleProfile
+        
+        with _RESOLVE_LOCK, self.style(width=width, publisher=publisher, **kwargs) as figsize:
+            if figsize is None: # the configuration only
+                self.config.initialize()
+            return StyleProfile.capture(figsize=figsize)
+    
+    
+    def figure(self, profile=None, subplots=(1, 1), subplots_kwargs=None, **kwargs):
+        """a figure and axes styled by the profile (resolved with `profile` from the other arguments if not \
+        given), created without pyplot. See `profiles.figure`
+
+        Args:
+            profile: the StyleProfile, defaults to None
+            subplots: (nrows, ncols), defaults to (1, 1)
+            subplots_kwargs: keyword arguments for `Figure.subplots`,
+                defaults to None
+            **kwargs: arguments for `profile` (e.g. publisher, fraction)
+
+        Returns:
+            fig, axes
+        """
+        from .profiles import figure
+        
+        if profile is None:
+            profile = self.profile(subplots=subplots, **kwargs)
+        return figure(profile, *subplots, **(subplots_kwargs or {}))
+    
+    
     @copy_docstring(set_text)
     def set_text(self, plt=None, ax=None, xlabel=None, ylabel=None, title=None, xticklocs=None, xticklabels=None,
                xtickrot=None, yticklocs=None, yticklabels=None, ytickrot=None):
@@ -125,10 +286,110 @@ class Plotex:
                xtickrot=xtickrot, yticklocs=yticklocs, yticklabels=yticklabels, ytickrot=ytickrot)
     
     
+    def background_save(self, enable=True, workers=1, max_pending=4, processes=False):
+        """turn on (or off) the background export mode, where `save` hands the figure to a bounded \
+        background writer and returns a future, so the next plot is built while the previous ones are \
+        encoded and written. `save` blocks while `max_pending` figures are waiting, and the figures are \
+        closed once written. Use `flush` to wait for the writes and surface their errors
+
+        Args:
+            enable: whether to save in the background, defaults to True
+            workers: the number of writer threads/processes, defaults to 1
+            max_pending: the maximum number of figures waiting to be
+                written, defaults to 4
+            processes: whether to write in processes (the figures are
+                pickled) instead of threads, defaults to False
+        """
+        from .export import ExportQueue
+        
+        if getattr(self, 'exporter', None) is not None:
+            self.exporter.close()
+            self.exporter = None
+        if enable:
+            self.exporter = ExportQueue(workers=workers, max_pending=max_pending, processes=processes,
+                                        release=self.__release_or_close)
+    
+    
+    def __release_or_close(self, fig):
+        if not self.release(fig):
+            from .export import close_figure
+            close_figure(fig)
+    
+    
+    def flush(self):
+        """wait until the figures saved in the background are written
+
+        Raises:
+            Exception: if any figure could not be written
+        """
+        if getattr(self, 'exporter', None) is not None:
+            self.exporter.flush()
+    
+    
+    def subplots(self, width=None, publisher=None, subplots=(1, 1), subplots_kwargs=None, **kwargs):
+        """sizes the plot using `skeleton` (if a width or publisher is given) and returns a figure of that \
+        size from the figure pool. Figures of the same size, subplots and style are reused: they are \
+        returned to the pool (with their artists cleared) by `save` or `release`
+
+        Args:
+            width: the width, defaults to None
+            publisher: the name of the publisher, defaults to None
+            subplots: (nrows, ncols), defaults to (1, 1)
+            subplots_kwargs: keyword arguments for `plt.subplots` (e.g.
+                sharex, gridspec_kw), defaults to None
+            **kwargs: other arguments for `skeleton`
+
+        Returns:
+            fig, axes
+        """
+        if getattr(self, 'pool', None) is None:
+            from .pool import FigurePool
+            self.pool = FigurePool()
+        
+        figsize = None
+        if width is not None or publisher is not None:
+            if not hasattr(self, 'sizer'):
+                self.init()
+            figsize = self.skeleton(width=width, publisher=publisher, subplots=subplots, **kwargs)
+        
+        return self.pool.subplots(*subplots, figsize=figsize, **dict(subplots_kwargs or {}))
+    
+    
+    def release(self, fig):
+        """return a figure from `subplots` to the figure pool (called by `save`)
+
+        Args:
+            fig: the figure
+
+        Returns:
+            bool, whether the figure belongs to the pool
+        """
+        if getattr(self, 'pool', None) is None:
+            return False
+        return self.pool.release(fig)
+    
+    
     @copy_docstring(save)
-    def save(self, save_path, fig=None, plt=None, format='pdf'):
-        save(save_path, fig=fig, plt=plt, format=format)
+    def save(self, save_path, fig=None, plt=None, format='pdf', formats=None, dpi=None, cache_key=None, cache=None,
+             **savekwargs):
+        cache = cache or getattr(self, 'figure_cache', None)
+        if fig is None and plt is None: # only looks up the cache
+            return save(save_path, format=format, formats=formats, dpi=dpi, cache_key=cache_key, cache=cache,
+                        **savekwargs)
+        
+        if self.mode == 'draft':
+            rasterize_dense(fig if fig is not None else plt.gcf())
+        
+        if getattr(self, 'exporter', None) is not None: # returns a future of the report
+            return self.exporter.submit(save_path, fig=fig, plt=plt, format=format, formats=formats, dpi=dpi,
+                                        cache_key=cache_key, cache=cache, **savekwargs)
+        
+        report = save(save_path, fig=fig, plt=plt, format=format, formats=formats, dpi=dpi, cache_key=cache_key,
+                      cache=cache, **savekwargs)
+        self.release(fig if fig is not None else plt.gcf())
+        return report
         
 
 plotex = Plotex(initialize=False)
-plotex.initialize = plotex.init
\ No newline at end of file
+plotex.initialize = plotex.init
+style = plotex.style
\ No newline at end of file
@@ -0,0 +1,111 @@
+import re
+import difflib
+import logging
+import functools
+
+
+logger = logging.getLogger(__name__)
+
+
+# rcParams keys and their shortened versions
+FONT_SIZE_PARAMS = {'font.size': 'fontsize',
+                    'axes.titlesize': 'title',
+                    'legend.title_fontsize': 'legendtitle',
+                    'xtick.labelsize': 'xticks',
+                    'ytick.labelsize': 'yticks',
+                    'axes.labelsize': 'labels',
+                    'legend.fontsize': 'legend'}
+
+FONT_WEIGHT_PARAMS = {'axes.titleweight': 'title',
+                      'axes.labelweight': 'label'}
+
+# direct mappings to handle exceptions where probabilistic matching might fail
+FONT_SIZE_SPECIAL = {'xlabel': 'axes.labelsize', 'ylabel': 'axes.labelsize',
+                     'title': 'axes.titlesize', 'legend': 'legend.fontsize'}
+
+FONT_WEIGHT_SPECIAL = {'xlabel': 'axes.labelweight', 'ylabel': 'axes.labelweight',
+                       'title': 'axes.titleweight'}
+
+
+def normalize(key):
+    """normalizes an alias: lowercase, without separators (`x_ticks`, `X-Ticks` and `xticks` are the same)"""
+    return re.sub(r'[\s._-]', '', key.lower())
+
+
+def build_alias_index(main_params, special_params=None):
+    """builds the index from every alias (rcParams key, shortened version, special mapping and their
+    normalized forms) to the rcParams key
+
+    Args:
+        main_params: the main dictionary, with keys as rcParams keys
+            and values as their shortened versions
+        special_params: direct mapping to handle exceptions, defaults to None
+
+    Returns:
+        dict of alias to rcParams key
+    """
+    index = {}
+    for param, short in main_params.items():
+        for alias in (param, short):
+            index.setdefault(alias, param)
+    for alias, param in (special_params or {}).items(): # the special mappings take precedence
+        index[alias] = param
+
+    for alias, param in list(index.items()):
+        index.setdefault(normalize(alias), param)
+
+    return index
+
+
+# name -> (main params, alias index)
+ALIAS_INDEXES = {
+    'size': (FONT_SIZE_PARAMS, build_alias_index(FONT_SIZE_PARAMS, FONT_SIZE_SPECIAL)),
+    'weight': (FONT_WEIGHT_PARAMS, build_alias_index(FONT_WEIGHT_PARAMS, FONT_WEIGHT_SPECIAL)),
+}
+
+
+@functools.lru_cache(maxsize=1024)
+def fuzzy_match(key, kind):
+    """probabilistic matching of the key over the rcParams keys and their shortened versions (memoized)
+
+    Args:
+        key: the key with which we search
+        kind: the name of the alias index ('size' or 'weight')
+
+    Returns:
+        the rcParams key, or None if not found
+    """
+    main_params, _ = ALIAS_INDEXES[kind]
+    all_matches = list(main_params.keys()) + list(main_params.values()) # Search over both keys and values
+
+    parameter = difflib.get_close_matches(key, all_matches, n=1)
+    if not parameter:
+        logger.warning("No match found for argument: %s", key)
+        return None
+
+    parameter = parameter[0]
+    if parameter not in main_params:
+        parameter = [k for k, v in main_params.items() if v == parameter][0]
+
+    return parameter
+
+
+def find_matching_param(key, kind):
+    """find the rcParams key matching the key: exact and normalized aliases are looked up directly,
+    and the remaining keys are matched probabilistically
+
+    Args:
+        key: the key with which we search
+        kind: the name of the alias index ('size' or 'weight')
+
+    Returns:
+        the found parameter, or None if not found
+    """
+    _, index = ALIAS_INDEXES[kind]
+    parameter = index.get(key)
+    if parameter is None:
+        parameter = index.get(normalize(key))
+    if parameter is None:
+        parameter = fuzzy_match(key, kind)
+
+    return parameter
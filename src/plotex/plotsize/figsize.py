@@ -1,53 +1,99 @@
-import matplotlib.pyplot as plt
+import matplotlib
 import math
-import difflib, os
-import json
-import requests
+import os
 
 from plotex.configuration import BackendConfiguration
 from plotex.utils.general import save_file
+from plotex.utils.cache import cache_dir, file_lock, read_json
+from plotex.utils.fetching import fetch_if_modified
+from plotex.utils.params import set_params
+from plotex.utils.profiling import profiled
+from plotex.plotsize.aliases import find_matching_param, FONT_SIZE_PARAMS
 
 class Sizing():
     
     CONFIG_URL = 'https://gist.githubusercontent.com/rg089/92540eef5ee88de5d2770a453c85c489/raw/b127ba7b0e7eff3c5eddf1202f01595e5c60c949/size_config.json'
-    CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config_files/size_config.json")
+    CONFIG_PATH = os.path.join(cache_dir(), "size_config.json")
+    DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config_files/default_size_config.json")
     
     
-    def __init__(self, config=None, **config_kwargs):
+    def __init__(self, config=None, url=None, refresh=None, **config_kwargs):
         """initialize the sizing class
 
         Args:
             config: the config file, defaults to None
+            url: the url of the size config, defaults to None (`Sizing.CONFIG_URL`)
+            refresh: whether to revalidate the cached size config against
+                the url, defaults to None (same as the config)
         """
         self.config = config
         if self.config is None:
-            self.config = BackendConfiguration(**config_kwargs)
+            self.config = BackendConfiguration(refresh=bool(refresh), **config_kwargs)
             self.config.initialize()
+        self.url = url if url is not None else Sizing.CONFIG_URL
+        self.refresh = self.config.refresh if refresh is None else refresh
         self.params = None
         self.size_config = self.__load_config()
         
         
+    def __read_config(self, fpath):
+        """reads a size config, returning None if it is missing or corrupt (corrupt caches are removed)"""
+        return read_json(fpath, validate=lambda config: isinstance(config, dict) and isinstance(config.get('width'), dict))
+        
+        
     def __load_config(self):
-        if os.path.exists(Sizing.CONFIG_PATH):
-            with open(Sizing.CONFIG_PATH, 'r') as f:
-                config = json.load(f)
-        else:
-            r = requests.get(Sizing.CONFIG_URL)
-            config = r.json()
-            save_file(content=config, fpath=Sizing.CONFIG_PATH)
-            
+        """loads the size config from the local cache, or from the bundled default if not cached.
+        The url is only fetched (conditionally) when refreshing, and the locally cached publisher
+        widths are kept on top of the refreshed config
+
+        Returns:
+            the size config
+        """
+        if self.refresh:
+            local_config = self.__read_config(Sizing.CONFIG_PATH)
+            try:
+                updated = fetch_if_modified(url=self.url, fpath=Sizing.CONFIG_PATH, timeout=self.config.timeout)
+            except Exception as e:
+                print(f"[INFO] Could not refresh the size config, using the local copy! ({e})")
+                updated = False
+                
+            if updated and local_config is not None:
+                with file_lock(Sizing.CONFIG_PATH):
+                    config = self.__read_config(Sizing.CONFIG_PATH) or self.__read_config(Sizing.DEFAULT_CONFIG_PATH)
+                    for publisher, width in local_config['width'].items():
+                        config['width'].setdefault(publisher, width)
+                    save_file(content=config, fpath=Sizing.CONFIG_PATH)
+                return config
+                
+        config = self.__read_config(Sizing.CONFIG_PATH)
+        if config is None:
+            config = self.__read_config(Sizing.DEFAULT_CONFIG_PATH)
         return config
             
             
     def __save_params(self):
-        """save a copy of the current rcParams"""
-        self.params = plt.rcParams.copy()
+        """start recording the changes to the current rcParams (only the changed keys are saved)"""
+        self.params = {}
         
         
     def __load_params(self):
-        """load the current saved copy of the rcParams"""
+        """restore the rcParams changed since they were saved"""
+        if self.params:
+            set_params(self.params)
+            self.params = {}
+            
+            
+    def __set_params(self, params):
+        """update the rcParams, recording the original values of the changed keys
+
+        Args:
+            params: dict of rcParams keys and values
+        """
         if self.params is not None:
-            plt.rcParams.update(self.params)
+            for key in params:
+                if key not in self.params:
+                    self.params[key] = matplotlib.rcParams[key]
+        set_params(params)
     
     
     def __get_width_publisher(self, publisher, width=None):
@@ -94,15 +140,26 @@ class Sizing():
     
     def __cache_width(self, publisher:str, width:float):
         """
-        caches the `publisher:width` mapping 
+        caches the `publisher:width` mapping, written straight away (new widths are rare) in a locked,
+        atomic update merging it with the mappings cached by other processes, so other Sizing objects and
+        processes (e.g. batch workers) see it
 
         Args:
             publisher (str): the publisher
             width (float): the width in pts
         """
+        if self.size_config['width'].get(publisher) == width:
+            return
+        
         print(f'[INFO] Caching {publisher}:{width} mapping!')
         self.size_config['width'][publisher] = width
-        save_file(self.size_config, Sizing.CONFIG_PATH)
+        try:
+            with file_lock(Sizing.CONFIG_PATH):
+                config = self.__read_config(Sizing.CONFIG_PATH) or self.__read_config(Sizing.DEFAULT_CONFIG_PATH)
+                config['width'][publisher] = width
+                save_file(content=config, fpath=Sizing.CONFIG_PATH)
+        except OSError as e:
+            print(f"[INFO] Could not cache the publisher width! ({e})")
 
 
     def adjust_font_size(self, subplots, fraction, **kwargs):
@@ -115,46 +172,11 @@ class Sizing():
         """
         _, num_cols = subplots
         
-        font_params = ['font.size', 'axes.titlesize', 'legend.title_fontsize', 'xtick.labelsize', 'ytick.labelsize', 'axes.labelsize', 'legend.fontsize']
-        for param in font_params:
-            curr_value = float(plt.rcParams[param])
-            plt.rcParams[param] = math.ceil(curr_value/num_cols*fraction)
+        set_params({param: math.ceil(float(matplotlib.rcParams[param])/num_cols*fraction) for param in FONT_SIZE_PARAMS})
         self.__save_params()
         
         
-    def __find_matching_param(self, key, main_params, special_params={}):
-        """find the matching paramater to the key in the matplotlib.rcParams file specified by
-        the main_params and special_params
-
-        Args:
-            key: the key with which we search
-            main_params: the main dictionary, with keys as rcParams keys
-                and values as their shortened versions
-            special_params: direct mapping to handle exceptions where
-                probabilstic matching might fail, defaults to {}
-
-        Returns:
-            the found parameter, or None if not found
-        """
-        all_matches = list(main_params.keys()) + list(main_params.values()) # Search over both keys and values
-        
-        if key in special_params:
-            parameter = special_params[key]
-        else:
-            parameter = difflib.get_close_matches(key, all_matches, n=1)
-            
-            if not parameter:
-                print(f"[INFO] No match found for argument: {key}!")
-                return None
-            
-            parameter = parameter[0]
-            
-            if parameter not in main_params:
-                parameter = [k for k, v in main_params.items() if v == parameter][0]
-            
-        return parameter
-        
-
+    @profiled('sizing.update_textsize')
     def update_textsize(self, reinitialize=True, **kwargs):
         """This function changes the font size of various text elements in the plot such as xlabel,
         ylabel, title, sticks, etc., by a specified offset. Uses deterministic and probabilistic
@@ -170,25 +192,14 @@ class Sizing():
         if reinitialize:
             self.__load_params()
         
-        font_params = {'font.size': 'fontsize',
-                    'axes.titlesize': 'title',
-                    'legend.title_fontsize': 'legendtitle',
-                    'xtick.labelsize': 'xticks',
-                    'ytick.labelsize': 'yticks',
-                    'axes.labelsize': 'labels',
-                    'legend.fontsize': 'legend'}
-        
-        special_params = {'xlabel': 'axes.labelsize', 'ylabel': 'axes.labelsize', 
-                          'title': 'axes.titlesize', 'legend': 'legend.fontsize'}
-        
         for key, value in kwargs.items():
-            font_param = self.__find_matching_param(key=key, main_params=font_params, 
-                                                    special_params=special_params)
+            font_param = find_matching_param(key, kind='size')
             if font_param is None: continue
-            current_size = plt.rcParams[font_param]
-            plt.rcParams[font_param] = current_size + value
+            current_size = matplotlib.rcParams[font_param]
+            self.__set_params({font_param: current_size + value})
             
             
+    @profiled('sizing.update_textweight')
     def update_textweight(self, reinitialize=False, **kwargs):
         """This function changes the font weight of various text elements in the plot such as xlabel,
         ylabel, title. The values are 'light', 'normal', 'bold'.
@@ -205,18 +216,10 @@ class Sizing():
         if reinitialize:
             self.__load_params()
         
-        font_params = {
-                    'axes.titleweight': 'title',
-                    'axes.labelweight': 'label'}
-        
-        special_params = {'xlabel': 'axes.labelweight', 'ylabel': 'axes.labelweight', 
-                          'title': 'axes.titlweight'}
-        
         for key, value in kwargs.items():
-            font_param = self.__find_matching_param(key, main_params=font_params, 
-                                                    special_params=special_params)
+            font_param = find_matching_param(key, kind='weight')
             if font_param is None: continue            
-            plt.rcParams[font_param] = value
+            self.__set_params({font_param: value})
     
 
     def remove_ticks(self, xtick=True, ytick=True):
@@ -227,9 +230,9 @@ class Sizing():
             ytick: remove ticks on y-axis, defaults to True
         """
         if xtick:
-            plt.rcParams['xtick.major.size'] = 0
+            self.__set_params({'xtick.major.size': 0})
         if ytick:
-            plt.rcParams['ytick.major.size'] = 0
+            self.__set_params({'ytick.major.size': 0})
             
             
     def set_lim(self, ax, xlims=(None, None), ylims=(None, None)):
@@ -269,6 +272,7 @@ class Sizing():
         return fig_width_in
         
         
+    @profiled('sizing.get_size')
     def get_size(self, width=None, publisher=None, width_in_pts=True, reinitialize=True, fraction=1, 
                    subplots=(1, 1), **kwargs):
         """finds the ideal size of the plot and adjusts the text sizes according to the required dimensions
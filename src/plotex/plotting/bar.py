@@ -1,48 +1,131 @@
 import matplotlib
+from matplotlib.font_manager import FontProperties
 import matplotlib.pyplot as plt
-import seaborn as sns
-import random
 import numpy as np
-from plotex.utils.plotting import optimize_labels as optim_labels
+import pandas as pd
+from plotex.utils.plotting import optimize_labels as optim_labels, measure_text
+from plotex.utils.aggregation import is_frame, iter_chunks, chunked_reduce, chunked_pair_counts
+from plotex.utils.profiling import profiled, span
+from plotex.utils.palettes import category_colors
 
 
-def group_reduce(ax, df, group_col, value_col, reduce='mean', cmap=None, color=None, singlecolor=True, optimize_labels=True, **barkwargs):
-    """create a bar chart with the x axis as the distinct values in a column, and the y axis as the reduced values in another column
+# reductions computed with numpy kernels over the factorized groups (see `fast_reduce`)
+FAST_REDUCTIONS = ('mean', 'sum', 'count', 'min', 'max')
+
+
+def is_fast_dtype(values, reduce):
+    """whether `fast_reduce` supports the values: any dtype for 'count', else the numpy numeric dtypes
+    (the nullable, datetime and object dtypes are reduced by pandas)"""
+    if reduce == 'count':
+        return True
+    return isinstance(values.dtype, np.dtype) and values.dtype.kind in 'biuf'
+
+
+def fast_reduce(groups, values, reduce):
+    """reduce the values per group with numpy kernels, factorizing the groups once (categorical groups \
+    use their codes directly). Matches the pandas groupby reductions: missing groups are dropped, the \
+    groups are sorted (or in category order, only observed ones) and missing values are skipped
+
+    Args:
+        groups: the group of every row (Series)
+        values: the values to reduce (Series, see `is_fast_dtype`)
+        reduce: one of FAST_REDUCTIONS
+
+    Returns:
+        labels, reduced values
+    """
+    if isinstance(groups.dtype, pd.CategoricalDtype):
+        codes, labels = groups.cat.codes.to_numpy(), groups.cat.categories
+    else:
+        codes, labels = groups.factorize(sort=True)
+    missing = values.isna().to_numpy()
+    if reduce != 'count':
+        values = values.to_numpy(dtype=float)
+    
+    # shift the codes by one, so the rows of missing groups fall into bin 0 (dropped)
+    bins, n_bins = codes.astype(np.intp) + 1, len(labels) + 1
+    rows = np.bincount(bins, minlength=n_bins)[1:]
+    has_missing = missing.any()
+    counts = np.bincount(bins, weights=~missing, minlength=n_bins)[1:] if has_missing else rows
+    
+    if reduce == 'count':
+        reduced = counts.astype(np.int64)
+    elif reduce in ('sum', 'mean'):
+        reduced = np.bincount(bins, weights=np.where(missing, 0., values) if has_missing else values, 
+                              minlength=n_bins)[1:]
+        if reduce == 'mean':
+            with np.errstate(invalid='ignore', divide='ignore'):
+                reduced = reduced / counts
+    else: # min/max, groups without values are NaN
+        ufunc, initial = (np.fmin, np.inf) if reduce == 'min' else (np.fmax, -np.inf)
+        reduced = np.full(n_bins, initial)
+        ufunc.at(reduced, bins, values)
+        reduced = reduced[1:]
+        reduced[counts == 0] = np.nan
+    
+    observed = rows > 0 # drop the unobserved categories, like groupby(observed=True)
+    if not observed.all():
+        labels, reduced = labels[observed], reduced[observed]
+        
+    return labels, reduced
+
+
+@profiled('bar.group_reduce')
+def group_reduce(ax, df, group_col=None, value_col=None, reduce='mean', cmap=None, color=None, singlecolor=True, optimize_labels=True, chunksize=None, **barkwargs):
+    """create a bar chart with the x axis as the distinct values in a column, and the y axis as the reduced values in another column. \
+    The common reductions (FAST_REDUCTIONS) on a single group column are computed with numpy kernels. \
+    Data that does not fit in memory can be passed as chunks (or a file path), which are reduced incrementally
 
     Args:
         ax: the matplotlib axis
-        df: dataframe containing information
-        group_col: the column/list of columns to groupby
-        value_col: the column whose value to reduce
+        df: dataframe containing information, a pre-aggregated series
+            (index as the labels) to skip the reduction, an iterable of
+            dataframe chunks or a path to a csv/parquet file. Chunks support
+            the FAST_REDUCTIONS, 'median' and quantiles (e.g. 0.9 or 'p90')
+        group_col: the column/list of columns to groupby, defaults to None
+            (only for a pre-aggregated series)
+        value_col: the column whose value to reduce, defaults to None
+            (only for a pre-aggregated series)
         reduce: a string or function for the reduction method, defaults
             to 'mean'
         cmap: the colormap, defaults to None
         color: the color to use, defaults to None
-        singlecolor: whether to use a singlecolor for all the bars,
-            defaults to True
+        singlecolor: whether to use a singlecolor for all the bars (the
+            stable color of `value_col` in `cmap`), else every label has
+            its stable color (see `category_colors`), defaults to True
         optimize_labels: whether to optimize and reorder labels based on
-            their length, defaults to True
+            their width (measured without TeX), defaults to True
+        chunksize: the number of rows per chunk when reading a file,
+            defaults to None
 
     Returns:
         the axis object
     """
-    group_object = df.groupby(group_col)[value_col].aggregate(reduce)
+    with span('bar.aggregate'):
+        if not is_frame(df): # chunks or a file path
+            chunks = iter_chunks(df, chunksize=chunksize, columns=[group_col, value_col])
+            labels, avg_values = chunked_reduce(chunks, group_col, value_col, reduce=reduce)
+            labels = pd.Index(labels, dtype=object)
+        elif not hasattr(df, 'columns'): # pre-aggregated series
+            labels, avg_values = df.index, df.to_numpy()
+        elif (isinstance(reduce, str) and reduce in FAST_REDUCTIONS and not isinstance(group_col, (list, tuple)) and
+              is_fast_dtype(df[value_col], reduce)):
+            labels, avg_values = fast_reduce(df[group_col], df[value_col], reduce)
+        else:
+            group_object = df.groupby(group_col)[value_col].aggregate(reduce)
+            labels, avg_values = group_object.index, group_object.values
     
-    labels = group_object.index.tolist()
-    avg_values = group_object.values
+    labels = labels.tolist()
 
     if optimize_labels:  
-        labels, avg_values = optim_labels(labels, avg_values)
+        # the widths only order the labels, so they are measured with the regular fonts (no TeX runs)
+        fontsize = matplotlib.rcParams['xtick.labelsize']
+        widths = [measure_text(label, fontsize=fontsize, usetex=False)[0] for label in labels]
+        labels, avg_values = optim_labels(labels, avg_values, widths=widths)
 
-    if color is None:
-        if cmap is not None:
-            if isinstance(cmap, str): cmap = sns.color_palette(cmap)
-                
-            if singlecolor: color = random.choice(cmap[:len(labels)])
-            else: color = cmap[:len(labels)]
-
-    if isinstance(color, str):
-        color = [color for i in range(len(labels))] # matplotlib requires a list of colors in the new version
+    if color is None and cmap is not None:
+        if singlecolor: color = category_colors([value_col if value_col is not None else 'value'], cmap, namespace='value')[0]
+        else: color = category_colors(labels, cmap)
 
     if color is None:
         ax.bar(labels, avg_values, **barkwargs)
@@ -52,12 +135,15 @@ def group_reduce(ax, df, group_col, value_col, reduce='mean', cmap=None, color=N
     return ax
 
 
-def stack_count(ax, df, basecol, stackcol, horizontal=True, cmap='pastel', color=None, **barkwargs):
-    """create a stacked bar chart with basecol as the labels and stackcol as the column providing values
+@profiled('bar.stack_count')
+def stack_count(ax, df, basecol, stackcol, horizontal=True, cmap='pastel', color=None, chunksize=None, **barkwargs):
+    """create a stacked bar chart with basecol as the labels and stackcol as the column providing values. \
+    The counts of all the (stack, base) pairs are computed in a single pass, with missing pairs counted as 0
 
     Args:
         ax: matplotlib axes object
-        df: the dataframe
+        df: the dataframe, an iterable of dataframe chunks or a path to a
+            csv/parquet file (counted incrementally)
         basecol: the base column: y-axis in case of horizontal bar/
             x-axis in case of vertical bar
         stackcol: the column with the value counts which stacks on
@@ -65,30 +151,39 @@ def stack_count(ax, df, basecol, stackcol, horizontal=True, cmap='pastel', color
         horizontal: whether to create a horizontal bar chart, defaults
             to True
         cmap: the colormap to use, defaults to 'pastel'
-        color: the color scheme to use, defaults to None
+        color: the list of colors to use (one per stack label), defaults to None (the stable colors
+            of the stack labels in `cmap`, see `category_colors`)
+        chunksize: the number of rows per chunk when reading a file,
+            defaults to None
 
     Returns:
         `ax`, the axes object
     """
-    labels = df[stackcol].unique()
-    bases = df[basecol].unique()
-    prev_counts = np.zeros(len(bases))
+    with span('bar.aggregate'):
+        if is_frame(df):
+            label_codes, labels = df[stackcol].factorize()
+            base_codes, bases = df[basecol].factorize()
+            n_labels, n_bases = len(labels), len(bases)
+        
+            # count matrix of shape (labels, bases), ignoring missing values
+            valid = (label_codes >= 0) & (base_codes >= 0)
+            counts = np.bincount(label_codes[valid] * n_bases + base_codes[valid], 
+                                 minlength=n_labels * n_bases).reshape(n_labels, n_bases)
+        else:
+            chunks = iter_chunks(df, chunksize=chunksize, columns=[basecol, stackcol])
+            labels, bases, counts = chunked_pair_counts(chunks, basecol=basecol, stackcol=stackcol)
+    offsets = np.cumsum(counts, axis=0) - counts
+    bases = np.asarray(bases)
 
-    if isinstance(cmap, str):
-        color_map = sns.color_palette(cmap)
+    if color is None or isinstance(color, str):
+        colors = category_colors(labels, cmap)
     else:
-        color_map = cmap
-        
-    if color is None or isinstance(color, str): 
-        colors = color_map[:len(labels)]
+        colors = color
     
     for i, label in enumerate(labels):
-        value_counts = df.loc[df[stackcol]==label, basecol].value_counts()
-        values = np.array([value_counts[base] for base in bases])
-
-        if horizontal: ax.barh(bases, values, left=prev_counts, color=[colors[i] for j in range(len(bases))], label=label, **barkwargs)
-        else: ax.bar(bases, values, bottom=prev_counts, color=[colors[i] for j in range(len(bases))], label=label, **barkwargs)
-        prev_counts += values
+        label_color = colors[i % len(colors)] # cycle the colors if there are more labels
+        if horizontal: ax.barh(bases, counts[i], left=offsets[i], color=label_color, label=label, **barkwargs)
+        else: ax.bar(bases, counts[i], bottom=offsets[i], color=label_color, label=label, **barkwargs)
             
     ax.legend()
     return ax
@@ -122,23 +217,56 @@ def bar_locs(ax, space=1, num_bars=None, xticklocs=None):
     return ax, xticklocs
 
 
-def label_above(ax, bars, labels, height_offset=0.1):
-    """set the `labels` on top of the bars
+@profiled('bar.label_above')
+def label_above(ax, bars, labels, height_offset=0.1, min_height=None, skip_overlap=False, padding=2., **textkwargs):
+    """set the `labels` on top of the bars. The bar geometry is read from the container in one pass, and \
+    labels of bars below `min_height` or overlapping a previous label (`skip_overlap`, using the measured \
+    widths of the labels) are skipped, so text artists are only created for the labels that can be read
 
     Args:
         ax: matplotlib axes object
         bars: the bar objects (`bars = ax.bar(...)`)
         labels: the list of labels to set on top
         height_offset: the offset of height, defaults to 0.1
+        min_height: the minimum (absolute) height of the bars to label,
+            defaults to None
+        skip_overlap: whether to skip the labels overlapping the
+            previous one, defaults to False
+        padding: the minimum gap between the labels in points (with
+            `skip_overlap`), defaults to 2.
+        **textkwargs: keyword arguments to pass into the text function
 
     Returns:
         `ax`, the axes object
     """
-    for i, p in enumerate(bars):
-        x, height, width = p.get_x(), p.get_height(), p.get_width()
+    bounds = np.array([bar.get_bbox().bounds for bar in bars], dtype=float).reshape(-1, 4) # x, y, width, height
+    centers = bounds[:, 0] + bounds[:, 2] / 2
+    height = np.asarray(bars.datavalues, dtype=float) if hasattr(bars, 'datavalues') else bounds[:, 3]
+    labels = [f'{label}' for label in labels]
+    
+    keep = np.ones(len(labels), dtype=bool)
+    if min_height is not None:
+        keep &= np.abs(height) >= min_height
         
-        ax.text(x=x+width/2, y=height+height_offset,
-        s=f'{labels[i]}',
-        ha='center')
+    if skip_overlap and len(labels):
+        # the measured label widths (cached, without TeX runs) in data units
+        fontsize = FontProperties(size=textkwargs.get('fontsize', textkwargs.get('size'))).get_size_in_points()
+        axes_width_pts = ax.get_position().width * ax.get_figure().get_size_inches()[0] * 72
+        x_min, x_max = ax.get_xlim()
+        data_per_pt = abs(x_max - x_min) / axes_width_pts
+        widths = np.array([measure_text(label, fontsize=fontsize, usetex=False)[0] for label in labels])
+        half_widths = (widths + padding) / 2 * data_per_pt
         
-    return ax
\ No newline at end of file
+        last_right = -np.inf
+        for i in np.argsort(centers, kind='stable'):
+            if not keep[i]: continue
+            if centers[i] - half_widths[i] < last_right:
+                keep[i] = False
+            else:
+                last_right = centers[i] + half_widths[i]
+    
+    textkwargs.setdefault('ha', 'center')
+    for i in np.flatnonzero(keep):
+        ax.text(x=centers[i], y=height[i]+height_offset, s=labels[i], **textkwargs)
+        
+    return ax
@@ -0,0 +1,176 @@
+import matplotlib
+import matplotlib.pyplot as plt
+import numpy as np
+from plotex.utils.plotting import axes_pixels
+from plotex.utils.profiling import profiled
+from plotex.utils.palettes import resolve_palette
+
+
+def numeric_values(values):
+    """the values as floats for bucketing (datetimes, including the timezone-aware ones, and timedeltas are
+    converted to their integer representation in nanoseconds)
+
+    Args:
+        values: numpy array, or pandas index/series
+
+    Returns:
+        float numpy array
+    """
+    import pandas as pd
+
+    if isinstance(values.dtype, pd.DatetimeTZDtype) or values.dtype.kind == 'M':
+        return pd.DatetimeIndex(values).asi8.astype(float)
+    if values.dtype.kind == 'm':
+        return pd.TimedeltaIndex(values).asi8.astype(float)
+    return np.asarray(values, dtype=float)
+
+
+def nan_gaps(y):
+    """the indices of the first value of every run of NaN values, kept by the downsampling so the gaps
+    of the line are drawn"""
+    missing = np.isnan(y)
+    return np.flatnonzero(missing & ~np.concatenate(([False], missing[:-1])))
+
+
+def minmax_downsample(x, y, n_buckets):
+    """shape-preserving downsampling keeping the first, min, max and last point of every bucket of the x range, \
+    so with one bucket per pixel the drawn line is identical to the full resolution one (M4 aggregation). \
+    The first NaN of every gap is kept
+
+    Args:
+        x: the sorted x values (numeric)
+        y: the y values
+        n_buckets: the number of buckets (the width in pixels)
+
+    Returns:
+        the sorted indices of the selected points
+    """
+    n = len(x)
+    if n <= 4 * n_buckets:
+        return np.arange(n)
+
+    edges = np.linspace(x[0], x[-1], n_buckets + 1)[1:-1]
+    starts = np.concatenate(([0], np.searchsorted(x, edges, side='left')))
+    starts = np.unique(starts) # drop empty buckets
+    counts = np.diff(np.append(starts, n))
+    ends = starts + counts - 1
+
+    bucket_of = np.repeat(np.arange(len(starts)), counts)
+    selected = [starts, ends, nan_gaps(y)]
+    for reduce in (np.fmin, np.fmax):
+        extreme = np.repeat(reduce.reduceat(y, starts), counts)
+        matches = np.flatnonzero(y == extreme)
+        _, first = np.unique(bucket_of[matches], return_index=True) # first matching point of every bucket
+        selected.append(matches[first])
+
+    return np.unique(np.concatenate(selected))
+
+
+def lttb_downsample(x, y, n_out):
+    """Largest-Triangle-Three-Buckets downsampling: keeps the first and last points and, for every bucket, \
+    the point forming the largest triangle with the previously selected point and the mean of the next bucket. \
+    The first NaN of every gap is also kept (so up to `n_out` points plus one per gap are returned)
+
+    Args:
+        x: the sorted x values (numeric)
+        y: the y values
+        n_out: the number of points to keep
+
+    Returns:
+        the sorted indices of the selected points
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp) # buckets for all but the first and last point
+    selected = np.empty(n_out, dtype=np.intp)
+    selected[0], selected[-1] = 0, n - 1
+
+    previous = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i+1]
+        next_end = edges[i+2] if i + 2 < len(edges) else n
+        next_valid = ~np.isnan(y[end:next_end])
+        next_x = x[end:next_end][next_valid].mean() if next_valid.any() else x[end:next_end].mean()
+        next_y = y[end:next_end][next_valid].mean() if next_valid.any() else y[previous]
+
+        areas = np.abs((x[previous] - next_x) * (y[start:end] - y[previous]) -
+                       (x[previous] - x[start:end]) * (next_y - y[previous]))
+        previous = start + int(np.argmax(np.nan_to_num(areas, nan=-1.))) if end > start else start
+        selected[i+1] = previous
+
+    return np.unique(np.concatenate((selected, nan_gaps(y))))
+
+
+@profiled('line.series')
+def series(ax, df, y=None, x=None, cmap=None, downsample='minmax', n_points=None, dpi=None, legend=True,
+           **plotkwargs):
+    """plot one or more series (e.g. training curves or metrics) from the dataframe. Long series are \
+    downsampled with a shape-preserving algorithm to the width of the axes in pixels (sized by `get_size`), \
+    so the drawing time and output size depend on the figure resolution instead of the data length
+
+    Args:
+        ax: matplotlib axis object
+        df: the dataframe with the data
+        y: the column/list of columns to plot, defaults to None (all
+            the numeric columns other than x)
+        x: the column to use for the x-axis, defaults to None (the index)
+        cmap: the colormap to use, defaults to None
+        downsample: the downsampling method, 'minmax' (first/min/max/last
+            per pixel), 'lttb' or None to disable, defaults to 'minmax'
+        n_points: the number of buckets ('minmax') or points ('lttb'),
+            defaults to None (the width of the axes in pixels, twice for 'lttb')
+        dpi: the dpi used to compute the width in pixels, defaults to
+            None (the savefig dpi)
+        legend: whether to add the legend, defaults to True
+        **plotkwargs: keyword arguments to pass into the plot function
+
+    Returns:
+        `ax`, the axis object
+    """
+    assert downsample in ('minmax', 'lttb', None), "downsample should be one of 'minmax', 'lttb' or None"
+
+    x_column = df.index if x is None else df[x]
+    x_values = x_column.to_numpy()
+    if y is None:
+        y = [col for col in df.select_dtypes('number').columns if col != x]
+    elif isinstance(y, str):
+        y = [y]
+
+    x_numeric = numeric_values(x_column)
+    if len(x_numeric) > 1 and np.any(x_numeric[1:] < x_numeric[:-1]): # unsorted x
+        order = np.argsort(x_numeric, kind='stable')
+        x_values, x_numeric = x_values[order], x_numeric[order]
+    else:
+        order = None
+
+    if n_points is None:
+        width, _ = axes_pixels(ax, dpi=dpi)
+        n_points = width if downsample == 'minmax' else 2 * width
+
+    colors = resolve_palette(cmap) if cmap is not None else None
+
+    for i, col in enumerate(y):
+        y_values = df[col].to_numpy()
+        if order is not None: y_values = y_values[order]
+
+        if downsample == 'minmax':
+            indices = minmax_downsample(x_numeric, y_values.astype(float), n_points)
+        elif downsample == 'lttb':
+            indices = lttb_downsample(x_numeric, y_values.astype(float), n_points)
+        else:
+            indices = slice(None)
+
+        if colors is not None:
+            plotkwargs['color'] = colors[i % len(colors)]
+        ax.plot(x_values[indices], y_values[indices], label=col, **plotkwargs)
+
+    if legend:
+        ax.legend()
+
+    return ax
+
+
+# Defining the function `curves` to be same as the `series` function
+curves = series
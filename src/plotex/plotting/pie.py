@@ -1,35 +1,44 @@
 import matplotlib
 import matplotlib.pyplot as plt
-import seaborn as sns
 from plotex.utils import set_text
+from plotex.utils.aggregation import is_frame, iter_chunks, chunked_value_counts
+from plotex.utils.profiling import profiled, span
+from plotex.utils.palettes import category_colors
 
 
-def column_frequency(ax, df, column, cmap=None, percent=True, **piekwargs):
+@profiled('pie.column_frequency')
+def column_frequency(ax, df, column, cmap=None, percent=True, chunksize=None, **piekwargs):
     """create a pie chart based on the frequency of values in a particular column
 
     Args:
         ax: matplotlib axis object
-        df: the dataframe with the data
+        df: the dataframe with the data, an iterable of dataframe chunks
+            or a path to a csv/parquet file (counted incrementally)
         column: the column to calculate frequencies over
-        cmap: the colormap to use, defaults to None
+        cmap: the colormap to use (every value has its stable color, see
+            `category_colors`), defaults to None
         percent: whether to display percentages, defaults to True
+        chunksize: the number of rows per chunk when reading a file,
+            defaults to None
         **piekwargs: keyword arguments to pass into the pie function
 
     Returns:
         `ax`, the axis object
     """
-    value_counts = df[column].value_counts()
-    
-    labels = value_counts.index    
-    data = value_counts.values
+    with span('pie.aggregate'):
+        if is_frame(df):
+            value_counts = df[column].value_counts()
+            labels, data = value_counts.index, value_counts.values
+        else:
+            chunks = iter_chunks(df, chunksize=chunksize, columns=[column])
+            labels, data = chunked_value_counts(chunks, column)
     
     if percent:
         data = data/data.sum()*100
 
     colors = None
     if cmap is not None:
-        if isinstance(cmap, str): cmap = sns.color_palette(cmap)
-        colors = cmap[:len(data)]
+        colors = category_colors(labels, cmap)
     
     autopct = '%.0f'
     if percent: autopct='%.0f%%'
@@ -1,12 +1,70 @@
 import matplotlib
 import matplotlib.pyplot as plt
-import seaborn as sns
+import numpy as np
+from matplotlib.colors import to_rgb
+from plotex.utils.plotting import axes_pixels
+from plotex.utils.profiling import profiled
+from plotex.utils.palettes import resolve_palette, category_colors
 
 
+# number of points above which the scatter layer is rasterized by default
+RASTERIZE_ABOVE = 100000
+
+
+def density_image(ax, x_values, y_values, codes, colors, dpi=None):
+    """composites per-category 2D histograms (binned on the pixel grid of the axes) into a single image
+
+    Args:
+        ax: matplotlib axis object
+        x_values: the x values
+        y_values: the y values
+        codes: the category code (index into colors) of every point, -1 for points to skip
+        colors: the color of every category
+        dpi: the dpi of the pixel grid, defaults to None (see `axes_pixels`)
+
+    Returns:
+        the image (AxesImage) object, None if there are no points to draw
+    """
+    n_categories = len(colors)
+    valid = (codes >= 0) & (codes < n_categories) & np.isfinite(x_values) & np.isfinite(y_values)
+    if not valid.any():
+        return None
+    x_values, y_values, codes = x_values[valid], y_values[valid], codes[valid]
+    width, height = axes_pixels(ax, dpi=dpi)
+    
+    x_min, x_max = x_values.min(), x_values.max()
+    y_min, y_max = y_values.min(), y_values.max()
+    if x_max == x_min: x_min, x_max = x_min - 0.5, x_max + 0.5
+    if y_max == y_min: y_min, y_max = y_min - 0.5, y_max + 0.5
+    
+    # Bin all the points at once: one count per (category, row, column)
+    cols = np.minimum(((x_values - x_min) / (x_max - x_min) * width).astype(np.intp), width - 1)
+    rows = np.minimum(((y_values - y_min) / (y_max - y_min) * height).astype(np.intp), height - 1)
+    counts = np.bincount((codes * height + rows) * width + cols, 
+                         minlength=n_categories * height * width).reshape(n_categories, height, width)
+    
+    # Log-scaled density as the opacity, composited over the categories in order
+    alphas = np.log1p(counts) / max(np.log1p(counts.max()), 1)
+    image = np.zeros((height, width, 4))
+    for alpha, color in zip(alphas, colors):
+        alpha = alpha[..., None]
+        image[..., :3] = alpha * np.asarray(to_rgb(color)) + (1 - alpha) * image[..., :3]
+        image[..., 3:] = alpha + (1 - alpha) * image[..., 3:]
+    
+    return ax.imshow(image, extent=(x_min, x_max, y_min, y_max), origin='lower', aspect='auto', 
+                     interpolation='nearest')
+
+
+@profiled('scatter.marker')
 def marker(ax, df, x, y, marker_col, cmap=None, singlecolor=False, 
-             markerscale=1., markersize=10, **scatterkwargs):
+             markerscale=1., markersize=10, density=False, rasterize_above=RASTERIZE_ABOVE, 
+             dpi=None, **scatterkwargs):
     """create a scatterplot with distinct markers (with labels) \
-    based on the specified column in the dataframe
+    based on the specified column in the dataframe. For millions of points, \
+    `density=True` draws a per-category 2D histogram binned on the pixel grid \
+    of the axes (sized by `get_size`) as a single image, and otherwise the \
+    points are rasterized above `rasterize_above` points, keeping the text \
+    and axes as vectors
 
     Args:
         ax: matplotlib axis object
@@ -14,11 +72,18 @@ def marker(ax, df, x, y, marker_col, cmap=None, singlecolor=False,
         x: the column to use for x-axis of the plot
         y: the column to use for y-axis of the plot
         marker_col: the column for marker_types
-        cmap: the colormap to use, defaults to None
+        cmap: the colormap to use (every marker value has its stable
+            color, see `category_colors`), defaults to None ('pastel')
         singlecolor: whether to use a single color, defaults to False
         markerscale: the scale of the markers (relative to the default \
             font size), defaults to 1.
         markersize: the size of the markers, defaults to 10
+        density: whether to draw the density image instead of the
+            points, defaults to False
+        rasterize_above: the number of points above which the points
+            are rasterized, defaults to RASTERIZE_ABOVE (None to disable)
+        dpi: the dpi of the density grid, defaults to None (the
+            savefig dpi)
         **scatterkwargs: keyword arguments to pass into the scatter
             function
 
@@ -28,18 +93,30 @@ def marker(ax, df, x, y, marker_col, cmap=None, singlecolor=False,
     markers = ['*', 'o', 'X', "^", 'D', 'P', 'H', 's', "v", "d", "h"]
     
     if cmap is None: cmap = 'pastel'
-    colors = sns.color_palette(cmap)
-    if singlecolor:
-        colors = [colors[0] for i in range(len(colors))]
         
-    unique_marker_values = df[marker_col].unique()
+    # Group the rows once: sorting by the codes makes each marker value a contiguous slice (view)
+    codes, unique_marker_values = df[marker_col].factorize()
+    if singlecolor:
+        colors = resolve_palette(cmap)[:1]
+    else:
+        colors = category_colors(unique_marker_values, cmap)
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(len(unique_marker_values) + 1))
+    x_values, y_values = df[x].to_numpy()[order], df[y].to_numpy()[order]
+    
+    if density:
+        image_colors = [colors[i % len(colors)] for i in range(len(unique_marker_values))]
+        density_image(ax, x_values.astype(float), y_values.astype(float), codes[order], image_colors, dpi=dpi)
+        x_values, y_values = x_values[:0], y_values[:0] # draw only the (empty) legend handles
+        bounds = np.zeros_like(bounds)
+    elif rasterize_above is not None and len(x_values) > rasterize_above:
+        scatterkwargs.setdefault('rasterized', True)
     
-    # Looping to add the label for each marker (legend)
+    # Looping to add the label for each marker (legend), cycling the markers and colors if they run out
     for i, marker_val in enumerate(unique_marker_values):
-        mask = df[marker_col].values == marker_val
-        x, y = df[x][mask], df[y][mask]
-        ax.scatter(x=x, y=y, s=markersize, label=marker_val, marker=markers[i], 
-                   color=colors[i], **scatterkwargs)
+        start, end = bounds[i], bounds[i+1]
+        ax.scatter(x=x_values[start:end], y=y_values[start:end], s=markersize, label=marker_val, 
+                   marker=markers[i % len(markers)], color=colors[i % len(colors)], **scatterkwargs)
     
     ax.legend(markerscale=markerscale);
     
@@ -0,0 +1,261 @@
+import hashlib
+import weakref
+import collections
+import matplotlib
+import matplotlib.ticker
+from plotex.utils.params import current_params
+
+
+def style_profile():
+    """the key of the current rcParams: figures created under different rcParams (fonts, sizes, colors)
+    are not interchangeable"""
+    return hashlib.sha1(repr(sorted(current_params().items())).encode()).hexdigest()
+
+
+def label_props(label):
+    """the properties of a tick label changed by `set_ticklabels` and `tick_params`"""
+    return (label.get_rotation(), label.get_fontsize(), label.get_color(), label.get_ha(), label.get_va(),
+            label.get_visible())
+
+
+def tick_props(tick):
+    """the properties of a tick changed by `tick_params` and `set_ticklabels`"""
+    return (tick.tick1line.get_visible(), tick.tick2line.get_visible(), tick.tick1line.get_markersize(),
+            tick.tick1line.get_markeredgewidth(), tick.tick1line.get_color(), tick.gridline.get_visible(),
+            tick.get_pad(), label_props(tick.label1), label_props(tick.label2))
+
+
+def tick_state(ax):
+    """the tick properties of a new axis, restored by `reset_axes`
+
+    Args:
+        ax: matplotlib axis object
+
+    Returns:
+        dict of axis name to (major tick properties, minor tick properties)
+    """
+    return {name: (tick_props(axis.majorTicks[0]), tick_props(axis.minorTicks[0]))
+            for name, axis in (('x', ax.xaxis), ('y', ax.yaxis))}
+
+
+def axis_converter(axis):
+    """the units converter of the axis (`Axis.get_converter` is only available in matplotlib >= 3.10)"""
+    if hasattr(axis, 'get_converter'):
+        return axis.get_converter()
+    return axis.converter
+
+
+def rc_tick_sides(name, which):
+    """the tick sides of a new axis (as set by `Axes.__init__` from the rcParams), for `tick_params`"""
+    rc = matplotlib.rcParams
+    if name == 'x':
+        sides = {'top': 'labeltop', 'bottom': 'labelbottom'}
+    else:
+        sides = {'left': 'labelleft', 'right': 'labelright'}
+    params = {}
+    for side, label in sides.items():
+        params[side] = rc[f'{name}tick.{side}'] and rc[f'{name}tick.{which}.{side}']
+        params[label] = rc[f'{name}tick.{label}'] and rc[f'{name}tick.{which}.{side}']
+    return params
+
+
+def label_outer(ax, name):
+    """hides the tick labels of the inner subplots along an axis (like `plt.subplots` for shared axes)"""
+    spec = ax.get_subplotspec()
+    if spec is None:
+        return
+    if name == 'x':
+        hidden = {} if spec.is_last_row() else {'labelbottom': False}
+        if not spec.is_first_row(): hidden['labeltop'] = False
+    else:
+        hidden = {} if spec.is_first_col() else {'labelleft': False}
+        if not spec.is_last_col(): hidden['labelright'] = False
+    if hidden:
+        ax.tick_params(axis=name, which='both', **hidden)
+
+
+def reset_axes(ax, state, shared=()):
+    """removes the artists of the axis and resets the state commonly changed while plotting (titles,
+    labels, limits, scales, units, ticks, spines and the property cycle), keeping the axis object and its
+    position. This is much cheaper than `ax.cla()`, which rebuilds the axis
+
+    Args:
+        ax: matplotlib axis object
+        state: the tick state of the new axis (from `tick_state`)
+        shared: the names of the shared axes ('x', 'y') whose inner tick labels
+            are hidden, defaults to ()
+    """
+    rc = matplotlib.rcParams
+
+    for artist in [*ax.lines, *ax.patches, *ax.collections, *ax.images, *ax.texts, *ax.artists, *ax.tables,
+                   *ax.child_axes]:
+        artist.remove()
+    ax.containers.clear()
+    if ax.legend_ is not None:
+        ax.legend_.remove()
+
+    for loc in ('left', 'center', 'right'):
+        ax.set_title('', loc=loc)
+    ax.set_xlabel('')
+    ax.set_ylabel('')
+
+    for name, axis in (('x', ax.xaxis), ('y', ax.yaxis)):
+        # the axis is only cleared (recreating the ticks, the costly part) if it has units (e.g. categories,
+        # dates) or its ticks were changed
+        major, minor = state[name]
+        if axis.get_scale() != 'linear':
+            ax.set(**{f'{name}scale': 'linear'})
+        if (axis.get_units() is not None or axis_converter(axis) is not None or
+                any(tick_props(tick) != major for tick in axis.majorTicks) or
+                any(tick_props(tick) != minor for tick in axis.minorTicks)):
+            axis.clear() # keeps the tick parameters, reset to those of a new axis
+            ax.tick_params(axis=name, which='minor', reset=True, **rc_tick_sides(name, 'minor'))
+            ax.tick_params(axis=name, which='major', reset=True, **rc_tick_sides(name, 'major'))
+            if name in shared:
+                label_outer(ax, name)
+        else:
+            axis.set_major_locator(matplotlib.ticker.AutoLocator())
+            axis.set_major_formatter(matplotlib.ticker.ScalarFormatter())
+            if rc[f'{name}tick.minor.visible']:
+                axis.set_minor_locator(matplotlib.ticker.AutoMinorLocator())
+            else:
+                axis.set_minor_locator(matplotlib.ticker.NullLocator())
+            # still the defaults, so units set later (e.g. categories) install their own locators
+            axis.isDefault_majloc = axis.isDefault_majfmt = axis.isDefault_minloc = axis.isDefault_minfmt = True
+
+    ax.relim()
+    ax.set_xmargin(rc['axes.xmargin'])
+    ax.set_ymargin(rc['axes.ymargin'])
+    ax.set_xlim(0, 1)
+    ax.set_ylim(0, 1)
+    ax.set_autoscale_on(True)
+    ax.set_aspect('auto')
+
+    for name, spine in ax.spines.items():
+        visible = rc.get(f'axes.spines.{name}', True)
+        if spine.get_visible() != visible:
+            spine.set_visible(visible)
+        if spine.get_position() != ('outward', 0.): # resets the ticks
+            spine.set_position(('outward', 0.))
+
+    ax.set_facecolor(rc['axes.facecolor'])
+    ax.set_axis_on()
+    ax.set_prop_cycle(None)
+
+
+class FigurePool():
+    """pool of figures keyed by (figure size, subplots, subplot arguments, style profile). Figures released
+    to the pool have their artists cleared, but keep their canvas, axes and layout, so building another
+    identically shaped figure skips the allocation of the figure and axes"""
+
+    def __init__(self, max_figures=16, clear='fast'):
+        """initialize the pool
+
+        Args:
+            max_figures: the maximum number of idle figures kept (the least
+                recently released are closed), defaults to 16
+            clear: how the released axes are cleared, 'fast' (see `reset_axes`)
+                or 'full' (`ax.cla()`), defaults to 'fast'
+        """
+        assert clear in ('fast', 'full'), "clear should be one of 'fast' or 'full'"
+
+        self.max_figures = max_figures
+        self.clear = clear
+        self.idle = collections.OrderedDict() # key -> list of (fig, axes, tick states)
+        self.leased = weakref.WeakKeyDictionary() # fig -> (key, axes, subplots kwargs, tick states)
+        self.hits, self.misses = 0, 0
+
+
+    def __len__(self):
+        return sum(len(figures) for figures in self.idle.values())
+
+
+    def subplots(self, nrows=1, ncols=1, figsize=None, **kwargs):
+        """an idle figure of the same shape and style from the pool, else a new one from `plt.subplots`
+
+        Args:
+            nrows: the number of rows, defaults to 1
+            ncols: the number of columns, defaults to 1
+            figsize: (width, height) in inches, defaults to None (`figure.figsize`)
+            **kwargs: keyword arguments for `plt.subplots` (e.g. sharex, gridspec_kw)
+
+        Returns:
+            fig, axes (as returned by `plt.subplots`)
+        """
+        import matplotlib.pyplot as plt
+
+        if figsize is None:
+            figsize = matplotlib.rcParams['figure.figsize']
+        key = (tuple(round(float(size), 6) for size in figsize), (nrows, ncols),
+               repr(sorted(kwargs.items())), style_profile())
+
+        figures = self.idle.get(key)
+        if figures:
+            fig, axes, states = figures.pop()
+            if not figures:
+                del self.idle[key]
+            self.hits += 1
+        else:
+            fig, axes = plt.subplots(nrows, ncols, figsize=figsize, **kwargs)
+            states = [tick_state(ax) for ax in (axes.flat if hasattr(axes, 'flat') else [axes])]
+            self.misses += 1
+
+        self.leased[fig] = (key, axes, kwargs, states)
+        return fig, axes
+
+
+    def release(self, fig):
+        """returns a figure from `subplots` to the pool, clearing its artists
+
+        Args:
+            fig: the figure
+
+        Returns:
+            bool, whether the figure belongs to the pool
+        """
+        if fig not in self.leased:
+            return False
+        key, axes, kwargs, states = self.leased.pop(fig)
+
+        original = list(axes.flat) if hasattr(axes, 'flat') else [axes]
+        for ax in fig.axes:
+            if ax not in original: # e.g. twin axes and colorbars
+                fig.delaxes(ax)
+        shared = [name for name, share in (('x', kwargs.get('sharex')), ('y', kwargs.get('sharey')))
+                  if share in (True, 'all', 'col' if name == 'x' else 'row')]
+        for ax, state in zip(original, states):
+            if self.clear == 'fast':
+                reset_axes(ax, state, shared=shared)
+            else:
+                ax.cla()
+                for name in shared:
+                    label_outer(ax, name)
+
+        for artist in [*fig.texts, *fig.legends, *fig.images, *fig.lines, *fig.patches, *fig.artists]:
+            artist.remove()
+        for name in ('_suptitle', '_supxlabel', '_supylabel'):
+            if getattr(fig, name, None) is not None:
+                setattr(fig, name, None)
+
+        self.idle.setdefault(key, []).append((fig, axes, states))
+        self.idle.move_to_end(key)
+        while len(self) > self.max_figures:
+            self.__evict()
+
+        return True
+
+
+    def __evict(self):
+        import matplotlib.pyplot as plt
+
+        key, figures = next(iter(self.idle.items())) # the least recently released shape
+        fig, _, _ = figures.pop(0)
+        if not figures:
+            del self.idle[key]
+        plt.close(fig)
+
+
+    def close(self):
+        """closes all the idle figures"""
+        while self.idle:
+            self.__evict()
@@ -0,0 +1,98 @@
+import threading
+import contextlib
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from plotex.utils.params import current_params, scoped_params
+
+
+# the profile active in each thread (see `StyleProfile.activate`)
+_ACTIVE = threading.local()
+
+
+class StyleProfile():
+    """a resolved style: the rcParams (configuration, sizing and text adjustments) and the figure size,
+    applied to the figures built from it (see `figure`) without changing the global rcParams"""
+
+    def __init__(self, params, figsize=None):
+        """initialize the profile
+
+        Args:
+            params: dict of rcParams (all the keys)
+            figsize: (width, height) of the figures, defaults to None
+                (`figure.figsize` of the params)
+        """
+        self.params = dict(params)
+        self.figsize = tuple(figsize) if figsize is not None else tuple(self.params['figure.figsize'])
+
+
+    @classmethod
+    def capture(cls, figsize=None):
+        """the profile of the rcParams in effect in the current thread
+
+        Args:
+            figsize: (width, height) of the figures, defaults to None
+
+        Returns:
+            the StyleProfile
+        """
+        return cls(current_params(), figsize=figsize)
+
+
+    @contextlib.contextmanager
+    def activate(self):
+        """context manager making (a copy of) the profile the rcParams of the current thread (see
+        `utils.params.scoped_params`): plotting inside the scope uses the profile, and the changes made
+        inside the scope (e.g. by `set_params`) are local to it. Re-entrant for the same profile"""
+        if getattr(_ACTIVE, 'profile', None) is self:
+            yield
+            return
+
+        previous = getattr(_ACTIVE, 'profile', None)
+        _ACTIVE.profile = self
+        try:
+            with scoped_params(self.params):
+                yield
+        finally:
+            _ACTIVE.profile = previous
+
+
+class ProfileFigure(Figure):
+    """figure bound to a StyleProfile, created, drawn and saved with the rcParams of the profile"""
+
+    def __init__(self, profile, **kwargs):
+        self.profile = profile
+        with profile.activate():
+            super().__init__(figsize=kwargs.pop('figsize', profile.figsize), **kwargs)
+
+
+    def draw(self, renderer):
+        with self.profile.activate():
+            return super().draw(renderer)
+
+
+    def savefig(self, *args, **kwargs):
+        with self.profile.activate():
+            return super().savefig(*args, **kwargs)
+
+
+def figure(profile=None, nrows=1, ncols=1, **kwargs):
+    """a figure and axes styled by the profile, created without pyplot: the figure is not registered with
+    pyplot (no global current figure, closed by garbage collection) and is attached to an Agg canvas, so
+    figures can be built and saved concurrently from several threads. Create the artists inside
+    `profile.activate()` so they also use the profile (`save` and drawing activate it themselves)
+
+    Args:
+        profile: the StyleProfile (e.g. from `Plotex.profile`), defaults to None (the current rcParams)
+        nrows: the number of rows, defaults to 1
+        ncols: the number of columns, defaults to 1
+        **kwargs: keyword arguments for `Figure.subplots` (e.g. sharex, gridspec_kw)
+
+    Returns:
+        fig, axes
+    """
+    profile = profile or StyleProfile.capture()
+    fig = ProfileFigure(profile)
+    FigureCanvasAgg(fig)
+    with profile.activate():
+        axes = fig.subplots(nrows, ncols, **kwargs)
+    return fig, axes
@@ -1,2 +1,33 @@
-from .plotting import optimize_labels, set_text, custom_legend, custom_text
-from .general import save, copy_docstring
\ No newline at end of file
+import importlib
+
+# `plotting` needs matplotlib, so it is only imported when one of its functions is accessed
+_LAZY_ATTRIBUTES = {
+    'optimize_labels': 'plotex.utils.plotting',
+    'set_text': 'plotex.utils.plotting',
+    'custom_legend': 'plotex.utils.plotting',
+    'custom_text': 'plotex.utils.plotting',
+    'save': 'plotex.utils.general',
+    'copy_docstring': 'plotex.utils.general',
+    'axes_pixels': 'plotex.utils.plotting',
+    'fit_xticklabels': 'plotex.utils.plotting',
+    'measure_text': 'plotex.utils.plotting',
+    'figure_key': 'plotex.utils.hashing',
+    'FigureCache': 'plotex.utils.cache',
+    'resolve_palette': 'plotex.utils.palettes',
+    'category_colors': 'plotex.utils.palettes',
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+    globals()[name] = value # cache, so __getattr__ is not called again
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
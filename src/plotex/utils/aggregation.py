@@ -0,0 +1,285 @@
+import os
+import numpy as np
+
+
+DEFAULT_CHUNKSIZE = 1000000
+
+
+def is_frame(data):
+    """whether the data is a single in-memory pandas object (DataFrame/Series) rather than chunks or a path"""
+    return hasattr(data, 'index') and hasattr(data, 'to_numpy')
+
+
+def iter_chunks(data, chunksize=None, columns=None):
+    """iterates over the data in chunks
+
+    Args:
+        data: a dataframe, an iterable of dataframe chunks, or a path to a csv/parquet file
+        chunksize: the number of rows per chunk when reading a file, defaults to None (DEFAULT_CHUNKSIZE)
+        columns: the columns to read from a file, defaults to None (all)
+
+    Yields:
+        dataframe chunks
+    """
+    if is_frame(data):
+        yield data
+        return
+
+    if not isinstance(data, (str, os.PathLike)):
+        yield from data
+        return
+
+    import pandas as pd
+
+    chunksize = chunksize or DEFAULT_CHUNKSIZE
+    extension = os.path.splitext(str(data))[1].lower()
+    if extension == '.parquet':
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Reading parquet files in chunks requires pyarrow: pip install pyarrow")
+        for batch in pq.ParquetFile(data).iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(data, chunksize=chunksize, usecols=columns)
+
+
+class Categories():
+    """incrementally assigns stable codes to values, in the order of their first appearance"""
+
+    def __init__(self):
+        self.index = {}
+        self.values = []
+
+
+    def __len__(self):
+        return len(self.values)
+
+
+    def encode(self, series):
+        """encodes the series with the global codes, adding the new values
+
+        Args:
+            series: pandas series
+
+        Returns:
+            numpy array of codes (-1 for missing values)
+        """
+        local_codes, uniques = series.factorize()
+        mapping = np.empty(len(uniques) + 1, dtype=np.intp)
+        mapping[-1] = -1 # local code -1 (missing) maps to -1
+        for i, value in enumerate(uniques):
+            if value not in self.index:
+                self.index[value] = len(self.values)
+                self.values.append(value)
+            mapping[i] = self.index[value]
+
+        return mapping[local_codes]
+
+
+def grow(array, size, fill=0):
+    """pads the first axis of the array with `fill` up to size"""
+    if array.shape[0] >= size:
+        return array
+    padding = np.full((size - array.shape[0],) + array.shape[1:], fill, dtype=array.dtype)
+    return np.concatenate([array, padding])
+
+
+class QuantileSketch():
+    """a mergeable quantile sketch (compactor hierarchy, as in the MRL/KLL sketches). Level h holds items of
+    weight 2**h; when a level exceeds the capacity `k`, it is sorted and every other item (random offset) is
+    promoted to the next level. The rank error is O(log(n/k)/k), with O(k log(n/k)) memory"""
+
+    def __init__(self, k=256, seed=None):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.count = 0
+        self.rng = np.random.default_rng(seed)
+
+
+    def update(self, values):
+        """adds the values to the sketch (missing values are skipped)
+
+        Args:
+            values: array-like of numbers
+        """
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        self.count += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.__compress()
+
+
+    def merge(self, other):
+        """merges another sketch into this one
+
+        Args:
+            other: the QuantileSketch
+        """
+        for h, items in enumerate(other.levels):
+            if h == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self.count += other.count
+        self.__compress()
+
+
+    def __compress(self):
+        h = 0
+        while h < len(self.levels):
+            items = self.levels[h]
+            if len(items) > self.k:
+                items = np.sort(items)
+                keep = len(items) - len(items) % 2 # an odd item out stays at this level
+                promoted = items[self.rng.integers(2):keep:2]
+                self.levels[h] = items[keep:]
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[h+1] = np.concatenate([self.levels[h+1], promoted])
+            h += 1
+
+
+    def quantile(self, q):
+        """estimates the q-th quantile, interpolating linearly between the neighbouring ranks like pandas/numpy
+        (every item stands for the ranks of its weight, and is placed at their middle). The quantile is
+        exact while the sketch holds all the values (no more than `k` values)
+
+        Args:
+            q: the quantile, between 0 and 1
+
+        Returns:
+            the estimated value (NaN if the sketch is empty)
+        """
+        if self.count == 0:
+            return np.nan
+
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2.**h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items, weights = items[order], weights[order]
+        ranks = np.cumsum(weights) - (weights + 1) / 2 # the middle (0-based) rank of every item
+        return float(np.interp(q * (weights.sum() - 1), ranks, items))
+
+
+def parse_quantile(reduce):
+    """the quantile of a reduction ('median', a float between 0 and 1, or 'p<percentile>' e.g. 'p90'),
+    or None if it is not a quantile"""
+    if reduce == 'median':
+        return 0.5
+    if isinstance(reduce, float) and 0 <= reduce <= 1:
+        return reduce
+    if isinstance(reduce, str) and reduce.startswith('p') and reduce[1:].replace('.', '', 1).isdigit():
+        return float(reduce[1:]) / 100
+
+    return None
+
+
+def chunked_reduce(chunks, group_col, value_col, reduce='mean', sketch_size=256):
+    """reduces the values per group over chunks, keeping only mergeable per-group state (counts, sums,
+    minimums, maximums or quantile sketches), so the memory is bounded by the chunk size and number of groups
+
+    Args:
+        chunks: iterable of dataframes
+        group_col: the column to group by
+        value_col: the column whose value to reduce
+        reduce: 'mean', 'sum', 'count', 'min', 'max', 'median', a quantile (float
+            between 0 and 1) or a percentile ('p90'), defaults to 'mean'
+        sketch_size: the capacity of the quantile sketches, defaults to 256
+
+    Returns:
+        labels (sorted), reduced values
+    """
+    q = parse_quantile(reduce)
+    if q is None and reduce not in ('mean', 'sum', 'count', 'min', 'max'):
+        raise ValueError(f"Unsupported reduction for chunked data: {reduce}")
+
+    groups = Categories()
+    counts, sums = np.zeros(0), np.zeros(0)
+    minimums, maximums = np.zeros(0), np.zeros(0)
+    sketches = []
+
+    for chunk in chunks:
+        codes = groups.encode(chunk[group_col])
+        values = chunk[value_col].to_numpy(dtype=float)
+        valid = (codes >= 0) & ~np.isnan(values)
+        codes, values = codes[valid], values[valid]
+        n_groups = len(groups)
+
+        if q is not None:
+            sketches.extend(QuantileSketch(k=sketch_size) for _ in range(n_groups - len(sketches)))
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(n_groups + 1))
+            sorted_values = values[order]
+            for code in np.flatnonzero(np.diff(bounds)):
+                sketches[code].update(sorted_values[bounds[code]:bounds[code+1]])
+            continue
+
+        counts = grow(counts, n_groups) + np.bincount(codes, minlength=n_groups)
+        sums = grow(sums, n_groups) + np.bincount(codes, weights=values, minlength=n_groups)
+        minimums, maximums = grow(minimums, n_groups, np.inf), grow(maximums, n_groups, -np.inf)
+        np.fmin.at(minimums, codes, values)
+        np.fmax.at(maximums, codes, values)
+
+    if q is not None:
+        reduced = np.array([sketch.quantile(q) for sketch in sketches])
+    elif reduce == 'count':
+        reduced = counts.astype(np.int64)
+    elif reduce == 'sum':
+        reduced = sums
+    else:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            reduced = {'mean': sums / counts, 'min': np.where(counts > 0, minimums, np.nan),
+                       'max': np.where(counts > 0, maximums, np.nan)}[reduce]
+
+    labels = groups.values
+    try: # sorted like groupby
+        order = sorted(range(len(labels)), key=labels.__getitem__)
+    except TypeError:
+        order = list(range(len(labels)))
+    return [labels[i] for i in order], np.asarray(reduced)[order]
+
+
+def chunked_pair_counts(chunks, basecol, stackcol):
+    """counts the (stack, base) pairs over chunks
+
+    Args:
+        chunks: iterable of dataframes
+        basecol: the base column
+        stackcol: the stack column
+
+    Returns:
+        stack labels, bases (both in order of appearance), count matrix of shape (labels, bases)
+    """
+    labels, bases = Categories(), Categories()
+    counts = np.zeros((0, 0), dtype=np.int64)
+
+    for chunk in chunks:
+        label_codes, base_codes = labels.encode(chunk[stackcol]), bases.encode(chunk[basecol])
+        n_labels, n_bases = len(labels), len(bases)
+        valid = (label_codes >= 0) & (base_codes >= 0)
+        chunk_counts = np.bincount(label_codes[valid] * n_bases + base_codes[valid],
+                                   minlength=n_labels * n_bases).reshape(n_labels, n_bases)
+        counts = grow(grow(counts, n_labels).T, n_bases).T + chunk_counts
+
+    return labels.values, bases.values, counts
+
+
+def chunked_value_counts(chunks, column):
+    """counts the values of a column over chunks
+
+    Args:
+        chunks: iterable of dataframes
+        column: the column
+
+    Returns:
+        values, counts (sorted by decreasing count, like `value_counts`)
+    """
+    values = Categories()
+    counts = np.zeros(0, dtype=np.int64)
+
+    for chunk in chunks:
+        codes = values.encode(chunk[column])
+        counts = grow(counts, len(values)) + np.bincount(codes[codes >= 0], minlength=len(values))
+
+    order = np.argsort(-counts, kind='stable')
+    return [values.values[i] for i in order], counts[order]
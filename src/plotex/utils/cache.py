@@ -0,0 +1,222 @@
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import contextlib
+
+
+def cache_dir():
+    """the user cache directory of plotex: `PLOTEX_CACHE_DIR` if set, else the platform's cache directory
+    (`XDG_CACHE_HOME`/~/.cache on Linux, ~/Library/Caches on macOS, `LOCALAPPDATA` on Windows)
+
+    Returns:
+        the path of the cache directory
+    """
+    if os.environ.get('PLOTEX_CACHE_DIR'):
+        return os.path.abspath(os.path.expanduser(os.environ['PLOTEX_CACHE_DIR']))
+
+    if sys.platform.startswith('win'):
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~/AppData/Local')
+        return os.path.join(base, 'plotex', 'Cache')
+    if sys.platform == 'darwin':
+        return os.path.expanduser('~/Library/Caches/plotex')
+
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(base, 'plotex')
+
+
+@contextlib.contextmanager
+def file_lock(fpath):
+    """cross-process exclusive lock for a file, held on a `.lock` file next to it
+
+    Args:
+        fpath: the path of the file to lock
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(fpath)), exist_ok=True)
+    with open(f"{fpath}.lock", 'a+') as lock_file:
+        if sys.platform.startswith('win'):
+            import msvcrt
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+@contextlib.contextmanager
+def atomic_write(fpath, mode='w'):
+    """opens a temporary file next to fpath for writing, and atomically renames it to fpath once written,
+    so readers never see a partially written file
+
+    Args:
+        fpath: the path of the file
+        mode: the file mode, 'w' or 'wb', defaults to 'w'
+
+    Yields:
+        the file object
+    """
+    base_folder = os.path.dirname(os.path.abspath(fpath))
+    os.makedirs(base_folder, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=base_folder, prefix=f".{os.path.basename(fpath)}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, mode) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, fpath)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+
+
+def read_json(fpath, validate=None):
+    """reads a cached json file, detecting corrupt (truncated/invalid) files
+
+    Args:
+        fpath: the path of the file
+        validate: function returning whether the loaded content is valid, defaults to None
+
+    Returns:
+        the content, or None if the file is missing or corrupt (corrupt files are removed)
+    """
+    try:
+        with open(fpath, 'r') as f:
+            content = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError):
+        content = None
+
+    if content is None or (validate is not None and not validate(content)):
+        print(f"[INFO] Removing the corrupt cache file {fpath}!")
+        with contextlib.suppress(OSError):
+            os.remove(fpath)
+        return None
+
+    return content
+
+
+class FigureCache():
+    """content-addressed store of saved figures: the artifacts are stored under the key of their inputs
+    (see `figure_key`), so an unchanged figure is copied from the cache instead of being drawn again.
+    The least recently used artifacts are evicted when the store exceeds `max_bytes`"""
+
+    def __init__(self, folder=None, max_bytes=512 * 2**20):
+        """initialize the store
+
+        Args:
+            folder: the folder of the store, defaults to None (`figures` in
+                the cache directory)
+            max_bytes: the maximum size of the store, defaults to 512 MB
+        """
+        self.folder = folder or os.path.join(cache_dir(), 'figures')
+        self.max_bytes = max_bytes
+        self.hits, self.misses = 0, 0
+
+
+    def path(self, key, format):
+        """the path of the artifact of the key in the format"""
+        return os.path.join(self.folder, key[:2], f"{key}.{format}")
+
+
+    def restore(self, key, paths):
+        """copies the cached artifacts of the key to their paths, if all of them are cached
+
+        Args:
+            key: the key of the figure
+            paths: dict of format to the path to copy the artifact to
+
+        Returns:
+            dict of format to the `path`, the `time` taken in seconds and the size in `bytes` (like `save`),
+            or None if an artifact is missing
+        """
+        report = {}
+        for format, fpath in paths.items():
+            start = time.perf_counter()
+            cached = self.path(key, format)
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(fpath)), exist_ok=True)
+                shutil.copyfile(cached, fpath)
+                os.utime(cached) # the modification time orders the eviction
+            except FileNotFoundError: # not cached, or evicted by another process
+                return None
+            report[format] = {'path': fpath, 'time': time.perf_counter() - start,
+                              'bytes': os.path.getsize(fpath), 'cached': True}
+
+        self.hits += 1
+        return report
+
+
+    def store(self, key, report):
+        """adds the saved artifacts to the store and evicts the least recently used ones if needed
+
+        Args:
+            key: the key of the figure
+            report: the report of `save`, with the path of every format
+        """
+        self.misses += 1 # counted when stored, as a figure may be looked up again before being drawn
+        for format, output in report.items():
+            if not isinstance(output['path'], (str, os.PathLike)):
+                continue
+            with open(output['path'], 'rb') as source, atomic_write(self.path(key, format), mode='wb') as f:
+                shutil.copyfileobj(source, f)
+        self.evict()
+
+
+    def entries(self):
+        """the cached artifacts as (modification time, size, path), least recently used first"""
+        entries = []
+        for root, _, files in os.walk(self.folder):
+            for name in files:
+                if name.startswith('.'): # being written by `atomic_write`
+                    continue
+                fpath = os.path.join(root, name)
+                try:
+                    stat = os.stat(fpath)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, fpath))
+        return sorted(entries)
+
+
+    def evict(self):
+        """removes the least recently used artifacts until the store fits in `max_bytes`
+
+        Returns:
+            the number of removed artifacts
+        """
+        entries = self.entries()
+        size, removed = sum(entry[1] for entry in entries), 0
+        for _, entry_size, fpath in entries:
+            if size <= self.max_bytes:
+                break
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(fpath)
+            size -= entry_size
+            removed += 1
+        return removed
+
+
+    def stats(self):
+        """the hit/miss counts of this process and the number and size of the stored artifacts"""
+        entries = self.entries()
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hits / lookups if lookups else None,
+                'entries': len(entries), 'bytes': sum(entry[1] for entry in entries)}
+
+
+    def clear(self):
+        """removes all the stored artifacts"""
+        shutil.rmtree(self.folder, ignore_errors=True)
@@ -0,0 +1,87 @@
+import json
+from plotex.utils.general import check_if_exists, save_file
+from plotex.utils.cache import file_lock
+from plotex.utils.profiling import span
+
+
+DEFAULT_TIMEOUT = 10
+
+
+def validators_path(fpath):
+    """the path of the file storing the HTTP validators (ETag/Last-Modified) for a cached file
+
+    Args:
+        fpath: the path of the cached file
+
+    Returns:
+        the path of the validators file
+    """
+    return f"{fpath}.meta.json"
+
+
+def load_validators(fpath):
+    """loads the stored HTTP validators for a cached file
+
+    Args:
+        fpath: the path of the cached file
+
+    Returns:
+        a dict with the `etag` and `last_modified` values (empty if not present)
+    """
+    meta_path = validators_path(fpath)
+    if not check_if_exists(meta_path):
+        return {}
+
+    try:
+        with open(meta_path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def fetch_if_modified(url, fpath, timeout=DEFAULT_TIMEOUT, force=False):
+    """fetches the content at the url and caches it at fpath. If the file is already cached \
+    (and force is False), the request is made conditional on the stored ETag/Last-Modified \
+    validators, so an unchanged remote file is not downloaded again
+
+    Args:
+        url: the url to fetch
+        fpath: the path to cache the content at (`.json` paths are validated and saved as json)
+        timeout: the timeout in seconds for the request, defaults to DEFAULT_TIMEOUT
+        force: whether to download the content unconditionally, defaults to False
+
+    Raises:
+        Exception: if issue in fetching and decoding
+
+    Returns:
+        bool: whether new content was written to fpath
+    """
+    with span('config.fetch', url=url), file_lock(fpath): # a single process fetches at a time, the others revalidate its copy
+        headers = {}
+        if not force and check_if_exists(fpath):
+            validators = load_validators(fpath)
+            if validators.get('etag'):
+                headers['If-None-Match'] = validators['etag']
+            if validators.get('last_modified'):
+                headers['If-Modified-Since'] = validators['last_modified']
+
+        import requests # requests is only needed for remote fetches
+
+        print(f"[INFO] Fetching configuration parameters from {url}!")
+        try:
+            r = requests.get(url, headers=headers, timeout=timeout)
+            if r.status_code == 304:
+                print(f"[INFO] Configuration at {url} is unchanged!")
+                return False
+            r.raise_for_status()
+            content = r.content.decode()
+            if fpath.endswith('.json'):
+                content = json.loads(content)
+        except Exception as e:
+            raise Exception(f'An error occured while fetching and decoding the url content: {e}') from e
+
+        save_file(content=content, fpath=fpath)
+        save_file(content={'url': url, 'etag': r.headers.get('ETag'),
+                           'last_modified': r.headers.get('Last-Modified')},
+                  fpath=validators_path(fpath))
+        return True
@@ -1,5 +1,12 @@
+import io
 import os, json
+import sys
+import time
 import functools
+import contextlib
+from plotex.utils.cache import atomic_write, FigureCache
+from plotex.utils.hashing import hash_value
+from plotex.utils.profiling import span, count, gauge, get_profiler
 
 
 def copy_docstring(method, func=None):
@@ -11,21 +18,18 @@ def copy_docstring(method, func=None):
 
 
 def save_file(content, fpath):
-    """saves the supplied content in a text file
+    """saves the supplied content in a text file, atomically (written to a temporary file and renamed)
 
     Args:
         content (str/dict): the content
         fpath (str): the file path to save at
     """
-    base_folder = os.path.dirname(fpath)
-    os.makedirs(base_folder, exist_ok=True)
-    
     if fpath.endswith('.json'):
-        with open(fpath, "w") as f:
+        with atomic_write(fpath) as f:
             json.dump(content, f)
     else:
         assert isinstance(content, str)
-        with open(fpath, "w") as f:
+        with atomic_write(fpath) as f:
             f.write(content)
 
 
@@ -76,19 +80,162 @@ def find_value_from_keys(main_dict, keys):
     return None
 
 
-def save(save_path, fig=None, plt=None, format='pdf'):
-    """utility function to save the figure
+# the formats encoded from the Agg buffer
+RASTER_FORMATS = ('png', 'jpg', 'jpeg', 'tif', 'tiff', 'webp', 'raw', 'rgba')
+
+
+def file_size(fpath):
+    """the size of the file in bytes, or None if fpath is not a file path"""
+    if isinstance(fpath, (str, os.PathLike)) and os.path.exists(fpath):
+        return os.path.getsize(fpath)
+    return None
+
+
+def render_rgba(fig, dpi, **savekwargs):
+    """draws the figure once with Agg (honouring `savefig` options like bbox_inches and transparent)
+
+    Args:
+        fig: the figure object
+        dpi: the resolution
+        **savekwargs: keyword arguments for `savefig`
+
+    Returns:
+        the RGBA buffer as a numpy array of shape (height, width, 4)
+    """
+    import numpy as np
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    canvas = fig.canvas
+    agg = FigureCanvasAgg(fig) # attaches itself to the figure until restored
+    try:
+        fig.savefig(io.BytesIO(), format='rgba', dpi=dpi, **savekwargs) # drawn by `agg`
+        rgba = np.asarray(agg.renderer.buffer_rgba()).copy()
+    finally:
+        fig.set_canvas(canvas)
+
+    return rgba
+
+
+def encode_rgba(rgba, fpath, format, dpi):
+    """encodes an RGBA buffer (from `render_rgba`) into a raster format
+
+    Args:
+        rgba: the RGBA buffer
+        fpath: the path to save at
+        format: the raster format
+        dpi: the resolution stored in the file
+    """
+    import matplotlib
+    import matplotlib.image
+
+    if format in ('raw', 'rgba'):
+        with open(fpath, 'wb') as f:
+            f.write(rgba.tobytes())
+    elif format in ('jpg', 'jpeg'): # blended against white, like `savefig`
+        with matplotlib.rc_context({'savefig.facecolor': 'white'}):
+            matplotlib.image.imsave(fpath, rgba, format='jpeg', origin='upper', dpi=dpi)
+    else: # PIL only knows the long name of tiff
+        matplotlib.image.imsave(fpath, rgba, format='tiff' if format == 'tif' else format, origin='upper', dpi=dpi)
+
+
+def output_paths(save_path, format='pdf', formats=None):
+    """the output path of every format (see `save`)"""
+    if formats is None:
+        return {format: save_path}
+    
+    root = os.path.splitext(save_path)[0]
+    return {fmt: f"{root}.{fmt}" for fmt in dict.fromkeys(fmt.lower().lstrip('.') for fmt in formats)}
+
+
+def save(save_path, fig=None, plt=None, format='pdf', formats=None, dpi=None, cache_key=None, cache=None,
+         **savekwargs):
+    """utility function to save the figure. With multiple `formats`, all of them are produced from \
+    as few draws as possible: the vector formats are drawn once each, and all the raster formats \
+    are encoded from a single Agg draw. With a `cache_key` (see `utils.hashing.figure_key`), the \
+    artifacts are copied from the figure cache when they exist, without drawing, and stored otherwise
 
     Args:
         save_path: the save path for the figure (including the
-            extension)
+            extension). With `formats`, the extension is replaced by each format
         fig: the figure object, defaults to None
-        plt: the plt object, defaults to None
+        plt: the plt object (its current figure is saved if `fig`
+            is None), defaults to None
         format: the format of the output plot, defaults to 'pdf'
+        formats: list of formats to save in (e.g. ['pdf', 'png', 'svg']),
+            defaults to None (only `format`)
+        dpi: the resolution of the raster formats, defaults to None
+            (`savefig.dpi`)
+        cache_key: the content hash of the figure, defaults to None (no
+            caching). If neither `fig` nor `plt` is given, only the cache is looked up
+        cache: the FigureCache, defaults to None (the default store)
+        **savekwargs: keyword arguments for `savefig` (e.g. bbox_inches)
+
+    Returns:
+        dict of format to the `path`, the `time` taken in seconds and the size in `bytes` \
+        (the time of the shared Agg draw is counted in the first raster format), \
+        or None if only the cache was looked up and missed
     """
-    assert fig is not None or plt is not None
+    with contextlib.ExitStack() as stack:
+        if getattr(fig, 'profile', None) is not None: # figures from `plotex.figure` are saved with their style
+            stack.enter_context(fig.profile.activate())
+        
+        if cache_key is not None and isinstance(save_path, (str, os.PathLike)):
+            from plotex.export import resolve_save_kwargs
+        
+            cache = cache or FigureCache()
+            paths = output_paths(save_path, format=format, formats=formats)
+            entry = hash_value((cache_key, list(paths), resolve_save_kwargs(dpi=dpi, **savekwargs)))
+            with span('save.cache'):
+                report = cache.restore(entry, paths)
+            if report is not None or (fig is None and plt is None):
+                return report
+        else:
+            cache = None
+        
+        assert fig is not None or plt is not None
+        
+        if fig is None:
+            fig = plt.gcf()
+        
+        with span('save', formats=formats or [format]):
+            report = save_formats(fig, save_path, format=format, formats=formats, dpi=dpi, **savekwargs)
+        if cache is not None:
+            cache.store(entry, report)
+        
+        if get_profiler() is not None:
+            count('bytes_written', sum(output['bytes'] or 0 for output in report.values()))
+            if 'matplotlib.pyplot' in sys.modules:
+                gauge('open_figures', len(sys.modules['matplotlib.pyplot'].get_fignums()))
+        return report
+
+
+def save_formats(fig, save_path, format='pdf', formats=None, dpi=None, **savekwargs):
+    """saves the figure in the formats (see `save`)"""
+    if formats is None:
+        start = time.perf_counter()
+        with span(f'save.{format}'):
+            fig.savefig(save_path, format=format, dpi=dpi, **savekwargs)
+        return {format: {'path': save_path, 'time': time.perf_counter() - start, 'bytes': file_size(save_path)}}
+    
+    import matplotlib
+    
+    if dpi is None:
+        dpi = matplotlib.rcParams['savefig.dpi']
+    if dpi == 'figure':
+        dpi = fig.dpi
+    
+    report = {}
+    rgba = None
+    for fmt, fpath in output_paths(save_path, formats=formats).items():
+        start = time.perf_counter()
+        with span(f'save.{fmt}'):
+            if fmt in RASTER_FORMATS:
+                if rgba is None:
+                    with span('save.draw_agg'):
+                        rgba = render_rgba(fig, dpi, **savekwargs)
+                encode_rgba(rgba, fpath, fmt, dpi)
+            else:
+                fig.savefig(fpath, format=fmt, dpi=dpi, **savekwargs)
+        report[fmt] = {'path': fpath, 'time': time.perf_counter() - start, 'bytes': file_size(fpath)}
     
-    if fig is not None:
-        fig.savefig(save_path, format=format)
-    if plt is not None:
-        plt.savefig(save_path, format=format)
\ No newline at end of file
+    return report
@@ -1,5 +1,8 @@
+import os
+import types
 import hashlib
 import base64
+import functools
 
 
 def hash_url(url):
@@ -19,4 +22,166 @@ def hash_url(url):
     file_name = file_name.replace('/', '_').replace('+', '-')
     # Truncate the file name to a maximum length
     file_name = file_name[:10]
-    return file_name
\ No newline at end of file
+    return file_name
+
+
+def hash_frame(data, digest=None):
+    """fast content hash of a dataframe/series: the raw bytes of the numeric (and categorical code)
+    columns are hashed directly, and only the other columns go through `pd.util.hash_pandas_object`
+
+    Args:
+        data: the dataframe or series
+        digest: the hashlib object to update, defaults to None (a new one)
+
+    Returns:
+        the hex digest
+    """
+    import numpy as np
+    import pandas as pd
+
+    digest = digest or hashlib.blake2b(digest_size=20)
+    frame = data.to_frame() if isinstance(data, pd.Series) else data
+    digest.update(repr((type(data).__name__, frame.shape, [str(col) for col in frame.columns],
+                        [str(dtype) for dtype in frame.dtypes])).encode('utf-8'))
+
+    for values in [frame.index.to_series(), *(frame.iloc[:, i] for i in range(frame.shape[1]))]:
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            hash_frame(pd.Series(values.cat.categories), digest)
+            values = values.cat.codes
+        array = values.to_numpy()
+        if array.dtype.kind in 'biufcmM':
+            digest.update(np.ascontiguousarray(array).view(np.uint8))
+        else:
+            digest.update(pd.util.hash_pandas_object(values, index=False).to_numpy())
+
+    return digest.hexdigest()
+
+
+def hash_code(code, digest):
+    """hashes a code object: its bytecode, the names it references and its constants (including the code
+    of the nested functions)"""
+    digest.update(code.co_code)
+    digest.update(repr((code.co_names, code.co_varnames)).encode('utf-8'))
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            hash_code(const, digest)
+        else:
+            digest.update(repr(const).encode('utf-8'))
+
+
+def hash_callable(value, digest):
+    """hashes a callable: the python functions by their qualified name, code, defaults and closure values,
+    partials by their function and arguments, wrappers by the function they wrap, and the builtins and classes
+    by their qualified name
+
+    Raises:
+        TypeError: for the other callables (e.g. bound methods and callable instances), whose
+            state can't be hashed reliably
+    """
+    import numpy as np
+
+    name = f"{getattr(value, '__module__', '')}.{getattr(value, '__qualname__', getattr(value, '__name__', ''))}"
+    if isinstance(value, types.FunctionType):
+        digest.update(name.encode('utf-8'))
+        hash_code(value.__code__, digest)
+        hash_value((value.__defaults__, value.__kwdefaults__), digest)
+        for cell in value.__closure__ or ():
+            try:
+                contents = cell.cell_contents
+            except ValueError: # an empty cell
+                digest.update(b'empty')
+                continue
+            if contents is value: # a recursive function
+                digest.update(b'self')
+            else:
+                hash_value(contents, digest)
+    elif isinstance(value, functools.partial):
+        digest.update(b'partial')
+        hash_value((value.func, value.args, value.keywords), digest)
+    elif hasattr(value, '__wrapped__'): # e.g. the numpy functions, dispatching to a python function
+        digest.update(name.encode('utf-8'))
+        hash_callable(value.__wrapped__, digest)
+    elif isinstance(value, (type, np.ufunc)) or (isinstance(value, types.BuiltinFunctionType) and
+                                                 isinstance(value.__self__, (types.ModuleType, type(None)))):
+        digest.update(name.encode('utf-8'))
+    else:
+        raise TypeError(f"Cannot hash the callable {value!r}, the figure can't be cached")
+
+
+def hash_value(value, digest=None):
+    """stable content hash of (nested) arguments: dicts, lists, tuples, scalars, numpy arrays, dataframes,
+    file paths (by their path, size and modification time) and functions (see `hash_callable`)
+
+    Args:
+        value: the value
+        digest: the hashlib object to update, defaults to None (a new one)
+
+    Returns:
+        the hex digest
+
+    Raises:
+        TypeError: for the callables that can't be hashed (see `hash_callable`)
+    """
+    digest = digest or hashlib.blake2b(digest_size=20)
+
+    if isinstance(value, dict):
+        digest.update(b'dict')
+        for key in sorted(value, key=repr):
+            hash_value(key, digest)
+            hash_value(value[key], digest)
+    elif isinstance(value, (list, tuple)):
+        digest.update(f'{type(value).__name__}{len(value)}'.encode('utf-8'))
+        for item in value:
+            hash_value(item, digest)
+    elif hasattr(value, 'to_numpy') and hasattr(value, 'index'): # dataframe or series
+        hash_frame(value, digest)
+    elif hasattr(value, 'dtype') and hasattr(value, 'tobytes'): # numpy array
+        digest.update(repr((value.dtype.str, value.shape)).encode('utf-8'))
+        digest.update(value.tobytes())
+    elif callable(value):
+        hash_callable(value, digest)
+    elif isinstance(value, str) and os.path.isfile(value):
+        stat = os.stat(value)
+        digest.update(repr((os.path.abspath(value), stat.st_size, stat.st_mtime_ns)).encode('utf-8'))
+    else:
+        digest.update(repr(value).encode('utf-8'))
+
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def _versions():
+    from importlib import metadata
+
+    versions = []
+    for package in ('plotex', 'matplotlib', 'seaborn'):
+        try:
+            versions.append(metadata.version(package))
+        except metadata.PackageNotFoundError:
+            versions.append(None)
+    return tuple(versions)
+
+
+def figure_key(data, plot, kwargs=None, **extra):
+    """content hash of a figure, from its data, the plotting helper and its arguments, the current style
+    (the rcParams, so it should be computed after sizing the plot) and the plotex/matplotlib/seaborn versions
+
+    Args:
+        data: the data of the figure (dataframe, file path, ...)
+        plot: the plotting helper (function or name)
+        kwargs: the arguments of the helper, defaults to None
+        **extra: other inputs of the figure (e.g. the size or text arguments)
+
+    Returns:
+        the hex digest
+
+    Raises:
+        TypeError: if an argument can't be hashed (see `hash_callable`)
+    """
+    from plotex.pool import style_profile
+
+    digest = hashlib.blake2b(digest_size=20)
+    for value in (data, plot, kwargs or {}, extra):
+        hash_value(value, digest)
+    digest.update(f"{style_profile()}{_versions()}".encode('utf-8'))
+    return digest.hexdigest()
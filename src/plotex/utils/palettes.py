@@ -0,0 +1,92 @@
+import hashlib
+import functools
+import numpy as np
+from matplotlib.colors import to_rgba_array
+
+
+# the number of (palette, number of colors) pairs kept resolved
+MAX_PALETTES = 64
+
+
+@functools.lru_cache(maxsize=MAX_PALETTES)
+def _resolve(name, n_colors):
+    import seaborn as sns
+
+    rgba = to_rgba_array(sns.color_palette(name, n_colors))
+    rgba.setflags(write=False) # shared between the callers
+    return rgba
+
+
+def resolve_palette(cmap, n_colors=None):
+    """the colors of a palette as an RGBA array. Named palettes (seaborn/matplotlib) are resolved once
+    and memoized (the MAX_PALETTES most recently used)
+
+    Args:
+        cmap: the name of the palette, or a list/array of colors
+        n_colors: the number of colors, defaults to None (the size of the
+            palette, 6 for the matplotlib colormaps)
+
+    Returns:
+        read-only array of shape (n_colors, 4)
+    """
+    if isinstance(cmap, str):
+        return _resolve(cmap, n_colors)
+
+    rgba = to_rgba_array(cmap)
+    return rgba if n_colors is None else rgba[np.arange(n_colors) % len(rgba)]
+
+
+def category_hash(category, namespace='category'):
+    """the stable hash of a category (and its namespace), the same in every process and worker"""
+    digest = hashlib.blake2b(f"{namespace}\0{category}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def category_indices(categories, n_colors, namespace='category'):
+    """the palette index of every category. The distinct categories are visited in the order of their hashes
+    (so the result doesn't depend on the order of the categories or on what was plotted before), each taking
+    the slot of its hash, or the next free one if it is taken. The colors are only reused once the palette
+    is exhausted, so up to `n_colors` categories get distinct colors
+
+    Args:
+        categories: the categories (e.g. the labels of the bars, hashable)
+        n_colors: the number of colors of the palette
+        namespace: the namespace of the categories, defaults to 'category'
+            (e.g. 'value' for the value columns, so they don't share the
+            colors of the labels of the same name)
+
+    Returns:
+        array of the indices
+    """
+    hashes = {}
+    for category in categories:
+        if category not in hashes:
+            hashes[category] = category_hash(category, namespace)
+
+    slots, used = {}, np.zeros(n_colors, dtype=bool)
+    for category in sorted(hashes, key=hashes.get):
+        if used.all(): # more categories than colors
+            used[:] = False
+        slot = hashes[category] % n_colors
+        while used[slot]:
+            slot = (slot + 1) % n_colors
+        used[slot] = True
+        slots[category] = slot
+
+    return np.fromiter((slots[category] for category in categories), dtype=np.intp, count=len(categories))
+
+
+def category_colors(categories, cmap='pastel', namespace='category'):
+    """the stable colors of the categories in the palette (see `category_indices`): distinct as long as
+    there are no more categories than colors
+
+    Args:
+        categories: the categories (e.g. the labels of the bars)
+        cmap: the name of the palette, or a list/array of colors, defaults to 'pastel'
+        namespace: the namespace of the categories, defaults to 'category'
+
+    Returns:
+        array of shape (len(categories), 4)
+    """
+    palette = resolve_palette(cmap)
+    return palette[category_indices(list(categories), len(palette), namespace)]
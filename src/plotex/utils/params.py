@@ -0,0 +1,146 @@
+import threading
+import contextlib
+import matplotlib
+from plotex.utils.profiling import count
+
+
+# per thread: the stack of the journals of the active `record_params` scopes (`journals`), and the
+# rcParams of the active `scoped_params` scope (`params`)
+_LOCAL = threading.local()
+
+# the number of active `scoped_params` scopes (in all the threads), the global rcParams have the
+# ThreadParams class while it is positive
+_SCOPES = 0
+_SCOPES_LOCK = threading.Lock()
+
+
+def _journals():
+    if not hasattr(_LOCAL, 'journals'):
+        _LOCAL.journals = []
+    return _LOCAL.journals
+
+
+class ThreadParams(matplotlib.RcParams):
+    """the class of the global rcParams while `scoped_params` scopes are active: in a thread with scoped
+    params, the reads and writes of the global rcParams go to the params of the thread instead of the shared
+    dict. Outside the scopes it behaves like RcParams. Relies on `RcParams._get/_set/_update_raw`, through
+    which recent matplotlib versions read and write (including `rc_context` and pyplot)"""
+
+    def _get(self, key):
+        params = getattr(_LOCAL, 'params', None)
+        if params is not None and key in params and self is matplotlib.rcParams:
+            return params[key]
+        return dict.__getitem__(self, key)
+
+
+    def _set(self, key, val):
+        params = getattr(_LOCAL, 'params', None)
+        if params is not None and key in params and self is matplotlib.rcParams:
+            params[key] = val
+        else:
+            dict.__setitem__(self, key, val)
+
+
+    def _update_raw(self, other_params):
+        if isinstance(other_params, matplotlib.RcParams):
+            other_params = dict.items(other_params)
+        for key, val in dict(other_params).items():
+            self._set(key, val)
+
+
+def thread_scoping_supported():
+    """whether the matplotlib version routes all the rcParams reads and writes through `RcParams._get`,
+    `_set` and `_update_raw` (older versions update the dict directly, bypassing ThreadParams)"""
+    return all(hasattr(matplotlib.RcParams, name) for name in ('_get', '_set', '_update_raw'))
+
+
+def set_params(params):
+    """updates the rcParams with the supplied params. Only the keys whose value differs are
+    written, and their previous values are recorded in the active `record_params` scopes
+
+    Args:
+        params: dict of rcParams keys and values
+
+    Returns:
+        the number of updated keys
+    """
+    rc = matplotlib.rcParams
+    delta = {k: v for k, v in params.items() if rc[k] != v}
+    if not delta:
+        return 0
+
+    for journal in _journals():
+        for key in delta:
+            if key not in journal:
+                journal[key] = rc[key]
+
+    rc.update(delta)
+    count('rcparams_updates', len(delta))
+    return len(delta)
+
+
+@contextlib.contextmanager
+def record_params():
+    """context manager recording the rcParams changed (through `set_params`) inside its scope,
+    and restoring only those keys on exit
+
+    Yields:
+        the journal, a dict of the changed keys and their original values
+    """
+    journal = {}
+    _journals().append(journal)
+    try:
+        yield journal
+    finally:
+        _journals().remove(journal)
+        set_params(journal)
+
+
+def current_params():
+    """the rcParams in effect in the current thread (see `scoped_params`)
+
+    Returns:
+        dict of rcParams
+    """
+    params = getattr(_LOCAL, 'params', None)
+    return dict(params) if params is not None else dict(dict.items(matplotlib.rcParams))
+
+
+@contextlib.contextmanager
+def scoped_params(params):
+    """context manager making a copy of `params` the rcParams of the current thread: inside the scope, the
+    reads and writes of `matplotlib.rcParams` (by matplotlib, seaborn or plotex) use the copy, so other
+    threads are not affected and the shared rcParams are never written. The global rcParams are given
+    the ThreadParams class while scopes are active (in any thread), and their class is restored when the
+    last scope exits, so the code not using scopes is not slowed down
+
+    Args:
+        params: dict of rcParams (all the keys, e.g. from `current_params`)
+
+    Raises:
+        Exception: if the matplotlib version doesn't support thread-scoped rcParams
+
+    Yields:
+        the params of the thread
+    """
+    global _SCOPES
+    if not thread_scoping_supported():
+        raise Exception(f"Thread-scoped rcParams are not supported by matplotlib {matplotlib.__version__}, "
+                        "please upgrade matplotlib")
+
+    rc = matplotlib.rcParams
+    with _SCOPES_LOCK:
+        if _SCOPES == 0:
+            rc.__class__ = ThreadParams
+        _SCOPES += 1
+
+    previous = getattr(_LOCAL, 'params', None)
+    _LOCAL.params = {key: val for key, val in params.items() if key in rc and key not in ('backend', 'backend_fallback')}
+    try:
+        yield _LOCAL.params
+    finally:
+        _LOCAL.params = previous
+        with _SCOPES_LOCK:
+            _SCOPES -= 1
+            if _SCOPES == 0:
+                rc.__class__ = matplotlib.RcParams
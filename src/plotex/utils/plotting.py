@@ -1,36 +1,162 @@
-import matplotlib.pyplot as plt
+from __future__ import annotations
+from typing import TYPE_CHECKING
+import functools
 import matplotlib
+import numpy as np
+from matplotlib.font_manager import FontProperties
 
+if TYPE_CHECKING: # only needed for the annotations, pyplot is passed in by the caller
+    import matplotlib.pyplot as plt
 
-def optimize_labels(labels, values):
-    """optimizes the bar chart labels by interweaving the labels based on their length to minimize overlap
+
+# the Agg renderer used for measuring text, created on first use
+_RENDERER = None
+
+
+@functools.lru_cache(maxsize=4096)
+def text_extent(text, family=None, size=None, weight=None, usetex=None):
+    """measures the rendered extent of a text, cached per (text, font family, size, weight, usetex)
+
+    Args:
+        text: the text
+        family: tuple of font families, defaults to None (`font.family`)
+        size: the font size in points (or a relative size), defaults to
+            None (`font.size`)
+        weight: the font weight, defaults to None (`font.weight`)
+        usetex: whether the text is rendered with TeX, defaults to None (`text.usetex`)
+
+    Returns:
+        (width, height, descent) in points
+    """
+    global _RENDERER
+    if _RENDERER is None:
+        from matplotlib.backends.backend_agg import RendererAgg
+        _RENDERER = RendererAgg(1, 1, 72) # at 72 dpi, pixels are points
+
+    if usetex is None: usetex = matplotlib.rcParams['text.usetex']
+    prop = FontProperties(family=list(family) if family else None, size=size, weight=weight)
+    try:
+        return _RENDERER.get_text_width_height_descent(text, prop, ismath='TeX' if usetex else False)
+    except (RuntimeError, OSError): # TeX not available, measure with the regular fonts instead
+        return _RENDERER.get_text_width_height_descent(text, prop, ismath=False)
+
+
+def measure_text(text, fontsize=None, usetex=None):
+    """measures a text with the current rcParams font (see `text_extent`)
+
+    Args:
+        text: the text
+        fontsize: the font size, defaults to None (`font.size`)
+        usetex: whether to measure the text rendered with TeX (one TeX run per
+            uncached text), defaults to None (`text.usetex`)
+
+    Returns:
+        (width, height, descent) in points
+    """
+    rc = matplotlib.rcParams
+    return text_extent(str(text), family=tuple(rc['font.family']), size=fontsize, weight=rc['font.weight'],
+                       usetex=rc['text.usetex'] if usetex is None else usetex)
+
+
+def optimize_labels(labels, values, widths=None):
+    """optimizes the bar chart labels by interweaving the labels based on their length to minimize overlap.
+    Works on the positions of the labels, so duplicate and non-string labels are supported
 
     Args:
         labels: the original labels
         values: the original values
+        widths: the rendered widths of the labels (e.g. from `measure_text`),
+            defaults to None (uses the number of characters)
 
     Returns:
         optimized labels, values
     """
-    mapper = {l:v for l,v in zip(labels, values)}
-    sorted_labels = sorted(labels, key=len)
-
     n = len(labels)
-    start, end = 0, n-1
+    if widths is None:
+        widths = np.fromiter((len(str(label)) for label in labels), dtype=np.intp, count=n)
+    sorted_indices = np.argsort(widths, kind='stable')
 
-    final_labels = []
+    # interweave the shortest and the longest remaining labels: 0, n-1, 1, n-2, ...
+    positions = np.arange(n)
+    interweaved = np.where(positions % 2 == 0, positions // 2, n - 1 - positions // 2)
+    order = sorted_indices[interweaved]
+
+    final_labels = [labels[i] for i in order]
+    final_values = np.asarray(values)[order]
+    return final_labels, final_values
+
+
+def wrap_label(text, max_width, fontprops):
+    """wraps the text at spaces into lines no wider than max_width (a single word can still be wider)
+
+    Args:
+        text: the text
+        max_width: the maximum width in points
+        fontprops: tuple of (family, size, weight, usetex) for `text_extent`
 
-    while end >= start:
-        if end == start:
-            final_labels.append(sorted_labels[start])
+    Returns:
+        the list of lines
+    """
+    lines = []
+    for word in text.split():
+        candidate = f"{lines[-1]} {word}" if lines else word
+        if lines and text_extent(candidate, *fontprops)[0] <= max_width:
+            lines[-1] = candidate
         else:
-            final_labels.append(sorted_labels[start])
-            final_labels.append(sorted_labels[end])
-        start += 1
-        end -= 1
+            lines.append(word)
+    return lines or [text]
 
-    final_values = [mapper[label] for label in final_labels]
-    return final_labels, final_values
+
+def fit_xticklabels(ax, rotations=(0, 30, 45, 60, 90), wrap=True, max_lines=2, padding=2.):
+    """lays out the xtick labels so they don't overlap, using their measured (cached) extents: keeps them \
+    horizontal if they fit, else wraps them at spaces (up to `max_lines`), else uses the smallest rotation \
+    at which neighbouring labels clear each other
+
+    Args:
+        ax: the matplotlib axis object
+        rotations: the candidate rotations in degrees, defaults to (0, 30, 45, 60, 90)
+        wrap: whether to try wrapping the labels, defaults to True
+        max_lines: the maximum number of lines when wrapping, defaults to 2
+        padding: the minimum gap between labels in points, defaults to 2.
+
+    Returns:
+        the chosen layout, 'wrap' or the rotation in degrees
+    """
+    ticks = np.asarray(ax.get_xticks(), dtype=float)
+    ticklabels = ax.get_xticklabels()
+    texts = [t.get_text() for t in ticklabels]
+    if len(ticks) < 2 or not any(texts):
+        return 0
+
+    fig = ax.get_figure()
+    positions = ax.transData.transform(np.column_stack([ticks, np.zeros_like(ticks)]))[:, 0] * 72 / fig.dpi
+    spacing = np.min(np.abs(np.diff(np.sort(positions)))) - padding
+
+    prop = ticklabels[0].get_fontproperties()
+    fontprops = (tuple(prop.get_family()), prop.get_size_in_points(), prop.get_weight(), ticklabels[0].get_usetex())
+    extents = np.array([text_extent(text, *fontprops) for text in texts])
+    widths, height = extents[:, 0], extents[:, 1].max()
+
+    if widths.max() <= spacing and 0 in rotations:
+        ax.set_xticks(ticks, labels=texts, rotation=0, ha='center')
+        return 0
+
+    if wrap:
+        wrapped = [wrap_label(text, spacing, fontprops) for text in texts]
+        if max(len(lines) for lines in wrapped) <= max_lines and \
+                all(text_extent(line, *fontprops)[0] <= spacing for lines in wrapped for line in lines):
+            ax.set_xticks(ticks, labels=['\n'.join(lines) for lines in wrapped], rotation=0, ha='center')
+            return 'wrap'
+
+    # rotated labels are separated horizontally by spacing * sin(angle), which has to clear their height,
+    # else the largest rotation is used
+    rotation = max(rotations)
+    for rotation in sorted(r for r in rotations if r > 0):
+        if spacing * np.sin(np.radians(rotation)) >= height:
+            break
+    ax.set_xticks(ticks, labels=texts, rotation=rotation, ha='right' if 0 < rotation < 90 else 'center',
+                  rotation_mode='anchor' if 0 < rotation < 90 else 'default')
+    return rotation
 
 
 def set_text(plt:plt=None, ax:matplotlib.axes.Axes=None, xlabel=None, ylabel=None, title=None, xticklocs=None, xticklabels=None,
@@ -45,8 +171,9 @@ def set_text(plt:plt=None, ax:matplotlib.axes.Axes=None, xlabel=None, ylabel=Non
         title: the title string, defaults to None
         xticklocs: the location of xticks, defaults to None
         xticklabels: the labels of xticks, defaults to None
-        xtickrot: the rotation angle in degrees of xtick labels,
-            defaults to None
+        xtickrot: the rotation angle in degrees of xtick labels, or 'auto'
+            to lay them out using their measured extents (`fit_xticklabels`,
+            requires `ax`), defaults to None
         yticklocs: the location of yticks, defaults to None
         yticklabels: the labels of yticks, defaults to None
         ytickrot: the rotation angle in degrees of ytick labels,
@@ -67,7 +194,7 @@ def set_text(plt:plt=None, ax:matplotlib.axes.Axes=None, xlabel=None, ylabel=Non
         if ax is not None: ax.set_title(title)
         elif plt is not None: plt.title(title)
         
-    if xtickrot is not None:
+    if xtickrot is not None and xtickrot != 'auto':
         if ax is not None: ax.tick_params(axis='x', rotation=xtickrot)
         elif plt is not None: plt.xticks(rotation=xtickrot)
         
@@ -76,6 +203,10 @@ def set_text(plt:plt=None, ax:matplotlib.axes.Axes=None, xlabel=None, ylabel=Non
         if ax is not None: ax.set_xticks(xticklocs, labels=xticklabels)
         elif plt is not None: plt.xticks(ticks=xticklocs, labels=xticklabels)
         
+    if xtickrot == 'auto':
+        assert ax is not None, "xtickrot='auto' requires the axis"
+        fit_xticklabels(ax)
+        
     if ytickrot is not None:
         if ax is not None: ax.tick_params(axis='y', rotation=ytickrot)
         elif plt is not None: plt.yticks(rotation=ytickrot)
@@ -125,4 +256,24 @@ def custom_legend(ax, text, xy=(0.5, 0.5), box=True, box_bgcolor=(1.0, 1, 1, 1),
     
     
 custom_text = custom_legend
-    
\ No newline at end of file
+
+
+def axes_pixels(ax, dpi=None):
+    """the size of the axes in pixels, at the dpi the figure will be saved with
+
+    Args:
+        ax: matplotlib axis object
+        dpi: the dpi, defaults to None (`savefig.dpi`, or the figure dpi)
+
+    Returns:
+        (width, height) in pixels
+    """
+    fig = ax.get_figure()
+    if dpi is None:
+        dpi = matplotlib.rcParams['savefig.dpi']
+        if dpi == 'figure': dpi = fig.dpi
+    
+    bbox = ax.get_position()
+    fig_width, fig_height = fig.get_size_inches()
+    width, height = bbox.width * fig_width * dpi, bbox.height * fig_height * dpi
+    return max(int(round(width)), 1), max(int(round(height)), 1)
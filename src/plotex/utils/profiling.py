@@ -0,0 +1,197 @@
+import os
+import json
+import time
+import atexit
+import functools
+import threading
+import contextlib
+
+
+# the active profiler, None when profiling is disabled (the instrumentation then returns immediately)
+_PROFILER = None
+_NO_SPAN = contextlib.nullcontext()
+
+
+class Profiler():
+    """records nested timing spans and counters of the plotex pipeline (config, styling, aggregation,
+    drawing and saving), exportable as json or in the Chrome trace format (chrome://tracing, Perfetto)"""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.spans = [] # dicts with the name, start and duration in seconds, depth, thread and args
+        self.counters = {}
+        self.samples = [] # (time, counter, value) for the trace
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+
+    @contextlib.contextmanager
+    def span(self, name, **args):
+        """context manager timing a span, nested in the enclosing span of the same thread
+
+        Args:
+            name: the name of the span
+            **args: extra information stored with the span
+        """
+        depth = getattr(self.local, 'depth', 0)
+        self.local.depth = depth + 1
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            end = time.perf_counter()
+            self.local.depth = depth
+            self.spans.append({'name': name, 'start': start - self.origin, 'duration': end - start,
+                               'depth': depth, 'thread': threading.get_ident(), 'args': args})
+
+
+    def count(self, name, value=1):
+        """adds the value to a counter"""
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+            self.samples.append((time.perf_counter() - self.origin, name, self.counters[name]))
+
+
+    def gauge(self, name, value):
+        """sets a counter to the value (e.g. the number of open figures)"""
+        with self.lock:
+            self.counters[name] = value
+            self.samples.append((time.perf_counter() - self.origin, name, value))
+
+
+    def summary(self):
+        """the total time per span name
+
+        Returns:
+            dict of span name to its number of `calls` and `total` time in seconds, and the `counters`
+        """
+        spans = {}
+        for span in self.spans:
+            stats = spans.setdefault(span['name'], {'calls': 0, 'total': 0.})
+            stats['calls'] += 1
+            stats['total'] += span['duration']
+
+        return {'spans': spans, 'counters': dict(self.counters)}
+
+
+    def to_json(self, fpath=None):
+        """the recorded spans and counters as json
+
+        Args:
+            fpath: the path to save at, defaults to None
+
+        Returns:
+            the json string
+        """
+        content = json.dumps({'spans': sorted(self.spans, key=lambda span: span['start']),
+                              'counters': self.counters, 'summary': self.summary()['spans']}, default=str)
+        if fpath is not None:
+            with open(fpath, 'w') as f:
+                f.write(content)
+        return content
+
+
+    def to_chrome_trace(self, fpath=None):
+        """the recorded spans (complete events) and counters (counter events) in the Chrome trace format
+
+        Args:
+            fpath: the path to save at, defaults to None
+
+        Returns:
+            the json string
+        """
+        pid = os.getpid()
+        events = [{'name': span['name'], 'ph': 'X', 'ts': span['start'] * 1e6, 'dur': span['duration'] * 1e6,
+                   'pid': pid, 'tid': span['thread'], 'args': span['args']} for span in self.spans]
+        events += [{'name': name, 'ph': 'C', 'ts': ts * 1e6, 'pid': pid, 'args': {name: value}}
+                   for ts, name, value in self.samples]
+
+        content = json.dumps({'traceEvents': sorted(events, key=lambda event: event['ts'])}, default=str)
+        if fpath is not None:
+            with open(fpath, 'w') as f:
+                f.write(content)
+        return content
+
+
+    def reset(self):
+        """clears the recorded spans and counters"""
+        with self.lock:
+            self.spans, self.counters, self.samples = [], {}, []
+
+
+def enable_profiling():
+    """enables the profiling (idempotent)
+
+    Returns:
+        the active Profiler
+    """
+    global _PROFILER
+    if _PROFILER is None:
+        _PROFILER = Profiler()
+    return _PROFILER
+
+
+def disable_profiling():
+    """disables the profiling
+
+    Returns:
+        the Profiler that was active, or None
+    """
+    global _PROFILER
+    profiler, _PROFILER = _PROFILER, None
+    return profiler
+
+
+def get_profiler():
+    """the active Profiler, or None if profiling is disabled"""
+    return _PROFILER
+
+
+def span(name, **args):
+    """a timing span of the active profiler (a no-op context when disabled)"""
+    if _PROFILER is None:
+        return _NO_SPAN
+    return _PROFILER.span(name, **args)
+
+
+def count(name, value=1):
+    """adds the value to a counter of the active profiler (no-op when disabled)"""
+    if _PROFILER is not None:
+        _PROFILER.count(name, value)
+
+
+def gauge(name, value):
+    """sets a counter of the active profiler (no-op when disabled)"""
+    if _PROFILER is not None:
+        _PROFILER.gauge(name, value)
+
+
+def profiled(name):
+    """decorator recording a span for every call of the function. For plotting helpers (whose first
+    argument is an axis), the number of artists they add is counted as `artists`
+
+    Args:
+        name: the name of the span
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _PROFILER is None:
+                return func(*args, **kwargs)
+
+            ax = args[0] if args else kwargs.get('ax')
+            artists = len(ax.get_children()) if hasattr(ax, 'get_children') else None
+            with _PROFILER.span(name):
+                output = func(*args, **kwargs)
+            if artists is not None:
+                _PROFILER.count('artists', len(ax.get_children()) - artists)
+            return output
+        return wrapper
+    return decorator
+
+
+# `PLOTEX_PROFILE=1` enables the profiling on import, and `PLOTEX_PROFILE_OUTPUT` saves the Chrome trace on exit
+if os.environ.get('PLOTEX_PROFILE', '').lower() not in ('', '0', 'false', 'no'):
+    enable_profiling()
+    if os.environ.get('PLOTEX_PROFILE_OUTPUT'):
+        atexit.register(lambda: _PROFILER is not None and _PROFILER.to_chrome_trace(os.environ['PLOTEX_PROFILE_OUTPUT']))
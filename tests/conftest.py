@@ -0,0 +1,20 @@
+import os
+import tempfile
+
+# the tests never touch the user cache, and render without a display
+os.environ['PLOTEX_CACHE_DIR'] = tempfile.mkdtemp(prefix='plotex_tests_')
+os.environ['MPLBACKEND'] = 'Agg'
+
+import matplotlib
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def clean_rcparams():
+    """the tests use the matplotlib defaults (no LaTeX), restored after each test"""
+    import matplotlib.pyplot as plt
+
+    with matplotlib.rc_context():
+        matplotlib.rcdefaults()
+        yield
+    plt.close('all')
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+from plotex.utils.aggregation import QuantileSketch, chunked_reduce
+
+
+def frame(n, seed=0):
+    rng = np.random.default_rng(seed)
+    values = rng.normal(size=n)
+    values[rng.random(n) < 0.05] = np.nan
+    return pd.DataFrame({'g': rng.choice(list('abcd'), size=n), 'v': values})
+
+
+@pytest.mark.parametrize('reduce, q', [('mean', 'mean'), ('sum', 'sum'), ('count', 'count'), ('min', 'min'),
+                                       ('max', 'max'), ('median', 0.5), (0.25, 0.25), ('p90', 0.9)])
+def test_chunked_reduce_matches_groupby(reduce, q):
+    df = frame(1000)
+    chunks = [df.iloc[i:i + 128] for i in range(0, len(df), 128)]
+    labels, values = chunked_reduce(chunks, 'g', 'v', reduce=reduce, sketch_size=1024)
+
+    grouped = df.groupby('g')['v']
+    expected = grouped.quantile(q) if isinstance(q, float) else grouped.aggregate(q)
+    assert labels == list(expected.index)
+    np.testing.assert_allclose(values, expected.to_numpy(dtype=float))
+
+
+def test_chunked_reduce_rejects_other_reductions():
+    with pytest.raises(ValueError):
+        chunked_reduce([frame(10)], 'g', 'v', reduce='std')
+
+
+def test_sketch_is_exact_before_compacting():
+    values = np.random.default_rng(1).normal(size=200)
+    sketch = QuantileSketch(k=256)
+    sketch.update(values)
+    for q in (0., 0.1, 0.5, 0.73, 1.):
+        assert sketch.quantile(q) == pytest.approx(np.quantile(values, q))
+
+
+def test_sketch_rank_error_is_bounded():
+    values = np.random.default_rng(2).lognormal(size=200000)
+    sketches = [QuantileSketch(k=256, seed=i) for i in range(4)]
+    for i, chunk in enumerate(np.array_split(values, 40)):
+        sketches[i % 4].update(chunk)
+    for other in sketches[1:]:
+        sketches[0].merge(other)
+
+    assert sketches[0].count == len(values)
+    ordered = np.sort(values)
+    for q in np.linspace(0.01, 0.99, 25):
+        rank = np.searchsorted(ordered, sketches[0].quantile(q)) / len(values)
+        assert abs(rank - q) < 0.02
+    assert QuantileSketch().quantile(0.5) != QuantileSketch().quantile(0.5) # NaN when empty
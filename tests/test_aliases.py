@@ -0,0 +1,76 @@
+import logging
+import matplotlib
+import pytest
+from plotex.plotsize import aliases
+from plotex.plotsize.aliases import build_alias_index, find_matching_param, fuzzy_match
+
+
+@pytest.mark.parametrize('key, param', [
+    ('axes.titlesize', 'axes.titlesize'), # rcParams key
+    ('xticks', 'xtick.labelsize'), # shortened version
+    ('xlabel', 'axes.labelsize'), # special mapping
+    ('legend', 'legend.fontsize'), # special mapping over the shortened version
+    ('X_Ticks', 'xtick.labelsize'), # normalized
+    ('Legend-Title', 'legend.title_fontsize'),
+    ('font size', 'font.size'),
+])
+def test_size_aliases(key, param):
+    assert find_matching_param(key, kind='size') == param
+
+
+def test_weight_aliases():
+    assert find_matching_param('title', kind='weight') == 'axes.titleweight'
+    assert find_matching_param('YLabel', kind='weight') == 'axes.labelweight'
+
+
+def test_index_lookups_skip_the_fuzzy_matching(monkeypatch):
+    monkeypatch.setattr(aliases, 'fuzzy_match', lambda *args: pytest.fail('fuzzy matched'))
+    for kind, (main_params, index) in aliases.ALIAS_INDEXES.items():
+        for param, short in main_params.items():
+            assert find_matching_param(param, kind) == param
+            assert find_matching_param(short.upper(), kind) == param
+
+
+def test_fuzzy_matches_are_memoized_and_unknown_keys_logged(caplog):
+    fuzzy_match.cache_clear()
+    assert find_matching_param('xtiks', kind='size') == 'xtick.labelsize'
+    assert find_matching_param('xtiks', kind='size') == 'xtick.labelsize'
+    assert fuzzy_match.cache_info().hits == 1
+
+    with caplog.at_level(logging.WARNING, logger=aliases.__name__):
+        assert find_matching_param('zzzz', kind='size') is None
+    assert 'zzzz' in caplog.text
+
+
+def test_build_alias_index():
+    index = build_alias_index({'a.b': 'ab'})
+    assert index == {'a.b': 'a.b', 'ab': 'a.b'}
+    assert build_alias_index({'a.b': 'ab'}, {'AB': 'c.d'})['AB'] == 'c.d'
+    assert build_alias_index({'a.b': 'ab'}) == index # the special mappings aren't shared between calls
+
+
+def test_publisher_names_are_case_insensitive(tmp_path, monkeypatch):
+    from plotex.configuration import BackendConfiguration
+    from plotex.plotsize.figsize import Sizing
+
+    monkeypatch.setattr(Sizing, 'CONFIG_PATH', str(tmp_path / 'size_config.json'))
+    config = BackendConfiguration()
+    config.initialize()
+    sizing = Sizing(config=config)
+
+    width = sizing.get_size(publisher='acl')[0]
+    assert width == pytest.approx(455.244 / 72.27)
+    assert sizing.get_size(publisher='ACL')[0] == width
+    assert sizing.get_size(publisher='NeurIPS')[0] == pytest.approx(397.48499 / 72.27)
+
+
+def test_update_textsize_uses_the_aliases(tmp_path, monkeypatch):
+    from plotex.configuration import BackendConfiguration
+    from plotex.plotsize.figsize import Sizing
+
+    monkeypatch.setattr(Sizing, 'CONFIG_PATH', str(tmp_path / 'size_config.json'))
+    sizing = Sizing(config=BackendConfiguration())
+    sizing.get_size(publisher='acl')
+    before = matplotlib.rcParams['axes.titlesize']
+    sizing.update_textsize(Title=2, x_ticks=1)
+    assert matplotlib.rcParams['axes.titlesize'] == before + 2
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+import matplotlib.pyplot as plt
+from plotex.plotting import bar
+
+
+COLUMNS = {
+    'float': pd.Series([1.5, np.nan, 3., 4., 0.5, 2.]),
+    'int': pd.Series([1, 2, 3, 4, 5, 6]),
+    'nullable': pd.Series([1, pd.NA, 3, 4, 5, pd.NA], dtype='Int64'),
+    'string': pd.Series(['u', 'v', None, 'x', 'y', 'z']),
+    'datetime': pd.Series(pd.to_datetime(['2024-01-01', None, '2024-01-03', '2024-01-04', '2024-01-05',
+                                          '2024-01-06'])),
+}
+
+
+@pytest.mark.parametrize('dtype', COLUMNS)
+@pytest.mark.parametrize('reduce', bar.FAST_REDUCTIONS)
+def test_group_reduce_matches_groupby(dtype, reduce):
+    df = pd.DataFrame({'g': list('babcab'), 'v': COLUMNS[dtype]})
+    try:
+        expected = df.groupby('g')['v'].aggregate(reduce)
+    except TypeError: # e.g. the mean of strings
+        pytest.skip(f"pandas does not support {reduce} for {dtype}")
+
+    fig, ax = plt.subplots()
+    bar.group_reduce(ax, df, 'g', 'v', reduce=reduce, optimize_labels=False)
+
+    heights = [patch.get_height() for patch in ax.patches]
+    if bar.is_fast_dtype(df['v'], reduce):
+        labels, values = bar.fast_reduce(df['g'], df['v'], reduce)
+        assert list(labels) == list(expected.index)
+        np.testing.assert_allclose(values, expected.to_numpy(dtype=float))
+    assert len(heights) == len(expected)
+
+
+def test_group_reduce_orders_labels_without_tex(monkeypatch):
+    import matplotlib
+    from plotex.utils import plotting
+
+    measured = []
+    def text_extent(text, family=None, size=None, weight=None, usetex=None):
+        measured.append(usetex)
+        return len(text), 1., 0.
+    monkeypatch.setattr(plotting, 'text_extent', text_extent)
+    matplotlib.rcParams['text.usetex'] = True
+
+    df = pd.DataFrame({'g': ['short', 'a longer label', 'mid label'], 'v': [1., 2., 3.]})
+    fig, ax = plt.subplots()
+    bar.group_reduce(ax, df, 'g', 'v')
+
+    assert measured and not any(measured)
+
+
+def test_label_above_skips_overlapping_and_short_bars():
+    fig, ax = plt.subplots(figsize=(3, 2))
+    heights = np.arange(1., 41.)
+    bars = ax.bar(np.arange(40), heights)
+    labels = [f"label {i:03d}" for i in range(40)]
+
+    bar.label_above(ax, bars, labels, skip_overlap=True)
+    kept = {text.get_text() for text in ax.texts}
+    assert 0 < len(kept) < 40 and 'label 000' in kept
+
+    # the kept labels don't overlap once drawn
+    fig.canvas.draw()
+    extents = \
+        sorted((text.get_window_extent().x0, text.get_window_extent().x1) for text in ax.texts)
+    assert all(right <= left for (_, right), (left, _) in zip(extents, extents[1:]))
+
+    fig, ax = plt.subplots(figsize=(8, 2))
+    bars = ax.bar(['a', 'b', 'c'], [0.5, 2., 3.])
+    bar.label_above(ax, bars, ['x', 'y', 'z'], min_height=1.)
+    assert [text.get_text() for text in ax.texts] == ['y', 'z']
+    assert [text.get_position() for text in ax.texts] == [(1., 2.1), (2., 3.1)]
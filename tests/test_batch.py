@@ -0,0 +1,20 @@
+import numpy as np
+import pandas as pd
+from plotex.batch import SharedFrame
+
+
+def test_shared_frames_keep_the_dtypes(tmp_path):
+    df = pd.DataFrame({
+        'float': [1.5, np.nan, 3.],
+        'int': [1, 2, 3],
+        'ordered': pd.Categorical(['b', 'a', 'b'], categories=['b', 'a', 'unused'], ordered=True),
+        'nullable': pd.array([1, pd.NA, 3], dtype='Int64'),
+        'string': pd.array(['x', None, 'z'], dtype='string'),
+        'object': ['u', None, 'w'],
+        'when': pd.to_datetime(['2024-01-01', '2024-01-02', None]),
+        'when_utc': pd.to_datetime(['2024-01-01', '2024-01-02', None]).tz_localize('UTC'),
+    }, index=pd.Index([10, 20, 30], name='id'))
+
+    loaded = SharedFrame.create(df, str(tmp_path / 'frame')).load()
+    pd.testing.assert_frame_equal(loaded.copy(), df, check_dtype=True)
+    assert list(loaded['ordered'].cat.categories) == ['b', 'a', 'unused']
@@ -0,0 +1,64 @@
+import os
+import shutil
+import tempfile
+import threading
+import pandas as pd
+import pytest
+from plotex import batch, cli
+from plotex.configuration import BackendConfiguration
+from plotex.plotting import bar
+
+
+def test_helpers_are_resolved_in_the_allowed_modules_only():
+    assert batch.resolve_helper('bar.group_reduce') is bar.group_reduce
+    assert batch.resolve_helper('plotex.plotting.bar.group_reduce') is bar.group_reduce
+    for name in ('os.system', 'subprocess.run', 'bar.np', 'scatter.to_rgb', 'plotex.batch.render_batch',
+                 'plotex.plotting.bar._private', 'missing.helper'):
+        with pytest.raises(ValueError):
+            batch.resolve_helper(name)
+
+    import json
+    assert batch.resolve_helper('json.dumps', modules=batch.HELPER_MODULES + ('json',)) is json.dumps
+
+
+@pytest.fixture
+def daemon(tmp_path, monkeypatch):
+    config_path = tmp_path / 'config.txt'
+    config_path.write_text("font.size: 10\ntext.usetex: False\n") # renders without LaTeX
+    monkeypatch.setattr(BackendConfiguration, 'DEFAULT_CONFIG_PATH', str(config_path))
+
+    folder = tempfile.mkdtemp(prefix='plotex_') # Unix socket paths are short
+    socket_path = os.path.join(folder, 'render.sock')
+    server = cli.RenderServer(socket_path=socket_path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    for _ in range(200):
+        if cli.is_running(socket_path):
+            break
+        thread.join(0.05)
+    yield socket_path
+    if cli.is_running(socket_path):
+        cli.request({'command': 'stop'}, socket_path=socket_path)
+    thread.join(10)
+    shutil.rmtree(folder, ignore_errors=True)
+    assert not thread.is_alive()
+
+
+def test_daemon_renders_specs_and_refuses_other_helpers(daemon, tmp_path):
+    data = tmp_path / 'data.csv'
+    pd.DataFrame({'g': list('abcab'), 'v': [1., 2., 3., 4., 5.]}).to_csv(data, index=False)
+    spec = {'plot': 'bar.group_reduce', 'data': str(data), 'kwargs': {'group_col': 'g', 'value_col': 'v'},
+            'save_path': str(tmp_path / 'bars.png'), 'format': 'png'}
+    evil = dict(spec, plot='os.system', kwargs={}, save_path=str(tmp_path / 'evil.png'))
+
+    assert cli.request({'command': 'ping'}, socket_path=daemon)['ok']
+
+    response = cli.request({'command': 'render', 'specs': [spec, evil]}, socket_path=daemon)
+    assert response['ok']
+    rendered, refused = response['results']
+    assert rendered['error'] is None and (tmp_path / 'bars.png').stat().st_size > 0
+    assert 'Unknown plotting helper: os.system' in refused['error'] and not (tmp_path / 'evil.png').exists()
+
+    response = cli.request({'command': 'unknown'}, socket_path=daemon)
+    assert not response['ok'] and 'Unknown command' in response['error']
+    assert cli.request({'command': 'stop'}, socket_path=daemon)['ok']
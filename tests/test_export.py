@@ -0,0 +1,93 @@
+import threading
+import matplotlib
+import matplotlib.pyplot as plt
+import pytest
+from plotex import export
+from plotex.export import ExportQueue
+
+
+def make_figure():
+    fig, ax = plt.subplots(figsize=(2, 1.5))
+    ax.plot([0, 1, 2], [1, 0, 2])
+    return fig
+
+
+def test_flush_writes_every_figure_and_releases_them(tmp_path):
+    released = []
+    with ExportQueue(workers=2, max_pending=2, release=released.append) as queue:
+        figures = [make_figure() for _ in range(5)]
+        futures = [queue.submit(str(tmp_path / f"{i}.png"), fig=fig, format='png') for i, fig in enumerate(figures)]
+        queue.flush()
+
+        assert all(future.done() for future in futures)
+        assert all((tmp_path / f"{i}.png").stat().st_size > 0 for i in range(5))
+        assert sorted(map(id, released)) == sorted(map(id, figures))
+
+
+def test_figures_are_saved_with_the_rcparams_of_the_submit(tmp_path, monkeypatch):
+    saved = {}
+    def record(save_path, fig=None, **kwargs):
+        saved[save_path] = kwargs
+
+    monkeypatch.setattr(export, 'save', record)
+    with ExportQueue() as queue:
+        with matplotlib.rc_context({'savefig.dpi': 42, 'savefig.transparent': True}):
+            queue.submit('a.png', fig=make_figure(), format='png')
+        queue.flush()
+
+    assert saved['a.png']['dpi'] == 42 and saved['a.png']['transparent'] is True
+
+
+def test_submit_blocks_while_the_queue_is_full(monkeypatch):
+    writing = threading.Event()
+    def blocked_save(save_path, fig=None, **kwargs):
+        writing.wait(5)
+
+    monkeypatch.setattr(export, 'save', blocked_save)
+    queue = ExportQueue(max_pending=1)
+    queue.submit('a.png', fig=make_figure())
+
+    second = threading.Thread(target=queue.submit, args=('b.png',), kwargs={'fig': make_figure()})
+    second.start()
+    second.join(0.2)
+    assert second.is_alive() # waiting for the slot of the first figure
+
+    writing.set()
+    second.join(5)
+    assert not second.is_alive()
+    queue.close()
+
+
+def test_flush_raises_the_export_errors(tmp_path):
+    queue = ExportQueue()
+    good = queue.submit(str(tmp_path / 'good.png'), fig=make_figure(), format='png')
+    bad = queue.submit(str(tmp_path / 'bad.xyz'), fig=make_figure(), format='xyz')
+
+    with pytest.raises(Exception, match=r'1 figure\(s\) could not be saved: .*bad\.xyz') as info:
+        queue.flush()
+    assert isinstance(info.value.__cause__, ValueError)
+    assert good.exception() is None and bad.exception() is not None
+    assert (tmp_path / 'good.png').exists()
+
+    # the errors are reported once
+    queue.flush()
+    queue.close()
+
+
+def test_close_raises_the_export_errors_and_stops_the_writer(tmp_path):
+    queue = ExportQueue()
+    queue.submit(str(tmp_path / 'bad.xyz'), fig=make_figure(), format='xyz')
+    with pytest.raises(Exception, match='could not be saved'):
+        queue.close()
+    with pytest.raises(RuntimeError):
+        queue.submit(str(tmp_path / 'late.png'), fig=make_figure(), format='png')
+
+
+def test_process_writers(tmp_path):
+    with ExportQueue(processes=True) as queue:
+        queue.submit(str(tmp_path / 'a.png'), fig=make_figure(), format='png')
+        queue.submit(str(tmp_path / 'bad.xyz'), fig=make_figure(), format='xyz')
+        with pytest.raises(Exception, match='bad.xyz'):
+            queue.flush()
+
+    assert (tmp_path / 'a.png').stat().st_size > 0
@@ -0,0 +1,99 @@
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from plotex.configuration import BackendConfiguration
+from plotex.plotsize.figsize import Sizing
+from plotex.utils.cache import read_json
+from plotex.utils.fetching import fetch_if_modified, load_validators
+
+
+CONFIG = {'width': {'local': 100.}}
+ETAG = '"v1"'
+
+
+class Handler(BaseHTTPRequestHandler):
+    """serves CONFIG at /config.json (honouring If-None-Match), never answers in time at /slow, and fails
+    at /broken"""
+
+    def do_GET(self):
+        self.server.requests.append((self.path, self.headers.get('If-None-Match')))
+        if self.path == '/slow':
+            time.sleep(1)
+            self.send_response(200)
+            self.end_headers()
+        elif self.path == '/broken':
+            self.send_response(500)
+            self.end_headers()
+        elif self.headers.get('If-None-Match') == ETAG:
+            self.send_response(304)
+            self.end_headers()
+        else:
+            body = json.dumps(CONFIG).encode()
+            self.send_response(200)
+            self.send_header('ETag', ETAG)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    httpd.daemon_threads = True
+    httpd.requests = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd, f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_unchanged_content_is_not_downloaded_again(server, tmp_path):
+    httpd, url = server
+    fpath = str(tmp_path / 'size_config.json')
+
+    assert fetch_if_modified(f"{url}/config.json", fpath) is True
+    assert read_json(fpath) == CONFIG
+    assert load_validators(fpath)['etag'] == ETAG
+
+    assert fetch_if_modified(f"{url}/config.json", fpath) is False
+    assert fetch_if_modified(f"{url}/config.json", fpath, force=True) is True
+    assert httpd.requests == [('/config.json', None), ('/config.json', ETAG), ('/config.json', None)]
+
+
+@pytest.mark.parametrize('path', ['/slow', '/broken'])
+def test_failed_fetches_raise(server, tmp_path, path):
+    _, url = server
+    fpath = str(tmp_path / 'config.txt')
+
+    start = time.perf_counter()
+    with pytest.raises(Exception, match='An error occured while fetching'):
+        fetch_if_modified(f"{url}{path}", fpath, timeout=0.2)
+    assert time.perf_counter() - start < 1
+    assert not (tmp_path / 'config.txt').exists()
+
+
+def test_configuration_falls_back_to_the_bundled_default(server, tmp_path, monkeypatch):
+    _, url = server
+    monkeypatch.setattr(BackendConfiguration, 'CONFIG_URL', f"{url}/slow")
+    monkeypatch.setattr(BackendConfiguration, 'CONFIG_FILE_PATH', str(tmp_path / 'config.txt'))
+
+    config = BackendConfiguration(refresh=True, timeout=0.2)
+    config.initialize()
+    assert config.content_path == BackendConfiguration.DEFAULT_CONFIG_PATH
+
+
+def test_size_config_falls_back_to_the_bundled_default(server, tmp_path, monkeypatch):
+    _, url = server
+    monkeypatch.setattr(BackendConfiguration, 'CONFIG_FILE_PATH', str(tmp_path / 'config.txt'))
+    monkeypatch.setattr(Sizing, 'CONFIG_PATH', str(tmp_path / 'size_config.json'))
+
+    config = BackendConfiguration()
+    config.initialize()
+    sizing = Sizing(config=config, url=f"{url}/broken", refresh=True)
+    assert sizing.size_config == read_json(Sizing.DEFAULT_CONFIG_PATH)
@@ -0,0 +1,33 @@
+import os
+import subprocess
+import sys
+import pytest
+import plotex
+from plotex.configuration import BackendConfiguration
+from plotex.plotsize.figsize import Sizing
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    monkeypatch.setattr(Sizing, 'CONFIG_PATH', str(tmp_path / 'size_config.json'))
+    config = BackendConfiguration()
+    config.initialize()
+    return config
+
+
+def test_new_widths_are_seen_by_other_sizings(config):
+    first = Sizing(config=config)
+    size = first.get_size(width=300., publisher='My Venue')
+
+    second = Sizing(config=config)
+    assert second.get_size(publisher='my venue') == size
+
+
+def test_widths_cached_by_a_worker_survive_os_exit(config, tmp_path):
+    code = ("import os; from plotex.plotsize.figsize import Sizing; "
+            "Sizing().get_size(width=321., publisher='worker venue'); os._exit(0)")
+    env = {**os.environ, 'PLOTEX_CACHE_DIR': str(tmp_path),
+           'PYTHONPATH': os.path.dirname(os.path.dirname(plotex.__file__))}
+    subprocess.run([sys.executable, '-c', code], env=env, check=True, capture_output=True)
+
+    assert Sizing(config=config).get_size(publisher='worker venue')[0] == pytest.approx(321. / 72.27)
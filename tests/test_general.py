@@ -0,0 +1,21 @@
+import pytest
+import matplotlib.pyplot as plt
+from PIL import Image
+from plotex.utils.general import RASTER_FORMATS, render_rgba, encode_rgba
+
+
+@pytest.mark.parametrize('fmt', RASTER_FORMATS)
+def test_encode_rgba_writes_every_raster_format(tmp_path, fmt):
+    fig, ax = plt.subplots(figsize=(2, 1))
+    ax.plot([0, 1], [1, 0])
+    rgba = render_rgba(fig, 50)
+
+    fpath = tmp_path / f"figure.{fmt}"
+    encode_rgba(rgba, fpath, fmt, 50)
+
+    height, width = rgba.shape[:2]
+    if fmt in ('raw', 'rgba'):
+        assert fpath.stat().st_size == width * height * 4
+    else:
+        with Image.open(fpath) as image:
+            assert image.size == (width, height)
@@ -0,0 +1,53 @@
+import functools
+import numpy as np
+import pytest
+from plotex.utils.hashing import hash_value
+
+
+def make_scaler(factor):
+    def scale(values):
+        return values * factor
+    return scale
+
+
+def test_functions_are_hashed_by_their_code():
+    first = lambda values: values.mean()
+    second = lambda values: values.max()
+    assert hash_value(first) != hash_value(second)
+
+    def with_default(values, q=0.5):
+        return values.quantile(q)
+    same = with_default
+    def with_default(values, q=0.9):
+        return values.quantile(q)
+    assert hash_value(same) != hash_value(with_default)
+
+
+def test_closures_are_hashed_by_their_values():
+    assert hash_value(make_scaler(2)) == hash_value(make_scaler(2))
+    assert hash_value(make_scaler(2)) != hash_value(make_scaler(3))
+
+
+def test_partials_and_builtins_are_hashed():
+    assert hash_value(functools.partial(np.quantile, q=0.5)) != hash_value(functools.partial(np.quantile, q=0.9))
+    assert hash_value(len) == hash_value(len)
+    assert hash_value(np.sqrt) != hash_value(np.exp)
+
+
+def test_stateful_callables_are_refused():
+    class Reducer():
+        def __call__(self, values):
+            return values.sum()
+
+    with pytest.raises(TypeError):
+        hash_value(Reducer())
+    with pytest.raises(TypeError):
+        hash_value({'reduce': [1, 2].count})
+
+
+def test_recursive_closures_are_hashed():
+    def outer():
+        def countdown(n):
+            return n if n <= 0 else countdown(n - 1)
+        return countdown
+    assert hash_value(outer()) == hash_value(outer())
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+import matplotlib.pyplot as plt
+from plotex.plotting import line
+
+
+def walk(n, seed=0):
+    return np.cumsum(np.random.default_rng(seed).normal(size=n))
+
+
+@pytest.mark.parametrize('downsample, budget', [(line.minmax_downsample, 25), (line.lttb_downsample, 100)])
+def test_short_series_are_unchanged(downsample, budget):
+    x = np.arange(100.)
+    np.testing.assert_array_equal(downsample(x, walk(100), budget), np.arange(100))
+
+
+def test_minmax_keeps_the_ends_and_the_extrema_of_every_bucket():
+    n, n_buckets = 10000, 50
+    x, y = np.sort(np.random.default_rng(1).uniform(0, 1, n)), walk(n)
+    selected = line.minmax_downsample(x, y, n_buckets)
+
+    assert selected[0] == 0 and selected[-1] == n - 1
+    assert len(selected) <= 4 * n_buckets
+    edges = np.linspace(x[0], x[-1], n_buckets + 1)
+    buckets = np.clip(np.searchsorted(edges, x, side='right') - 1, 0, n_buckets - 1)
+    for bucket in np.unique(buckets):
+        kept = y[selected][buckets[selected] == bucket]
+        assert kept.min() == y[buckets == bucket].min() and kept.max() == y[buckets == bucket].max()
+
+
+def test_lttb_keeps_the_ends_and_the_budget():
+    n = 10000
+    x, y = np.arange(float(n)), walk(n)
+    selected = line.lttb_downsample(x, y, 200)
+
+    assert selected[0] == 0 and selected[-1] == n - 1
+    assert len(selected) == 200
+
+
+@pytest.mark.parametrize('downsample, budget', [(line.minmax_downsample, 50), (line.lttb_downsample, 200)])
+def test_nan_gaps_are_kept(downsample, budget):
+    n = 10000
+    x, y = np.arange(float(n)), walk(n)
+    y[3000:3500] = np.nan
+    y[7000] = np.nan
+
+    selected = downsample(x, y, budget)
+    assert 3000 in selected and 7000 in selected # the first NaN of every gap
+    assert np.isfinite(y[selected]).sum() > budget // 2
+
+
+@pytest.mark.parametrize('tz', [None, 'UTC', 'Europe/Paris'])
+def test_series_with_datetime_index(tz):
+    index = pd.date_range('2024-01-01', periods=5000, freq='min', tz=tz)
+    df = pd.DataFrame({'value': walk(5000)}, index=index)
+
+    fig, ax = plt.subplots()
+    line.series(ax, df, n_points=100)
+    assert len(ax.lines) == 1 and len(ax.lines[0].get_xdata()) <= 400
@@ -0,0 +1,14 @@
+import matplotlib
+from plotex.main import Plotex
+
+
+def test_style_on_a_fresh_plotex_restores_the_rcparams():
+    before = dict(matplotlib.rcParams)
+    plotex = Plotex(initialize=False) # like the module-level `plotex`
+    assert not hasattr(plotex, 'sizer')
+
+    with plotex.style(publisher='acl') as figsize:
+        assert figsize is not None
+        assert matplotlib.rcParams['text.usetex'] != before['text.usetex']
+
+    assert dict(matplotlib.rcParams) == before
@@ -0,0 +1,68 @@
+import matplotlib
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+from plotex.configuration import modes
+from plotex.configuration.modes import apply_draft, draft_params, rasterize_dense, restore_final
+from plotex.main import Plotex
+
+
+def test_draft_params():
+    params = {'text.usetex': False, 'font.serif': ['Times']}
+    assert draft_params(params) == {'text.usetex': False, 'savefig.dpi': modes.DRAFT_DPI, 'savefig.bbox': None}
+    assert draft_params(params, dpi=50)['savefig.dpi'] == 50
+
+    # LaTeX is replaced by mathtext with the Computer Modern fonts
+    overrides = draft_params({'text.usetex': True, 'font.serif': ['Times', 'cmr10']})
+    assert overrides['text.usetex'] is False
+    assert overrides['mathtext.fontset'] == 'cm' and overrides['axes.formatter.use_mathtext'] is True
+    assert overrides['font.serif'] == ['cmr10', 'Times']
+
+
+def test_apply_draft_and_restore_final():
+    matplotlib.rcParams.update({'text.usetex': True, 'savefig.dpi': 300, 'savefig.bbox': 'tight'})
+    before = dict(matplotlib.rcParams)
+
+    assert apply_draft() > 0
+    assert matplotlib.rcParams['text.usetex'] is False and matplotlib.rcParams['savefig.dpi'] == modes.DRAFT_DPI
+    apply_draft() # applying twice keeps the final values
+    assert restore_final() > 0
+    assert dict(matplotlib.rcParams) == before
+    assert restore_final() == 0
+
+
+def test_render_mode_restores_the_final_mode():
+    plotex = Plotex()
+    final = dict(matplotlib.rcParams)
+    final_size = plotex.skeleton(publisher='acl')
+    plotex.config.initialize()
+
+    with plotex.render_mode('draft'):
+        assert plotex.mode == 'draft'
+        assert matplotlib.rcParams['text.usetex'] is False
+        assert matplotlib.rcParams['savefig.dpi'] == modes.DRAFT_DPI
+        assert matplotlib.rcParams['savefig.bbox'] is None
+        assert plotex.skeleton(publisher='acl') == final_size # same layout
+        plotex.config.initialize()
+        for key in ('font.size', 'axes.labelsize', 'figure.figsize'):
+            assert matplotlib.rcParams[key] == final[key]
+
+    assert plotex.mode == 'final'
+    assert dict(matplotlib.rcParams) == final
+
+    with pytest.raises(ValueError):
+        with plotex.render_mode('draft'):
+            raise ValueError
+    assert plotex.mode == 'final'
+    assert dict(matplotlib.rcParams) == final
+
+
+def test_rasterize_dense():
+    fig, ax = plt.subplots()
+    dense, = ax.plot(np.arange(100))
+    sparse, = ax.plot(np.arange(10))
+    points = ax.scatter(np.arange(100), np.arange(100))
+
+    assert rasterize_dense(fig, threshold=50) == 2
+    assert dense.get_rasterized() and points.get_rasterized() and not sparse.get_rasterized()
+    assert rasterize_dense(fig, threshold=50) == 0
@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+import numpy as np
+import pytest
+import plotex
+from plotex.utils.palettes import category_colors, resolve_palette
+
+
+def test_category_colors_do_not_depend_on_history():
+    first = category_colors(['b', 'c'], 'pastel')
+    category_colors(['x', 'y', 'z', 'a'], 'pastel')
+    np.testing.assert_array_equal(category_colors(['c', 'b'], 'pastel'), first[::-1])
+
+
+def test_category_colors_match_across_processes():
+    code = "from plotex.utils.palettes import category_colors; print(category_colors(['b', 'c'], 'pastel').tolist())"
+    env = {**os.environ, 'PYTHONPATH': os.path.dirname(os.path.dirname(plotex.__file__)), 'PYTHONHASHSEED': '1'}
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                            env=env).stdout
+    assert eval(output) == category_colors(['b', 'c'], 'pastel').tolist()
+
+
+def test_category_colors_are_in_the_palette_per_namespace():
+    palette = resolve_palette('pastel').tolist()
+    labels = [f"label {i}" for i in range(50)]
+    assert all(color in palette for color in category_colors(labels, 'pastel').tolist())
+
+    values = category_colors(labels, 'pastel', namespace='value')
+    assert not np.array_equal(values, category_colors(labels, 'pastel'))
+
+
+@pytest.mark.parametrize('cmap', ['pastel', 'tab20', ['red', 'green', 'blue']])
+def test_categories_get_distinct_colors_until_the_palette_is_exhausted(cmap):
+    n_colors = len(resolve_palette(cmap))
+    for n in range(1, n_colors + 1):
+        labels = [f"category {i}" for i in range(n)]
+        colors = category_colors(labels, cmap)
+        assert len({tuple(color) for color in colors.tolist()}) == n
+
+    labels = [f"category {i}" for i in range(2 * n_colors)]
+    assert len({tuple(color) for color in category_colors(labels, cmap).tolist()}) == n_colors
+
+
+def test_repeated_categories_share_their_color():
+    colors = category_colors(['a', 'b', 'a', 'c', 'b'])
+    np.testing.assert_array_equal(colors[0], colors[2])
+    np.testing.assert_array_equal(colors[1], colors[4])
+    assert len({tuple(color) for color in colors.tolist()}) == 3
@@ -0,0 +1,46 @@
+import threading
+import matplotlib
+import pytest
+from plotex.utils.params import ThreadParams, current_params, scoped_params
+
+
+def test_scoped_params_are_isolated_per_thread():
+    base = current_params()
+    scoped, barrier = {}, threading.Barrier(2)
+
+    def worker(name, size):
+        with scoped_params({**base, 'font.size': size}):
+            matplotlib.rcParams['lines.linewidth'] = size
+            barrier.wait() # both threads are inside their scopes
+            scoped[name] = (matplotlib.rcParams['font.size'], matplotlib.rcParams['lines.linewidth'])
+            barrier.wait()
+
+    threads = [threading.Thread(target=worker, args=(name, size)) for name, size in (('a', 7.), ('b', 13.))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert scoped == {'a': (7., 7.), 'b': (13., 13.)}
+    assert matplotlib.rcParams['font.size'] == base['font.size']
+    assert matplotlib.rcParams['lines.linewidth'] == base['lines.linewidth']
+
+
+def test_the_class_is_restored_after_the_last_scope():
+    with scoped_params(current_params()):
+        with scoped_params(current_params()):
+            assert isinstance(matplotlib.rcParams, ThreadParams)
+        assert isinstance(matplotlib.rcParams, ThreadParams)
+    assert type(matplotlib.rcParams) is matplotlib.RcParams
+
+    with matplotlib.rc_context({'font.size': 21.}):
+        assert matplotlib.rcParams['font.size'] == 21.
+    assert matplotlib.rcParams['font.size'] != 21.
+
+
+def test_unsupported_matplotlib_versions_are_refused(monkeypatch):
+    monkeypatch.delattr(matplotlib.RcParams, '_update_raw')
+    with pytest.raises(Exception, match='not supported'):
+        with scoped_params(current_params()):
+            pass
+    assert type(matplotlib.rcParams) is matplotlib.RcParams
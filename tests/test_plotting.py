@@ -0,0 +1,22 @@
+import pytest
+import matplotlib.pyplot as plt
+from plotex.utils.plotting import fit_xticklabels
+
+
+LONG = ['a rather long label', 'another long label', 'the last long label']
+
+
+@pytest.mark.parametrize('rotations, expected', [((0,), 0), ((0, 15), 15), ((5, 10), 10)])
+def test_fit_xticklabels_falls_back_to_the_largest_rotation(rotations, expected):
+    fig, ax = plt.subplots(figsize=(1.5, 1))
+    ax.bar(LONG, [1, 2, 3])
+
+    assert fit_xticklabels(ax, rotations=rotations, wrap=False) == expected
+    assert all(label.get_rotation() == expected for label in ax.get_xticklabels())
+
+
+def test_fit_xticklabels_keeps_short_labels_horizontal():
+    fig, ax = plt.subplots(figsize=(6, 2))
+    ax.bar(['a', 'b', 'c'], [1, 2, 3])
+
+    assert fit_xticklabels(ax) == 0
@@ -0,0 +1,87 @@
+import io
+import numpy as np
+import matplotlib.pyplot as plt
+from plotex.pool import FigurePool, axis_converter
+from plotex.plotting import bar
+
+
+def render(fig):
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='rgba', dpi=50)
+    return buffer.getvalue()
+
+
+def test_reused_figure_resets_categorical_units():
+    pool = FigurePool()
+    fig, ax = pool.subplots(figsize=(4, 3))
+    ax.bar(['a', 'b'], [1, 2])
+    pool.release(fig)
+
+    reused, ax = pool.subplots(figsize=(4, 3))
+    assert reused is fig and pool.hits == 1
+    bars = ax.bar(['c', 'd'], [3, 4])
+    reused.canvas.draw()
+
+    assert [patch.get_x() + patch.get_width() / 2 for patch in bars] == [0.0, 1.0]
+    assert [label.get_text() for label in ax.get_xticklabels()] == ['c', 'd']
+
+
+def test_reused_figure_matches_a_new_one_for_bar_helpers():
+    import pandas as pd
+
+    df = pd.DataFrame({'g': list('abcab') * 4, 'v': np.arange(20.)})
+    other = pd.DataFrame({'g': list('xyz') * 4, 'v': np.arange(12.)})
+
+    fresh, ax = plt.subplots(figsize=(4, 3))
+    bar.group_reduce(ax, other, 'g', 'v', optimize_labels=False)
+    expected = render(fresh)
+
+    pool = FigurePool()
+    fig, ax = pool.subplots(figsize=(4, 3))
+    bar.group_reduce(ax, df, 'g', 'v', optimize_labels=False)
+    ax.tick_params(axis='x', rotation=45)
+    ax.set_yscale('log')
+    pool.release(fig)
+    fig, ax = pool.subplots(figsize=(4, 3))
+    bar.group_reduce(ax, other, 'g', 'v', optimize_labels=False)
+
+    assert render(fig) == expected
+
+
+def test_reused_shared_figure_hides_inner_labels():
+    pool = FigurePool()
+    fig, axes = pool.subplots(2, 1, figsize=(4, 4), sharex=True)
+    axes[0].bar(['a', 'b'], [1, 2])
+    axes[1].bar(['a', 'b'], [1, 2])
+    pool.release(fig)
+
+    fig, axes = pool.subplots(2, 1, figsize=(4, 4), sharex=True)
+    axes[1].plot([0, 1], [0, 1])
+    fig.canvas.draw()
+    assert not any(label.get_visible() for label in axes[0].get_xticklabels())
+    assert any(label.get_visible() for label in axes[1].get_xticklabels())
+
+
+def test_reused_figure_comes_back_cleared():
+    import datetime
+
+    pool = FigurePool()
+    fig, ax = pool.subplots(figsize=(4, 3))
+    ax.plot([datetime.date(2024, 1, 1), datetime.date(2024, 2, 1)], [10, 20], label='line')
+    ax.scatter([datetime.date(2024, 1, 15)], [15])
+    ax.text(0.5, 0.5, 'note')
+    ax.legend()
+    ax.set(title='title', xlabel='x', ylabel='y', ylim=(-5, 50), yscale='log')
+    fig.suptitle('suptitle')
+    pool.release(fig)
+
+    reused, ax = pool.subplots(figsize=(4, 3))
+    assert reused is fig
+    assert not (ax.lines or ax.collections or ax.texts or ax.patches or ax.images)
+    assert ax.get_legend() is None and not reused.texts
+    assert (ax.get_title(), ax.get_xlabel(), ax.get_ylabel()) == ('', '', '')
+    assert ax.get_xlim() == (0., 1.) and ax.get_ylim() == (0., 1.) and ax.get_yscale() == 'linear'
+    assert ax.xaxis.get_units() is None and axis_converter(ax.xaxis) is None
+
+    ax.plot([0, 10], [0, 1])
+    assert ax.get_xlim()[1] >= 10 # autoscaled again
@@ -0,0 +1,131 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+import matplotlib.pyplot as plt
+import pytest
+import plotex
+from plotex.utils import profiling
+from plotex.utils.profiling import count, disable_profiling, enable_profiling, get_profiler, profiled, span
+
+
+@pytest.fixture
+def profiler():
+    previous = disable_profiling()
+    yield enable_profiling()
+    disable_profiling()
+    if previous is not None:
+        profiling._PROFILER = previous
+
+
+def _in_span(name):
+    with span(name):
+        pass
+
+
+def test_disabled_profiling_records_nothing(profiler):
+    disable_profiling()
+    assert get_profiler() is None
+    with span('outer'):
+        count('calls')
+    assert profiler.spans == [] and profiler.counters == {}
+
+
+def test_spans_are_nested_per_thread(profiler):
+    assert enable_profiling() is profiler # idempotent
+
+    with span('figure', figure='a'):
+        with span('draw'):
+            with span('bar'):
+                pass
+        with span('save'):
+            pass
+    thread = threading.Thread(target=_in_span, args=('worker',))
+    thread.start()
+    thread.join()
+
+    spans = {s['name']: s for s in profiler.spans}
+    assert {name: s['depth'] for name, s in spans.items()} == {'figure': 0, 'draw': 1, 'bar': 2, 'save': 1, 'worker': 0}
+    assert spans['figure']['args'] == {'figure': 'a'}
+    assert spans['worker']['thread'] != spans['figure']['thread']
+
+    def inside(child, parent):
+        return (parent['start'] <= child['start'] and
+                child['start'] + child['duration'] <= parent['start'] + parent['duration'])
+    assert inside(spans['bar'], spans['draw']) and inside(spans['draw'], spans['figure'])
+    assert inside(spans['save'], spans['figure'])
+    assert spans['draw']['start'] + spans['draw']['duration'] <= spans['save']['start']
+
+
+def test_depth_is_restored_after_an_exception(profiler):
+    with pytest.raises(ValueError):
+        with span('failing'):
+            raise ValueError
+    with span('next'):
+        pass
+    assert [s['depth'] for s in profiler.spans] == [0, 0]
+
+
+def test_profiled_counts_the_added_artists(profiler):
+    @profiled('helper')
+    def helper(ax, n):
+        for i in range(n):
+            ax.plot([0, i])
+        return n
+
+    _, ax = plt.subplots()
+    assert helper(ax, 3) == 3
+    assert helper(ax=ax, n=2) == 2
+    assert helper.__name__ == 'helper'
+    summary = profiler.summary()
+    assert summary['spans']['helper']['calls'] == 2
+    assert summary['counters'] == {'artists': 5}
+
+
+def test_chrome_trace(profiler, tmp_path):
+    with span('outer', figure=1):
+        with span('inner'):
+            count('figures')
+            count('figures', 2)
+    profiler.gauge('open', 4)
+
+    content = profiler.to_chrome_trace(str(tmp_path / 'trace.json'))
+    with open(tmp_path / 'trace.json') as f:
+        assert f.read() == content
+
+    events = json.loads(content)['traceEvents']
+    assert [event['ts'] for event in events] == sorted(event['ts'] for event in events)
+
+    complete = {event['name']: event for event in events if event['ph'] == 'X'}
+    assert set(complete) == {'outer', 'inner'}
+    outer, inner = complete['outer'], complete['inner']
+    assert outer['args'] == {'figure': 1} and outer['pid'] == os.getpid() and outer['tid'] == inner['tid']
+    assert outer['ts'] <= inner['ts'] and inner['ts'] + inner['dur'] <= outer['ts'] + outer['dur']
+    assert outer['dur'] == pytest.approx(profiler.spans[-1]['duration'] * 1e6)
+
+    counters = [(event['name'], event['args']) for event in events if event['ph'] == 'C']
+    assert counters == [('figures', {'figures': 1}), ('figures', {'figures': 3}), ('open', {'open': 4})]
+
+
+def test_json_and_reset(profiler):
+    with span('a'):
+        pass
+    count('n')
+    content = json.loads(profiler.to_json())
+    assert [s['name'] for s in content['spans']] == ['a']
+    assert content['counters'] == {'n': 1} and content['summary']['a']['calls'] == 1
+
+    profiler.reset()
+    assert profiler.spans == [] and profiler.counters == {} and profiler.samples == []
+
+
+def test_trace_saved_on_exit_from_the_environment(tmp_path):
+    output = tmp_path / 'trace.json'
+    code = "from plotex.utils.profiling import span\nwith span('main'): pass"
+    env = {**os.environ, 'PLOTEX_PROFILE': '1', 'PLOTEX_PROFILE_OUTPUT': str(output),
+           'PYTHONPATH': os.path.dirname(os.path.dirname(plotex.__file__))}
+    subprocess.run([sys.executable, '-c', code], env=env, check=True, capture_output=True)
+
+    events = json.loads(output.read_text())['traceEvents']
+    assert [event['name'] for event in events] == ['main']
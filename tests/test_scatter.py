@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+from plotex.plotting import scatter
+
+
+def test_density_image_skips_empty_categories():
+    fig, ax = plt.subplots()
+    codes = np.array([0, 0, 2, 2])
+    image = scatter.density_image(ax, np.array([0., 1., 2., 3.]), np.array([1., 0., 1., 0.]), codes,
+                                  ['red', 'green', 'blue'], dpi=20)
+
+    rgba = image.get_array()
+    assert rgba.shape[2] == 4 and rgba[..., 3].max() > 0
+    assert image.get_extent() == [0., 3., 0., 1.]
+
+
+def test_density_image_without_points():
+    fig, ax = plt.subplots()
+    empty = np.array([])
+    assert scatter.density_image(ax, empty, empty, empty.astype(np.intp), [], dpi=20) is None
+    assert scatter.density_image(ax, np.array([np.nan]), np.array([1.]), np.array([0]), ['red'], dpi=20) is None
+
+
+def test_marker_density_with_an_empty_category():
+    df = pd.DataFrame({'x': [0., 1., np.nan, 3.], 'y': [1., 0., 2., np.nan], 'm': ['a', 'a', 'b', 'b']})
+    fig, ax = plt.subplots()
+    scatter.marker(ax, df, 'x', 'y', 'm', density=True, dpi=20)
+    assert len(ax.images) == 1
+
+    fig, ax = plt.subplots()
+    scatter.marker(ax, df.iloc[:0], 'x', 'y', 'm', density=True, dpi=20)
+    assert len(ax.images) == 0
@@ -0,0 +1,60 @@
+import os
+import matplotlib
+import pytest
+from plotex.configuration import snapshot
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot, 'SNAPSHOT_DIR', str(tmp_path / 'snapshots'))
+    monkeypatch.setattr(snapshot, '_SNAPSHOTS', {})
+    path = tmp_path / 'config.txt'
+    path.write_text("font.size: 11\nlines.linewidth: 2\n")
+    return path
+
+
+def test_snapshot_is_compiled_once_and_saved(config, monkeypatch):
+    before = dict(matplotlib.rcParams)
+    first = snapshot.load_snapshot(str(config))
+    assert first == {'font.size': 11., 'lines.linewidth': 2.}
+    assert dict(matplotlib.rcParams) == before # compiling doesn't change the rcParams
+    assert os.listdir(snapshot.SNAPSHOT_DIR) == [f"snapshot_{snapshot.snapshot_key(str(config))}.pkl"]
+
+    # a new process reads the saved snapshot instead of compiling
+    monkeypatch.setattr(snapshot, '_SNAPSHOTS', {})
+    monkeypatch.setattr(snapshot, 'compile_snapshot', lambda *args, **kwargs: pytest.fail('compiled again'))
+    assert snapshot.load_snapshot(str(config)) == first
+
+
+def test_snapshot_is_invalidated_when_the_file_changes(config):
+    key = snapshot.snapshot_key(str(config))
+    assert snapshot.load_snapshot(str(config))['font.size'] == 11.
+
+    config.write_text("font.size: 12\nlines.linewidth: 2\n")
+    os.utime(config, ns=(os.stat(config).st_atime_ns, os.stat(config).st_mtime_ns + 10**9))
+    assert snapshot.snapshot_key(str(config)) != key
+    assert snapshot.load_snapshot(str(config))['font.size'] == 12.
+
+    # only the modification time changes
+    mtime_key = snapshot.snapshot_key(str(config))
+    os.utime(config, ns=(os.stat(config).st_atime_ns, os.stat(config).st_mtime_ns + 10**9))
+    assert snapshot.snapshot_key(str(config)) != mtime_key
+
+
+def test_snapshot_is_invalidated_when_the_versions_change(config, monkeypatch):
+    key = snapshot.snapshot_key(str(config))
+    assert snapshot.snapshot_key(str(config), style='whitegrid') != key
+    assert snapshot.snapshot_key(str(config), palette='deep') != key
+
+    monkeypatch.setattr(snapshot, '_versions', lambda: ('0.0.0', '0.0.0'))
+    assert snapshot.snapshot_key(str(config)) != key
+
+
+def test_corrupt_snapshots_are_compiled_again(config):
+    fpath = snapshot._snapshot_path(snapshot.snapshot_key(str(config)))
+    os.makedirs(os.path.dirname(fpath))
+    with open(fpath, 'wb') as f:
+        f.write(b'\x80truncated')
+
+    assert snapshot.load_snapshot(str(config))['font.size'] == 11.
+    assert snapshot._read_snapshot(fpath) == {'font.size': 11., 'lines.linewidth': 2.}